@@ -3,6 +3,8 @@ import uuid
 ##############################################
 from django.conf import settings
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager, PermissionsMixin)
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import Q
 from django.forms.models import model_to_dict
@@ -139,6 +141,7 @@ class User(PermissionsMixin, AbstractBaseUser):
     date_joined = models.DateTimeField(default=timezone.now, editable=False)
     default_shipping_address = models.ForeignKey( Address, related_name='+', null=True, blank=True, on_delete=models.SET_NULL)
     default_billing_address = models.ForeignKey( Address, related_name='+', null=True, blank=True, on_delete=models.SET_NULL)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
 
     USERNAME_FIELD = 'email'
 
@@ -155,6 +158,7 @@ class User(PermissionsMixin, AbstractBaseUser):
             (
                 'impersonate_users', pgettext_lazy(
                     'Permission description', 'Impersonate customers.')))
+        indexes = [GinIndex(fields=['search_vector'])]
 
     def get_full_name(self):
         return self.email
@@ -197,3 +197,23 @@ class CartLine(models.Model):
     def is_shipping_required(self):
         """Return `True` if the related product variant requires shipping."""
         return self.variant.is_shipping_required()
+
+
+class StockReservation(models.Model):
+    """Stock of a variant held for a cart for a limited time.
+
+    The reserved quantity is counted in the variant's allocated quantity
+    until an order claims the reservation or it expires and is released.
+    Reservations refer to the cart by its token only, so deleting the cart
+    does not leave the stock allocated forever.
+    """
+
+    cart_token = models.UUIDField(db_index=True)
+    variant = models.ForeignKey(
+        'product.ProductVariant', related_name='+', on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    expires = models.DateTimeField(db_index=True)
+
+    def __repr__(self):
+        return 'StockReservation(variant=%r, quantity=%r)' % (
+            self.variant_id, self.quantity)
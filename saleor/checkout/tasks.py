@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .utils import release_expired_reservations
+
+
+@shared_task
+def release_stock_reservations():
+    """Return stock of expired reservations, meant to be run periodically."""
+    release_expired_reservations()
@@ -1,4 +1,5 @@
 """Cart-related utility functions."""
+from collections import defaultdict
 from datetime import date, timedelta
 from functools import wraps
 from uuid import UUID
@@ -6,8 +7,9 @@ from uuid import UUID
 from django.conf import settings
 from django.contrib import messages
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import Case, Exists, Q, Sum, Value, When
 from django.utils.encoding import smart_text
+from django.utils.timezone import now
 from django.utils.translation import get_language, pgettext, pgettext_lazy
 from prices import TaxedMoneyRange
 
@@ -25,11 +27,12 @@ from ..discount.utils import (
     get_products_voucher_discount, get_shipping_voucher_discount,
     get_value_voucher_discount, increase_voucher_usage)
 from ..order.models import Order
+from ..product.models import Collection, ProductVariant
 from ..shipping.models import ShippingMethod
 from .forms import (
     AddressChoiceForm, AnonymousUserBillingForm, AnonymousUserShippingForm,
     BillingAddressChoiceForm)
-from .models import Cart
+from .models import Cart, CartLine, StockReservation
 
 COOKIE_NAME = 'cart'
 
@@ -66,65 +69,45 @@ def token_is_valid(token):
 
 def remove_unavailable_variants(cart):
     """Remove any unavailable items from cart."""
-    for line in cart:
-        try:
-            add_variant_to_cart(
-                cart, line.variant, line.quantity, replace=True)
-        except InsufficientStock as e:
-            quantity = e.item.quantity_available
-            add_variant_to_cart(cart, line.variant, quantity, replace=True)
-
-
-def get_variant_prices_from_lines(lines):
-    """Get's price of each individual item within the lines."""
-    return [
-        line.variant.get_price()
-        for line in lines
-        for item in range(line.quantity)]
-
-
-def get_prices_of_discounted_products(lines, discounted_products):
-    """Get prices of variants belonging to the discounted products."""
-    # If there's no discounted_products,
-    # it means that all products are discounted
-    if discounted_products:
-        lines = (
-            line for line in lines
-            if line.variant.product in discounted_products)
-    return get_variant_prices_from_lines(lines)
-
-
-def get_prices_of_products_in_discounted_collections(
-        lines, discounted_collections):
-    """Get prices of variants belonging to the discounted collections."""
-    # If there's no discounted collections,
-    # it means that all of them are discounted
-    if discounted_collections:
-        discounted_collections = set(discounted_collections)
-        lines = (
-            line for line in lines
-            if line.variant and
-            set(line.variant.product.collections.all()).intersection(
-                discounted_collections))
-    return get_variant_prices_from_lines(lines)
-
-
-def get_prices_of_products_in_discounted_categories(
-        lines, discounted_categories):
-    """Get prices of variants belonging to the discounted categories.
+    variants_quantities = []
+    for line in cart.lines.select_related('variant'):
+        quantity = line.quantity
+        if line.variant.track_inventory:
+            quantity = min(quantity, line.variant.quantity_available)
+        variants_quantities.append((line.variant, quantity))
+    add_variants_to_cart(cart, variants_quantities, replace=True)
+
+
+def get_prices_of_discounted_lines(lines, voucher):
+    """Return (unit price, quantity) pairs of lines eligible for a voucher.
+
+    Lines are matched against the products, collections or categories of
+    a voucher and fetched with their variants in a single query. A voucher
+    which isn't limited to any of them applies to all lines.
 
     Product must be assigned directly to the discounted category, assigning
     product to child category won't work.
     """
-    # If there's no discounted collections,
-    # it means that all of them are discounted
-    if discounted_categories:
-        discounted_categories = set(discounted_categories)
-        lines = (
-            line for line in lines
-            if line.variant and
-            line.variant.product.category in discounted_categories)
-    return get_variant_prices_from_lines(lines)
+    if voucher.type == VoucherType.PRODUCT:
+        discounted = voucher.products.through.objects.filter(voucher=voucher)
+        lookup = Q(variant__product__in=discounted.values('product_id'))
+    elif voucher.type == VoucherType.COLLECTION:
+        discounted = voucher.collections.through.objects.filter(
+            voucher=voucher)
+        products = Collection.products.through.objects.filter(
+            collection__in=discounted.values('collection_id'))
+        lookup = Q(variant__product__in=products.values('product_id'))
+    elif voucher.type == VoucherType.CATEGORY:
+        discounted = voucher.categories.through.objects.filter(
+            voucher=voucher)
+        lookup = Q(
+            variant__product__category__in=discounted.values('category_id'))
+    else:
+        raise NotImplementedError('Unknown discount type')
+    lines = lines.filter(variant__isnull=False).annotate(
+        is_limited=Exists(discounted)).filter(lookup | Q(is_limited=False))
+    lines = lines.select_related('variant__product__product_type')
+    return [(line.variant.get_price(), line.quantity) for line in lines]
 
 
 def check_product_availability_and_warn(request, cart):
@@ -323,24 +306,81 @@ def add_variant_to_cart(
     If `replace` is truthy then any previous quantity is discarded instead
     of added to.
     """
-    line, _ = cart.lines.get_or_create(
-        variant=variant, defaults={'quantity': 0, 'data': {}})
-    new_quantity = quantity if replace else (quantity + line.quantity)
+    add_variants_to_cart(
+        cart, [(variant, quantity)], replace=replace,
+        check_quantity=check_quantity)
 
-    if new_quantity < 0:
-        raise ValueError('%r is not a valid quantity (results in %r)' % (
-            quantity, new_quantity))
 
-    if new_quantity == 0:
-        line.delete()
-    else:
-        if check_quantity:
-            variant.check_quantity(new_quantity)
+def add_variants_to_cart(
+        cart, variants_quantities, replace=False, check_quantity=True):
+    """Add many product variants to cart at once.
 
-        line.quantity = new_quantity
-        line.save(update_fields=['quantity'])
+    `variants_quantities` is an iterable of (variant, quantity) pairs,
+    a variant given more than once has its quantities summed up. If
+    `replace` is truthy then any previous quantities are discarded instead
+    of added to, lines which end up with no items are removed.
 
-    update_cart_quantity(cart)
+    Variants are locked and their stock is checked before any line is
+    changed, so either all or none of the changes are applied. Adding
+    a variant that no longer exists raises `InsufficientStock`. Lines are
+    then created, updated and deleted with a query each and the total
+    quantity of the cart is updated once.
+    """
+    quantities = {}
+    given_variants = {}
+    for variant, quantity in variants_quantities:
+        quantities[variant.pk] = quantities.get(variant.pk, 0) + quantity
+        given_variants[variant.pk] = variant
+    if not quantities:
+        return
+
+    with transaction.atomic():
+        variants = ProductVariant.objects.select_for_update().in_bulk(
+            list(quantities))
+        lines = {
+            line.variant_id: line
+            for line in cart.lines.filter(variant_id__in=quantities)}
+
+        lines_to_create = []
+        lines_to_update = {}
+        lines_to_delete = []
+        for variant_pk, quantity in quantities.items():
+            line = lines.get(variant_pk)
+            current_quantity = line.quantity if line else 0
+            new_quantity = (
+                quantity if replace else (quantity + current_quantity))
+
+            if new_quantity < 0:
+                raise ValueError(
+                    '%r is not a valid quantity (results in %r)' % (
+                        quantity, new_quantity))
+
+            if new_quantity == 0:
+                if line:
+                    lines_to_delete.append(line.pk)
+                continue
+            if variant_pk not in variants:
+                # The variant was deleted since the caller loaded it
+                raise InsufficientStock(given_variants[variant_pk])
+            if check_quantity:
+                variants[variant_pk].check_quantity(new_quantity)
+            if line is None:
+                lines_to_create.append(CartLine(
+                    cart=cart, variant_id=variant_pk, quantity=new_quantity,
+                    data={}))
+            elif new_quantity != current_quantity:
+                lines_to_update[line.pk] = new_quantity
+
+        if lines_to_create:
+            CartLine.objects.bulk_create(lines_to_create)
+        if lines_to_update:
+            CartLine.objects.filter(pk__in=lines_to_update).update(
+                quantity=Case(*[
+                    When(pk=pk, then=Value(quantity))
+                    for pk, quantity in lines_to_update.items()]))
+        if lines_to_delete:
+            CartLine.objects.filter(pk__in=lines_to_delete).delete()
+        update_cart_quantity(cart)
 
 
 def get_shipping_address_forms(cart, user_addresses, data, country):
@@ -667,15 +707,7 @@ def _get_shipping_voucher_discount_for_cart(voucher, cart):
 def _get_products_voucher_discount(order_or_cart, voucher):
     """Calculate products discount value for a voucher, depending on its type.
     """
-    if voucher.type == VoucherType.PRODUCT:
-        prices = get_prices_of_discounted_products(
-            order_or_cart.lines.all(), voucher.products.all())
-    elif voucher.type == VoucherType.COLLECTION:
-        prices = get_prices_of_products_in_discounted_collections(
-            order_or_cart.lines.all(), voucher.collections.all())
-    elif voucher.type == VoucherType.CATEGORY:
-        prices = get_prices_of_products_in_discounted_categories(
-            order_or_cart.lines.all(), voucher.categories.all())
+    prices = get_prices_of_discounted_lines(order_or_cart.lines.all(), voucher)
     if not prices:
         msg = pgettext(
             'Voucher not applicable',
@@ -838,13 +870,100 @@ def _process_user_data_for_order(cart):
         'billing_address': billing_address}
 
 
+def get_cart_stock_quantities(cart):
+    """Return quantities of variants with tracked inventory in the cart."""
+    quantities = defaultdict(int)
+    for line in cart:
+        if line.variant.track_inventory:
+            quantities[line.variant] += line.quantity
+    return quantities
+
+
+def _delete_reservations(reservations):
+    quantities = defaultdict(int)
+    for reservation in reservations:
+        quantities[reservation.variant] += reservation.quantity
+    StockReservation.objects.filter(
+        pk__in=[reservation.pk for reservation in reservations]).delete()
+    return quantities
+
+
+@transaction.atomic
+def release_expired_reservations(variants=None):
+    """Return stock of expired reservations, optionally of given variants.
+
+    Reservations locked by a checkout being completed right now are skipped
+    instead of waited for, so releasing never blocks buyers.
+    """
+    from ..product.utils import deallocate_stocks
+
+    reservations = StockReservation.objects.select_for_update(
+        skip_locked=True, of=('self',)).filter(expires__lte=now())
+    if variants is not None:
+        reservations = reservations.filter(variant__in=variants)
+    deallocate_stocks(
+        _delete_reservations(reservations.select_related('variant')))
+
+
+def claim_cart_reservations(cart):
+    """Remove the reservations of the cart and return reserved quantities.
+
+    Has to run in a transaction, the stock stays allocated and becomes
+    the caller's to keep or to give back.
+    """
+    reservations = StockReservation.objects.select_for_update(
+        of=('self',)).filter(cart_token=cart.token)
+    return _delete_reservations(reservations.select_related('variant'))
+
+
+@transaction.atomic
+def reserve_cart_stock(cart, timeout=None):
+    """Hold stock of the cart lines for the given number of seconds.
+
+    Earlier reservations of the cart are replaced. Raise InsufficientStock
+    and reserve nothing if any of the lines cannot be reserved.
+    """
+    from ..product.utils import allocate_stocks, deallocate_stocks
+
+    if timeout is None:
+        timeout = settings.STOCK_RESERVATION_TIMEOUT
+    quantities = get_cart_stock_quantities(cart)
+    deallocate_stocks(claim_cart_reservations(cart))
+    release_expired_reservations(variants=list(quantities))
+    allocate_stocks(quantities)
+    expires = now() + timedelta(seconds=timeout)
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            cart_token=cart.token, variant=variant, quantity=quantity,
+            expires=expires)
+        for variant, quantity in quantities.items()])
+
+
+def _allocate_cart_stock(cart):
+    """Allocate stock of the cart lines, taking over its reservations."""
+    from ..product.utils import allocate_stocks, deallocate_stocks
+
+    quantities = get_cart_stock_quantities(cart)
+    reserved = claim_cart_reservations(cart)
+    allocate_stocks({
+        variant: quantity - reserved[variant]
+        for variant, quantity in quantities.items()
+        if quantity > reserved[variant]})
+    deallocate_stocks({
+        variant: quantity - quantities[variant]
+        for variant, quantity in reserved.items()
+        if quantity > quantities[variant]})
+
+
 def _fill_order_with_cart_data(order, cart, discounts, taxes):
     """Fill an order with data (variants, note) from cart."""
     from ..order.utils import add_variant_to_order
 
+    _allocate_cart_stock(cart)
     for line in cart:
         add_variant_to_order(
-            order, line.variant, line.quantity, discounts, taxes)
+            order, line.variant, line.quantity, discounts, taxes,
+            allow_overselling=True, track_inventory=False)
 
     cart.payments.update(order=order)
 
@@ -854,12 +973,17 @@ def _fill_order_with_cart_data(order, cart, discounts, taxes):
 
 
 @transaction.atomic
-def create_order(cart, tracking_code, discounts, taxes):
+def create_order(
+        cart, tracking_code, discounts, taxes, idempotency_key=None):
     """Create an order from the cart.
 
     Each order will get a private copy of both the billing and the shipping
     address (if shipping).
 
+    If an idempotency key is given it is stored on the order along with the
+    cart's token, so a retried request for the same cart can find the order
+    instead of placing it for the second time.
+
     If any of the addresses is new and the user is logged in the address
     will also get saved to that user's address book.
 
@@ -877,6 +1001,8 @@ def create_order(cart, tracking_code, discounts, taxes):
     order_data.update({
         'language_code': get_language(),
         'tracking_client_id': tracking_code,
+        'checkout_token': str(cart.token),
+        'idempotency_key': idempotency_key,
         'total': cart.get_total(discounts, taxes)})
 
     order = Order.objects.create(**order_data)
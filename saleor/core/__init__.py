@@ -3,6 +3,8 @@ from django.core.checks import Warning, register
 from django.utils.translation import pgettext_lazy
 from prices import Money
 
+default_app_config = 'saleor.core.apps.CoreAppConfig'
+
 TOKEN_PATTERN = ('(?P<token>[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}'
                  '-[0-9a-z]{12})')
 
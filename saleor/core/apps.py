@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class CoreAppConfig(AppConfig):
+    name = 'saleor.core'
+
+    def ready(self):
+        from . import signals  # noqa
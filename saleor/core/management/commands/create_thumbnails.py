@@ -1,26 +1,137 @@
-import logging
+import json
+import os
+import time
+from multiprocessing import Pool
 
+from django.apps import apps
 from django.core.management.base import BaseCommand
-from versatileimagefield.image_warmer import VersatileImageFieldWarmer
+from django.db import connections
+from django.db.models import Max, Min
 
-from ....product.models import ProductImage
+from ...utils.thumbnails import warm_thumbnails
 
-logger = logging.getLogger(__name__)
+# Models with images, their image fields and rendition key sets
+IMAGE_FIELDS = [
+    ('product.ProductImage', 'image', 'products'),
+    ('product.Category', 'background_image', 'background_images'),
+    ('product.Collection', 'background_image', 'background_images')]
+
+
+def get_chunk_key(chunk):
+    model_label, dummy_attr, dummy_key_set, start, dummy_end = chunk
+    return '%s:%d' % (model_label, start)
+
+
+def warm_chunk(chunk):
+    """Warm thumbnails of images with primary keys in a range of a chunk."""
+    model_label, image_attr, rendition_key_set, start, end = chunk
+    model = apps.get_model(model_label)
+    queryset = model.objects.filter(pk__gte=start, pk__lt=end).order_by('pk')
+    num_images, failed = warm_thumbnails(
+        queryset, image_attr, rendition_key_set)
+    return chunk, num_images, failed
 
 
 class Command(BaseCommand):
     help = 'Generate thumbnails for all images'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            dest='processes',
+            default=os.cpu_count(),
+            help='Number of processes generating thumbnails')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            dest='chunk_size',
+            default=1000,
+            help='Size of ranges of primary keys of images processed at once')
+        parser.add_argument(
+            '--checkpoint',
+            dest='checkpoint',
+            default='create_thumbnails.checkpoint',
+            help='File storing progress, used to resume interrupted runs')
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            dest='restart',
+            default=False,
+            help='Ignore progress stored by an interrupted run')
+
     def handle(self, *args, **options):
-        self.warm_products()
-
-    def warm_products(self):
-        self.stdout.write('Products thumbnails generation:')
-        warmer = VersatileImageFieldWarmer(
-            instance_or_queryset=ProductImage.objects.all(),
-            rendition_key_set='products', image_attr='image', verbose=True)
-        num_created, failed_to_create = warmer.warm()
+        checkpoint = options['checkpoint']
+        done = set() if options['restart'] else self.load_checkpoint(
+            checkpoint)
+        chunks = [
+            chunk for chunk in self.get_chunks(options['chunk_size'])
+            if get_chunk_key(chunk) not in done]
+        if done:
+            self.stdout.write(
+                'Resuming, %d chunks already processed' % len(done))
+
+        started = time.monotonic()
+        num_images = 0
+        failed_to_create = []
+        results = self.warm_chunks(chunks, options['processes'])
+        for chunk, chunk_images, failed in results:
+            num_images += chunk_images
+            failed_to_create += failed
+            done.add(get_chunk_key(chunk))
+            self.save_checkpoint(checkpoint, done)
+            self.log_progress(num_images, started)
+
         self.log_failed_images(failed_to_create)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write('Generated thumbnails for %d images' % num_images)
+
+    def warm_chunks(self, chunks, processes):
+        if processes < 2 or len(chunks) < 2:
+            yield from map(warm_chunk, chunks)
+            return
+        # Processes of the pool must not share database connections
+        connections.close_all()
+        with Pool(processes) as pool:
+            yield from pool.imap_unordered(warm_chunk, chunks)
+
+    def get_chunks(self, chunk_size):
+        """Split images of all models into ranges of primary keys."""
+        chunks = []
+        for model_label, image_attr, rendition_key_set in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            pk_range = model.objects.aggregate(Min('pk'), Max('pk'))
+            if pk_range['pk__min'] is None:
+                continue
+            start = pk_range['pk__min'] - pk_range['pk__min'] % chunk_size
+            while start <= pk_range['pk__max']:
+                chunks.append((
+                    model_label, image_attr, rendition_key_set, start,
+                    start + chunk_size))
+                start += chunk_size
+        return chunks
+
+    def load_checkpoint(self, path):
+        if not os.path.exists(path):
+            return set()
+        with open(path) as checkpoint_file:
+            return set(json.load(checkpoint_file))
+
+    def save_checkpoint(self, path, done):
+        # Write to a temporary file first, so an interrupted write doesn't
+        # corrupt the checkpoint
+        temp_path = '%s.tmp' % path
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(sorted(done), checkpoint_file)
+        os.replace(temp_path, path)
+
+    def log_progress(self, num_images, started):
+        elapsed = time.monotonic() - started
+        rate = num_images / elapsed if elapsed else 0
+        self.stdout.write(
+            'Generated thumbnails for %d images (%.1f images/s)' % (
+                num_images, rate))
 
     def log_failed_images(self, failed_to_create):
         if failed_to_create:
@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from ...utils.rendered_text import warm_rendered_field
+
+# Models with rendered text, their text fields and renderers
+RENDERED_FIELDS = [
+    ('product.Product', 'description', 'plain'),
+    ('product.ProductTranslation', 'description', 'plain')]
+
+
+class Command(BaseCommand):
+    help = 'Render and cache text of all objects missing in the cache'
+
+    def handle(self, *args, **options):
+        for model_label, field_name, renderer in RENDERED_FIELDS:
+            model = apps.get_model(model_label)
+            queryset = model.objects.order_by('pk')
+            num_rendered = warm_rendered_field(queryset, field_name, renderer)
+            self.stdout.write('Rendered %s of %d objects of %s' % (
+                field_name, num_rendered, model_label))
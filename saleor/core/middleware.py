@@ -1,3 +1,4 @@
+import copy
 import logging
 from datetime import date
 
@@ -8,7 +9,8 @@ from django.utils.translation import get_language
 from django_countries.fields import Country
 
 from . import analytics
-from ..discount.models import Sale
+from ..discount.utils import get_sale_index
+from ..site.patch_sites import refresh_site_cache
 from .utils import get_client_ip, get_country_by_ip, get_currency_for_country
 from .utils.taxes import get_taxes_for_country
 
@@ -32,11 +34,10 @@ def google_analytics(get_response):
 
 
 def discounts(get_response):
-    """Assign active discounts to `request.discounts`."""
+    """Assign an index of active discounts to `request.discounts`."""
     def middleware(request):
-        discounts = Sale.objects.active(date.today()).prefetch_related(
-            'products', 'categories', 'collections')
-        request.discounts = discounts
+        request.discounts = SimpleLazyObject(
+            lambda: get_sale_index(date.today()))
         return get_response(request)
 
     return middleware
@@ -68,16 +69,23 @@ def currency(get_response):
 
 
 def site(get_response):
-    """Clear the Sites cache and assign the current site to `request.site`.
+    """Refresh the Sites cache and assign the current site to `request.site`.
 
     By default django.contrib.sites caches Site instances at the module
     level. This leads to problems when updating Site instances, as it's
     required to restart all application servers in order to invalidate
-    the cache. Using this middleware solves this problem.
+    the cache. Using this middleware solves this problem, cached sites are
+    dropped whenever any process saved a site or its settings.
+
+    The site is fetched together with its settings and stays the same for
+    the whole request, so tax and price configuration is read without
+    further queries. Each request gets its own copy of the cached site, so
+    forms and mutations changing it never leak unsaved values into other
+    requests.
     """
     def middleware(request):
-        Site.objects.clear_cache()
-        request.site = Site.objects.get_current()
+        refresh_site_cache()
+        request.site = copy.deepcopy(Site.objects.get_current())
         return get_response(request)
 
     return middleware
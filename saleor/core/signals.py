@@ -0,0 +1,43 @@
+"""Invalidation of data cached by every process.
+
+Sale indexes, tax tables and sites are cached in the memory of each
+process, see `saleor.core.utils.cache`. Changes to the data they are built
+from make all processes build them again.
+"""
+from django.contrib.sites.models import Site
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from ..discount.models import Sale
+from ..discount.utils import invalidate_sale_index
+from ..site.models import SiteSettings
+from ..site.patch_sites import invalidate_site_cache
+from .utils.cache import invalidate_on_commit
+from .utils.taxes import invalidate_taxes
+
+
+@receiver(post_save, sender='django_prices_vatlayer.VAT')
+@receiver(post_delete, sender='django_prices_vatlayer.VAT')
+def vat_rates_changed(sender, **kwargs):
+    invalidate_on_commit(invalidate_taxes)
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender='product.Category')
+@receiver(post_delete, sender='product.Category')
+@receiver(post_save, sender='product.Collection')
+@receiver(post_delete, sender='product.Collection')
+@receiver(m2m_changed, sender=Sale.products.through)
+@receiver(m2m_changed, sender=Sale.categories.through)
+@receiver(m2m_changed, sender=Sale.collections.through)
+def sale_index_changed(sender, **kwargs):
+    invalidate_on_commit(invalidate_sale_index)
+
+
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def site_changed(sender, **kwargs):
+    invalidate_on_commit(invalidate_site_cache)
@@ -1,11 +1,11 @@
 from django import template
 from django.utils.safestring import mark_safe
-from markdown import markdown as format_markdown
+
+from ..utils.rendered_text import render_text
 
 register = template.Library()
 
 
 @register.filter
 def markdown(text):
-    html = format_markdown(text, safe_mode='escape', output_format='html5')
-    return mark_safe(html)
+    return mark_safe(render_text(text, 'markdown'))
@@ -1,5 +1,8 @@
 from django.template import Library
 from django.utils.http import urlencode
+from django.utils.translation import get_language
+
+from ...menu.utils import get_menu_items
 
 register = Library()
 
@@ -17,15 +20,10 @@ def get_sort_by_url(context, field, descending=False):
 
 @register.inclusion_tag('menu.html')
 def menu(site_menu=None, horizontal=False):
-    menu_items = site_menu.json_content if site_menu else []
+    menu_items = []
+    if site_menu:
+        menu_items = get_menu_items(site_menu, get_language())
     return {
         'menu_items': menu_items,
         'horizontal': horizontal}
 
-
-@register.simple_tag
-def get_menu_item_name(menu_item, lang_code):
-    translated = menu_item['translations'].get(lang_code)
-    if translated:
-        return translated['name']
-    return menu_item['name']
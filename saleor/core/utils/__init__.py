@@ -21,6 +21,7 @@ from versatileimagefield.image_warmer import VersatileImageFieldWarmer
 
 from ...account.models import User
 from ...core.i18n import COUNTRY_CODE_CHOICES
+from .thumbnails import cache_thumbnail_urls
 
 georeader = geolite2.reader()
 logger = logging.getLogger(__name__)
@@ -163,6 +164,8 @@ def create_thumbnails(pk, model, size_set, image_attr=None):
     if failed_to_create:
         logger.error('Failed to generate thumbnails',
                      extra={'paths': failed_to_create})
+    else:
+        cache_thumbnail_urls(image_instance, size_set)
 
 
 def get_country_name_by_code(country_code):
@@ -0,0 +1,47 @@
+"""Versions of data cached by every process.
+
+Data like sale indexes, tax tables and sites is cached in the memory of
+each process. A version stored in the shared cache tells processes whether
+their copy is still current, changing it makes them all build the data
+again on their next lookup.
+
+Processes can not see versions changed by others if the cache is not
+shared, see the `CACHE_IS_SHARED` setting. Every lookup then returns a new
+version, so the data is built again whenever it's used.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version(key):
+    """Return the current version stored under a key, creating it if needed.
+
+    Processes racing to create a version all end up with the one stored
+    first.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return uuid4().hex
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(*keys):
+    """Change versions so all processes drop data built before."""
+    cache.set_many({key: uuid4().hex for key in keys}, None)
+
+
+def invalidate_on_commit(invalidate, *args):
+    """Call an invalidating function now and once more after the commit.
+
+    The second call prevents other processes from caching data read before
+    the transaction was committed.
+    """
+    invalidate(*args)
+    transaction.on_commit(lambda: invalidate(*args))
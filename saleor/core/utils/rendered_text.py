@@ -0,0 +1,106 @@
+"""Cache of rendered text.
+
+Rendering rich text, like formatting Markdown or stripping HTML from product
+descriptions for data feeds and structured data, takes far longer than a
+cache lookup. Rendered text is cached under keys including a hash of the
+source text, so entries never go stale and edits need no invalidation.
+Text is rendered when saved and can be rendered in bulk with the
+`warm_rendered_text` command, so pages rarely render it on a cache miss.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from markdown import markdown as format_markdown
+
+from .text import strip_html
+from .translations import TranslationWrapper
+
+RENDERED_TEXT_KEY = 'rendered-text:%s'
+RENDERED_TEXT_CACHE_TIMEOUT = 2592000
+
+
+def render_markdown(text):
+    return format_markdown(text, safe_mode='escape', output_format='html5')
+
+
+def render_plain_text(text):
+    return strip_html(text, strip_whitespace=True)
+
+
+RENDERERS = {
+    'markdown': render_markdown,
+    'plain': render_plain_text}
+
+
+def get_rendered_text_key(text, renderer, *context):
+    """Return the cache key of text rendered by a renderer.
+
+    Context, like the object and field the text comes from, only separates
+    entries of different sources.
+    """
+    digest = md5(text.encode('utf-8')).hexdigest()
+    parts = [renderer] + [str(part) for part in context] + [digest]
+    return RENDERED_TEXT_KEY % md5(
+        ':'.join(parts).encode('utf-8')).hexdigest()
+
+
+def render_text(text, renderer, *context):
+    key = get_rendered_text_key(text, renderer, *context)
+    rendered = cache.get(key)
+    if rendered is None:
+        rendered = RENDERERS[renderer](text)
+        cache.set(key, rendered, RENDERED_TEXT_CACHE_TIMEOUT)
+    return rendered
+
+
+def get_field_context(instance, field_name):
+    language_code = getattr(
+        instance, 'language_code', settings.LANGUAGE_CODE)
+    return (
+        instance._meta.label_lower, instance.pk, field_name, language_code)
+
+
+def render_field(instance, field_name, renderer):
+    """Return a rendered field of a model instance or its translation.
+
+    Translation wrappers render the field of the translation to the current
+    language if there is one.
+    """
+    if isinstance(instance, TranslationWrapper):
+        instance = instance.translation or instance.instance
+    return render_text(
+        getattr(instance, field_name), renderer,
+        *get_field_context(instance, field_name))
+
+
+def warm_rendered_field(queryset, field_name, renderer, batch_size=500):
+    """Render the field of objects missing in the cache.
+
+    Return the number of objects rendered.
+    """
+    num_rendered = 0
+    batch = []
+    for instance in queryset.iterator():
+        batch.append(instance)
+        if len(batch) == batch_size:
+            num_rendered += warm_batch(batch, field_name, renderer)
+            batch = []
+    if batch:
+        num_rendered += warm_batch(batch, field_name, renderer)
+    return num_rendered
+
+
+def warm_batch(instances, field_name, renderer):
+    texts = {
+        get_rendered_text_key(
+            getattr(instance, field_name), renderer,
+            *get_field_context(instance, field_name)): getattr(
+                instance, field_name)
+        for instance in instances}
+    cached = cache.get_many(texts.keys())
+    rendered = {
+        key: RENDERERS[renderer](text) for key, text in texts.items()
+        if key not in cached}
+    cache.set_many(rendered, RENDERED_TEXT_CACHE_TIMEOUT)
+    return len(rendered)
@@ -1,3 +1,5 @@
+import threading
+
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django_countries.fields import Country
@@ -6,12 +8,19 @@ from django_prices_vatlayer.utils import (
 from prices import Money, MoneyRange, TaxedMoney, TaxedMoneyRange
 
 from ...core import TaxRateType
+from .cache import bump_version, get_version
 
 DEFAULT_TAX_RATE_NAME = TaxRateType.STANDARD
 
 ZERO_MONEY = Money(0, settings.DEFAULT_CURRENCY)
 ZERO_TAXED_MONEY = TaxedMoney(net=ZERO_MONEY, gross=ZERO_MONEY)
 
+TAX_RATES_VERSION_KEY = 'taxes:vat-rates-version'
+
+lock = threading.Lock()
+with lock:
+    TAXES_CACHE = {}
+
 
 def zero_money():
     """Function used as a model's default."""
@@ -41,8 +50,9 @@ def apply_tax_to_price(taxes, rate_name, base):
     return tax_to_apply(base, keep_gross=keep_gross)
 
 
-def get_taxes_for_country(country):
-    tax_rates = get_tax_rates_for_country(country.code)
+def build_taxes_for_country(country_code):
+    """Return a table of tax rates and tax functions for a country."""
+    tax_rates = get_tax_rates_for_country(country_code, force_refresh=True)
     if tax_rates is None:
         return None
 
@@ -58,6 +68,38 @@ def get_taxes_for_country(country):
     return taxes
 
 
+def get_tax_rates_version():
+    return get_version(TAX_RATES_VERSION_KEY)
+
+
+def get_taxes_for_country(country):
+    """Return taxes for a country.
+
+    Tax tables are cached at the process level and rebuilt whenever VAT
+    rates change, see `invalidate_taxes`. The returned table is shared and
+    must not be modified.
+    """
+    version = get_tax_rates_version()
+    cached = TAXES_CACHE.get(country.code)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    taxes = build_taxes_for_country(country.code)
+    with lock:
+        TAXES_CACHE[country.code] = (version, taxes)
+    return taxes
+
+
+def invalidate_taxes():
+    """Force all processes to rebuild their tax tables."""
+    bump_version(TAX_RATES_VERSION_KEY)
+
+
+def clear_taxes_cache():
+    global TAXES_CACHE
+    with lock:
+        TAXES_CACHE = {}
+
+
 def get_taxes_for_address(address):
     """Return proper taxes for address or default country."""
     if address is not None:
@@ -80,6 +122,15 @@ def get_tax_rate_by_name(rate_name, taxes=None):
     return tax_rate
 
 
+def get_tax_by_name(rate_name, taxes=None):
+    """Return tax callable for current taxes or None if no tax applies."""
+    if not taxes or not rate_name:
+        return None
+    if rate_name in taxes:
+        return taxes[rate_name]['tax']
+    return taxes[DEFAULT_TAX_RATE_NAME]['tax']
+
+
 def include_taxes_in_prices():
     return Site.objects.get_current().settings.include_taxes_in_prices
 
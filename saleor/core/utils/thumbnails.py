@@ -0,0 +1,83 @@
+"""Manifest of created thumbnails.
+
+Resolving the URL of a thumbnail created on demand requires checking if
+the thumbnail exists in storage, which is a remote request for storages like
+S3. URLs of thumbnails known to exist are recorded in the cache instead, by
+the thumbnail tasks and warming or on the first on-demand resolution, and
+looked up without touching the storage.
+
+Entries are keyed by the name of the original image file, so they never
+point to thumbnails of a replaced image.
+"""
+import logging
+from hashlib import md5
+
+from django.core.cache import cache
+from versatileimagefield.utils import get_rendition_key_set
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_URL_KEY = 'thumbnail-url:%s'
+# Same as the default cache length of versatileimagefield (30 days)
+THUMBNAIL_URL_CACHE_TIMEOUT = 2592000
+
+
+def get_thumbnail_url_key(image, method, size):
+    image_key = '%s:%s:%s' % (image.name, method, size)
+    return THUMBNAIL_URL_KEY % md5(image_key.encode('utf-8')).hexdigest()
+
+
+def get_cached_thumbnail_url(image, method, size):
+    """Return the URL of a thumbnail or None if it's not known to exist."""
+    return cache.get(get_thumbnail_url_key(image, method, size))
+
+
+def cache_thumbnail_url(image, method, size, url):
+    cache.set(
+        get_thumbnail_url_key(image, method, size), url,
+        THUMBNAIL_URL_CACHE_TIMEOUT)
+
+
+def cache_thumbnail_urls(image, rendition_key_set):
+    """Record URLs of all thumbnails of a rendition key set of an image.
+
+    Should only be called once the thumbnails are created, as their
+    existence is not checked.
+    """
+    image.create_on_demand = False
+    urls = {}
+    for dummy_name, size_key in get_rendition_key_set(rendition_key_set):
+        method, size = size_key.split('__')
+        url = getattr(image, method)[size].url
+        urls[get_thumbnail_url_key(image, method, size)] = url
+    cache.set_many(urls, THUMBNAIL_URL_CACHE_TIMEOUT)
+
+
+def warm_thumbnails(queryset, image_attr, rendition_key_set):
+    """Create missing thumbnails of a rendition key set and record their URLs.
+
+    Thumbnails already present in storage are not created again. Return
+    the number of warmed images and names of images that failed.
+    """
+    size_keys = [
+        size_key for dummy_name, size_key in get_rendition_key_set(
+            rendition_key_set)]
+    num_images = 0
+    failed = []
+    for instance in queryset.iterator():
+        image = getattr(instance, image_attr)
+        if not image.name:
+            continue
+        image.create_on_demand = True
+        try:
+            for size_key in size_keys:
+                method, size = size_key.split('__')
+                getattr(image, method)[size]
+        except Exception:
+            logger.exception(
+                'Thumbnail generation failed', extra={'path': image.name})
+            failed.append(image.name)
+        else:
+            cache_thumbnail_urls(image, rendition_key_set)
+            num_images += 1
+    return num_images, failed
@@ -0,0 +1,58 @@
+import threading
+from functools import partial
+
+from django.db import transaction
+
+
+class OnCommitQueue:
+    """Items queued during a transaction and handled once it commits.
+
+    All items queued by a transaction are collected in a set passed to
+    `handle` once after the commit, so saving many objects handles them
+    together. Items of a rolled back transaction are dropped along with
+    its on-commit callback and never reach later transactions. Outside of
+    transactions items are handled right away.
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.local = threading.local()
+
+    def get_callback(self):
+        """Return the callback registered by the current transaction."""
+        callback = getattr(self.local, 'callback', None)
+        if callback is None:
+            return None
+        connection = transaction.get_connection()
+        if any(func is callback for _, func in connection.run_on_commit):
+            return callback
+        return None
+
+    def get_items(self):
+        """Return items queued by the current transaction."""
+        callback = self.get_callback()
+        return set(callback.args[0]) if callback is not None else set()
+
+    def add(self, items):
+        callback = self.get_callback()
+        if callback is not None:
+            callback.args[0].update(items)
+            return
+        callback = partial(self.run, set(items))
+        self.local.callback = callback
+        transaction.on_commit(callback)
+
+    def run(self, items):
+        queued = set(items)
+        items.clear()
+        if queued:
+            self.handle(queued)
+
+    def flush(self):
+        """Handle items queued by the current transaction right away.
+
+        Used where transactions never commit, like in tests.
+        """
+        callback = self.get_callback()
+        if callback is not None:
+            callback()
@@ -9,7 +9,6 @@ from django.utils.translation import pgettext_lazy
 
 from ...core.utils import get_paginator_items
 from ...product.models import Category
-from ..menu.utils import get_menus_that_needs_update, update_menus
 from ..views import staff_member_required
 from .filters import CategoryFilter
 from .forms import CategoryForm
@@ -101,11 +100,7 @@ def category_details(request, pk):
 def category_delete(request, pk):
     category = get_object_or_404(Category, pk=pk)
     if request.method == 'POST':
-        descendants = category.get_descendants()
-        menus = get_menus_that_needs_update(categories=descendants)
         category.delete()
-        if menus:
-            update_menus(menus)
         messages.success(
             request,
             pgettext_lazy(
@@ -1,4 +1,5 @@
 from django import forms
+from django.db import transaction
 from django.urls import reverse_lazy
 from django.utils.translation import pgettext_lazy
 
@@ -114,6 +115,7 @@ class ReorderMenuItemsForm(forms.ModelForm):
             else self.instance.items.filter(parent=None))
         self.fields['ordered_menu_items'].queryset = qs
 
+    @transaction.atomic
     def save(self):
         for sort_order, menu_item in enumerate(
                 self.cleaned_data['ordered_menu_items']):
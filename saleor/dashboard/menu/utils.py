@@ -1,8 +1,11 @@
-from django.db.models import Q
+from collections import defaultdict
+
 from django.utils.formats import localize
 from django.utils.translation import pgettext
 
-from ...menu.models import Menu, MenuItem
+from ...core.utils.cache import invalidate_on_commit
+from ...menu.models import Menu
+from ...menu.utils import invalidate_menu_cache
 from ...page.models import Page
 from ...product.models import Category, Collection
 
@@ -36,32 +39,27 @@ def get_menu_item_as_dict(menu_item):
     return data
 
 
+def get_menu_items_as_dicts(items_by_parent, parent_pk=None):
+    items_data = []
+    for item in items_by_parent[parent_pk]:
+        item_data = get_menu_item_as_dict(item)
+        item_data['child_items'] = get_menu_items_as_dicts(
+            items_by_parent, item.pk)
+        items_data.append(item_data)
+    return items_data
+
+
 def get_menu_as_json(menu):
-    """Builds Tree-like structure from top menu items,
-    its children and its grandchildren.
+    """Build a tree-like structure of menu items of any depth.
+
+    All items are fetched in a single query joining their linked objects.
     """
-    top_items = menu.items.filter(
-        parent=None).prefetch_related(
-            'category', 'page', 'collection',
-            'children__category', 'children__page', 'children__collection',
-            'children__children__category', 'children__children__page',
-            'children__children__collection', 'translations',
-            'children__translations', 'children__children__translations')
-    menu_data = []
-    for item in top_items:
-        top_item_data = get_menu_item_as_dict(item)
-        top_item_data['child_items'] = []
-        children = item.children.all()
-        for child in children:
-            child_data = get_menu_item_as_dict(child)
-            grand_children = child.children.all()
-            grand_children_data = [
-                get_menu_item_as_dict(grand_child)
-                for grand_child in grand_children]
-            child_data['child_items'] = grand_children_data
-            top_item_data['child_items'].append(child_data)
-        menu_data.append(top_item_data)
-    return menu_data
+    items = menu.items.select_related(
+        'category', 'collection', 'page').prefetch_related('translations')
+    items_by_parent = defaultdict(list)
+    for item in items:
+        items_by_parent[item.parent_id].append(item)
+    return get_menu_items_as_dicts(items_by_parent)
 
 
 def update_menus(menus_pk):
@@ -73,25 +71,7 @@ def update_menus(menus_pk):
 def update_menu(menu):
     menu.json_content = get_menu_as_json(menu)
     menu.save(update_fields=['json_content'])
-
-
-def get_menus_that_needs_update(collection=None, categories=None, page=None):
-    """Returns PrimaryKeys of Menu instances that will be affected by
-    deleting one of the listed objects, therefore needs to be updated
-    afterwards.
-    """
-    if not any([page, collection, categories]):
-        return []
-    q = Q()
-    if collection is not None:
-        q |= Q(collection=collection)
-    if categories is not None:
-        q |= Q(category__in=categories)
-    if page is not None:
-        q |= Q(page=page)
-    menus_to_be_updated = MenuItem.objects.filter(q).distinct().values_list(
-        'menu', flat=True)
-    return menus_to_be_updated
+    invalidate_on_commit(invalidate_menu_cache, menu.pk)
 
 
 def get_menu_obj_text(obj):
@@ -15,7 +15,7 @@ from ...product.models import Category, Collection
 from ..views import staff_member_required
 from .filters import MenuFilter, MenuItemFilter
 from .forms import AssignMenuForm, MenuForm, MenuItemForm, ReorderMenuItemsForm
-from .utils import get_menu_obj_text, update_menu
+from .utils import get_menu_obj_text
 
 
 @staff_member_required
@@ -120,7 +120,6 @@ def menu_item_create(request, menu_pk, root_pk=None):
         msg = pgettext_lazy(
             'Dashboard message', 'Added menu item %s') % (menu_item,)
         messages.success(request, msg)
-        update_menu(menu)
         if root_pk:
             return redirect(
                 'dashboard:menu-item-details',
@@ -140,7 +139,6 @@ def menu_item_edit(request, menu_pk, item_pk):
     form = MenuItemForm(request.POST or None, instance=menu_item)
     if form.is_valid():
         menu_item = form.save()
-        update_menu(menu)
         msg = pgettext_lazy(
             'Dashboard message', 'Saved menu item %s') % (menu_item,)
         messages.success(request, msg)
@@ -158,7 +156,6 @@ def menu_item_delete(request, menu_pk, item_pk):
     menu_item = get_object_or_404(menu.items.all(), pk=item_pk)
     if request.method == 'POST':
         menu_item.delete()
-        update_menu(menu)
         msg = pgettext_lazy(
             'Dashboard message', 'Removed menu item %s') % (menu_item,)
         messages.success(request, msg)
@@ -211,7 +208,6 @@ def ajax_reorder_menu_items(request, menu_pk, root_pk=None):
     ctx = {}
     if form.is_valid():
         form.save()
-        update_menu(menu)
     elif form.errors:
         status = 400
         ctx = {'error': form.errors}
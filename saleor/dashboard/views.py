@@ -2,13 +2,12 @@ from django.conf import settings
 from django.contrib.admin.views.decorators import (
     staff_member_required as _staff_member_required, user_passes_test)
 from django.contrib.auth import REDIRECT_FIELD_NAME
-from django.db.models import Q, Sum
 from django.template.response import TemplateResponse
 
 from ..order.models import Order
 from ..payment import ChargeStatus
 from ..payment.models import Payment
-from ..product.models import Product
+from ..product.models import Product, ProductVariant
 
 
 def staff_member_required(f):
@@ -54,6 +53,7 @@ def styleguide(request):
 
 def get_low_stock_products():
     threshold = getattr(settings, 'LOW_STOCK_THRESHOLD', 10)
-    products = Product.objects.annotate(
-        total_stock=Sum('variants__quantity'))
-    return products.filter(Q(total_stock__lte=threshold)).distinct()
+    products = Product.objects.select_related('summary')
+    return products.filter(
+        summary__quantity__lte=threshold,
+        pk__in=ProductVariant.objects.values('product_id'))
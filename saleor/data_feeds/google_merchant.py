@@ -1,26 +1,44 @@
 import csv
 import gzip
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.contrib.syndication.views import add_domain
 from django.core.files.storage import default_storage
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.encoding import smart_text
 
-from ..discount.models import Sale
+from ..core.utils.rendered_text import render_field
+from ..discount.utils import get_sale_index
 from ..product.models import (
-    Attribute, AttributeValue, Category, ProductVariant)
+    Attribute, AttributeValue, Collection, ProductVariant)
 
 CATEGORY_SEPARATOR = ' > '
 
 FILE_PATH = 'google-feed.csv.gz'
+STATE_FILE_PATH = 'google-feed.state.csv.gz'
+
+CHUNK_SIZE = 500
 
 ATTRIBUTES = ['id', 'title', 'product_type', 'google_product_category',
               'link', 'image_link', 'condition', 'availability',
               'price', 'tax', 'sale_price', 'mpn', 'brand', 'item_group_id',
               'gender', 'age_group', 'color', 'size', 'description']
 
+# Besides the feed columns the state file keeps the variant's primary key,
+# the sales that applied to it and when the row was computed, which is
+# enough to tell whether a row can be reused by an incremental rebuild
+STATE_ATTRIBUTES = ['pk', 'sales', 'updated_at'] + ATTRIBUTES
+
+_context = None
+
 
 def get_feed_file_url():
     return default_storage.url(FILE_PATH)
@@ -30,7 +48,7 @@ def get_feed_items():
     items = ProductVariant.objects.all()
     items = items.select_related('product')
     items = items.prefetch_related(
-        'images', 'product__category',
+        'images', 'product__category', 'product__collections',
         'product__images', 'product__product_type__product_attributes',
         'product__product_type__variant_attributes')
     return items
@@ -59,7 +77,7 @@ def item_title(item):
 
 
 def item_description(item):
-    return item.product.description[:100]
+    return render_field(item.product, 'description', 'plain')[:100]
 
 
 def item_condition(item):
@@ -191,31 +209,221 @@ def item_attributes(item, categories, category_paths, current_site,
     return product_data
 
 
-def write_feed(file_obj):
-    """Write feed contents info provided file object."""
-    writer = csv.DictWriter(file_obj, ATTRIBUTES, dialect=csv.excel_tab)
+def get_feed_context():
+    """Return data shared by all rows of a feed."""
+    return {
+        'attributes_dict': {a.slug: a.pk for a in Attribute.objects.all()},
+        'attribute_values_dict': {
+            smart_text(a.pk): smart_text(a)
+            for a in AttributeValue.objects.all()},
+        'category_paths': {},
+        'current_site': Site.objects.get_current(),
+        'discounts': get_sale_index(date.today())}
+
+
+def get_chunk_bounds(chunk_size=CHUNK_SIZE):
+    """Yield (first, last) primary keys of consecutive chunks of variants.
+
+    Primary keys are streamed with a server-side cursor, so only the
+    bounds of every chunk are kept in memory.
+    """
+    pks = ProductVariant.objects.order_by('pk').values_list('pk', flat=True)
+    first = last = None
+    count = 0
+    for pk in pks.iterator(chunk_size=chunk_size):
+        if first is None:
+            first = pk
+        last = pk
+        count += 1
+        if count == chunk_size:
+            yield first, last
+            first = None
+            count = 0
+    if first is not None:
+        yield first, last
+
+
+def get_sales_key(sales):
+    """Return a string identifying the sales and their discounts."""
+    return ','.join(sorted(
+        '%s:%s:%s' % (sale.pk, sale.type, sale.value) for sale in sales))
+
+
+def get_item_state(item, context, updated_at):
+    discounts = context['discounts']
+    data = item_attributes(
+        item, None, context['category_paths'], context['current_site'],
+        discounts, context['attributes_dict'],
+        context['attribute_values_dict'])
+    sales = discounts.get_product_sales(item.product) if discounts else ()
+    data.update({
+        'pk': str(item.pk), 'sales': get_sales_key(sales),
+        'updated_at': updated_at.isoformat()})
+    return data
+
+
+def get_chunk_state(bounds, updated_at, previous=None, context=None):
+    """Return state rows of variants within the given primary key bounds.
+
+    If `previous` state rows are given, keyed by variant primary key, only
+    rows of variants whose own or product's `updated_at` is newer than the
+    row or whose applicable sales changed are computed again. Availability
+    is refreshed for every row as stock changes do not touch `updated_at`.
+    """
+    context = context or _context
+    first, last = bounds
+    if previous is None:
+        items = get_feed_items().filter(pk__gte=first, pk__lte=last)
+        return [
+            get_item_state(item, context, updated_at)
+            for item in items.order_by('pk')]
+
+    variants = list(
+        ProductVariant.objects.filter(
+            pk__gte=first, pk__lte=last).order_by('pk').values_list(
+                'pk', 'updated_at', 'product_id', 'product__updated_at',
+                'product__category_id', 'quantity', 'quantity_allocated'))
+    collections = {}
+    discounts = context['discounts']
+    if discounts and discounts.collection_sales:
+        product_collections = Collection.products.through.objects.filter(
+            product_id__in={variant[2] for variant in variants}).values_list(
+                'product_id', 'collection_id')
+        for product_id, collection_id in product_collections:
+            collections.setdefault(product_id, []).append(collection_id)
+
+    rows = {}
+    for (pk, variant_updated_at, product_id, product_updated_at,
+         category_id, quantity, quantity_allocated) in variants:
+        row = previous.get(str(pk))
+        if row is None:
+            continue
+        row_updated_at = parse_datetime(row['updated_at'])
+        sales = discounts.get_sales(
+            product_id, category_id,
+            collections.get(product_id, ())) if discounts else ()
+        is_changed = (
+            row['sales'] != get_sales_key(sales) or any(
+                value is not None and value > row_updated_at
+                for value in (variant_updated_at, product_updated_at)))
+        if not is_changed:
+            row['availability'] = (
+                'in stock' if quantity > quantity_allocated
+                else 'out of stock')
+            rows[pk] = row
+
+    items = get_feed_items().filter(
+        pk__gte=first, pk__lte=last).exclude(pk__in=rows)
+    for item in items:
+        rows[item.pk] = get_item_state(item, context, updated_at)
+    return [rows[pk] for pk, *_ in variants if pk in rows]
+
+
+def _init_worker():
+    global _context
+    _context = get_feed_context()
+
+
+def iter_state(updated_at, previous_state=None, workers=1,
+               chunk_size=CHUNK_SIZE):
+    """Yield state rows of all variants ordered by primary key.
+
+    Chunks are processed by a pool of `workers` processes. At most two
+    chunks per worker are pending at any time and results are consumed in
+    order, which keeps memory usage bounded regardless of catalog size.
+    """
+    previous_rows = iter(previous_state) if previous_state else None
+    row = None
+
+    def get_previous(bounds):
+        nonlocal row
+        if previous_rows is None:
+            return None
+        rows = {}
+        first, last = bounds
+        while True:
+            if row is None:
+                row = next(previous_rows, None)
+                if row is None:
+                    return rows
+            pk = int(row['pk'])
+            if pk > last:
+                return rows
+            if pk >= first:
+                rows[row['pk']] = row
+            row = None
+
+    chunks = get_chunk_bounds(chunk_size)
+    if workers <= 1:
+        context = get_feed_context()
+        for bounds in chunks:
+            yield from get_chunk_state(
+                bounds, updated_at, get_previous(bounds), context)
+        return
+
+    # Worker processes must not share the parent's database connections
+    chunks = list(chunks)
+    connections.close_all()
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for bounds in chunks:
+            pending.append(executor.submit(
+                get_chunk_state, bounds, updated_at, get_previous(bounds)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_feed(file_obj, state_file=None, previous_state=None, workers=1,
+               chunk_size=CHUNK_SIZE):
+    """Write feed contents info provided file object.
+
+    If `state_file` is given, rows are also written there together with
+    data required by incremental rebuilds, see `update_feed`.
+    """
+    writer = csv.DictWriter(
+        file_obj, ATTRIBUTES, dialect=csv.excel_tab, extrasaction='ignore')
     writer.writeheader()
-    categories = Category.objects.all()
-    discounts = Sale.objects.active(date.today()).prefetch_related(
-        'products', 'categories')
-    attributes_dict = {a.slug: a.pk for a in Attribute.objects.all()}
-    attribute_values_dict = {smart_text(a.pk): smart_text(a) for a
-                             in AttributeValue.objects.all()}
-    category_paths = {}
-    current_site = Site.objects.get_current()
-    for item in get_feed_items():
-        item_data = item_attributes(item, categories, category_paths,
-                                    current_site, discounts, attributes_dict,
-                                    attribute_values_dict)
-        writer.writerow(item_data)
-
-
-def update_feed(file_path=FILE_PATH):
+    state_writer = None
+    if state_file is not None:
+        state_writer = csv.DictWriter(
+            state_file, STATE_ATTRIBUTES, dialect=csv.excel_tab)
+        state_writer.writeheader()
+    state = iter_state(
+        timezone.now(), previous_state, workers=workers,
+        chunk_size=chunk_size)
+    for row in state:
+        writer.writerow(row)
+        if state_writer is not None:
+            state_writer.writerow(row)
+
+
+def update_feed(file_path=FILE_PATH, state_file_path=STATE_FILE_PATH,
+                incremental=False, workers=1, chunk_size=CHUNK_SIZE):
     """Save updated feed into path provided as argument.
 
-    Default path is defined in module as FILE_PATH.
+    Default path is defined in module as FILE_PATH. The state of the feed
+    is saved alongside it, so an `incremental` update only computes rows
+    of variants that changed since the previous run. Changes to
+    categories, attributes or site settings are not tracked and require
+    a full update.
     """
-    with default_storage.open(file_path, 'wb') as output_file:
-        output = gzip.open(output_file, 'wt')
-        write_feed(output)
-        output.close()
+    with tempfile.TemporaryFile() as previous_file:
+        previous_state = None
+        if incremental and default_storage.exists(state_file_path):
+            # Copy the previous state, it's overwritten while being read
+            with default_storage.open(state_file_path, 'rb') as state_file:
+                shutil.copyfileobj(state_file, previous_file)
+            previous_file.seek(0)
+            previous_state = csv.DictReader(
+                gzip.open(previous_file, 'rt'), dialect=csv.excel_tab)
+        with default_storage.open(file_path, 'wb') as output_file, \
+                default_storage.open(state_file_path, 'wb') as state_file:
+            output = gzip.open(output_file, 'wt')
+            state_output = gzip.open(state_file, 'wt')
+            write_feed(
+                output, state_output, previous_state, workers=workers,
+                chunk_size=chunk_size)
+            output.close()
+            state_output.close()
@@ -1,10 +1,32 @@
 from django.core.management import BaseCommand
 
-from ...google_merchant import update_feed
+from ...google_merchant import CHUNK_SIZE, update_feed
 
 
 class Command(BaseCommand):
     help = 'Update Google merchant feed'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            dest='incremental',
+            default=False,
+            help='Only recompute rows of variants changed since last update')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            dest='workers',
+            default=1,
+            help='Number of processes generating the feed')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            dest='chunk_size',
+            default=CHUNK_SIZE,
+            help='Number of variants processed at once by a worker')
+
     def handle(self, *args, **options):
-        update_feed()
+        update_feed(
+            incremental=options['incremental'], workers=options['workers'],
+            chunk_size=options['chunk_size'])
@@ -1,8 +1,16 @@
-from django.db.models import F
+from collections import defaultdict
+
+from django.db.models import F, Q
 from django.utils.translation import pgettext
 
+from ..core.utils.cache import bump_version, get_version
 from ..core.utils.taxes import ZERO_MONEY, ZERO_TAXED_MONEY
-from .models import NotApplicable
+from .models import NotApplicable, Sale
+
+SALE_INDEX_VERSION_KEY = 'discount:sale-index-version'
+
+# The date, version and index last built by the process
+SALE_INDEX_CACHE = None
 
 
 def increase_voucher_usage(voucher):
@@ -47,8 +55,132 @@ def get_product_discount_on_sale(sale, product):
             'Discount not applicable for this product'))
 
 
+class SaleIndex:
+    """Precompiled lookup of the sales applicable to a product.
+
+    Sales are indexed by product, by category (with every descendant of
+    a discounted category already expanded) and by collection, so finding
+    the discounts of a product requires no database queries apart from
+    fetching the product's collections when any sale targets collections.
+    Iterating over the index yields the active sales.
+    """
+
+    def __init__(
+            self, sales, product_sales, category_sales, collection_sales):
+        self.sales = sales
+        self.product_sales = product_sales
+        self.category_sales = category_sales
+        self.collection_sales = collection_sales
+        self.discounts = {sale.pk: sale.get_discount() for sale in sales}
+
+    def __iter__(self):
+        return iter(self.sales)
+
+    def __len__(self):
+        return len(self.sales)
+
+    def get_product_sales(self, product):
+        """Return a set of sales applicable to a product."""
+        collection_ids = ()
+        if self.collection_sales:
+            collection_ids = [
+                collection.pk for collection in product.collections.all()]
+        return self.get_sales(
+            product.pk, product.category_id, collection_ids)
+
+    def get_sales(self, product_id, category_id, collection_ids=()):
+        """Return a set of sales applicable to a product given its keys."""
+        sales = set(self.product_sales.get(product_id, ()))
+        sales.update(self.category_sales.get(category_id, ()))
+        for collection_id in collection_ids:
+            sales.update(self.collection_sales.get(collection_id, ()))
+        return sales
+
+    def get_product_discounts(self, product):
+        """Return discount values for all sales applicable to a product."""
+        return [
+            self.discounts[sale.pk]
+            for sale in self.get_product_sales(product)]
+
+
+def build_sale_index(date):
+    """Return a `SaleIndex` for sales active at the given date."""
+    from ..product.models import Category
+
+    sales = list(Sale.objects.active(date))
+    sales_by_pk = {sale.pk: sale for sale in sales}
+
+    product_sales = defaultdict(list)
+    sale_products = Sale.products.through.objects.filter(
+        sale_id__in=sales_by_pk).values_list('sale_id', 'product_id')
+    for sale_id, product_id in sale_products:
+        product_sales[product_id].append(sales_by_pk[sale_id])
+
+    collection_sales = defaultdict(list)
+    sale_collections = Sale.collections.through.objects.filter(
+        sale_id__in=sales_by_pk).values_list('sale_id', 'collection_id')
+    for sale_id, collection_id in sale_collections:
+        collection_sales[collection_id].append(sales_by_pk[sale_id])
+
+    category_sales = defaultdict(list)
+    sale_category_ranges = Sale.categories.through.objects.filter(
+        sale_id__in=sales_by_pk).values_list(
+            'sale_id', 'category__tree_id', 'category__lft',
+            'category__rght')
+    ranges_by_tree = defaultdict(list)
+    lookup = Q()
+    for sale_id, tree_id, lft, rght in sale_category_ranges:
+        ranges_by_tree[tree_id].append((lft, rght, sales_by_pk[sale_id]))
+        lookup |= Q(tree_id=tree_id, lft__gte=lft, rght__lte=rght)
+    if ranges_by_tree:
+        categories = Category.objects.filter(lookup).values_list(
+            'pk', 'tree_id', 'lft')
+        for category_id, tree_id, category_lft in categories:
+            category_sales[category_id] = list({
+                sale for lft, rght, sale in ranges_by_tree[tree_id]
+                if lft <= category_lft <= rght})
+
+    return SaleIndex(
+        sales, dict(product_sales), dict(category_sales),
+        dict(collection_sales))
+
+
+def get_sale_index_version():
+    return get_version(SALE_INDEX_VERSION_KEY)
+
+
+def get_sale_index(date):
+    """Return a `SaleIndex` for the given date.
+
+    The index is cached at the process level and rebuilt whenever the date
+    or the shared version key changes, see `invalidate_sale_index`. Only
+    the last index is kept, so indexes of past days are dropped.
+    """
+    global SALE_INDEX_CACHE
+    version = get_sale_index_version()
+    cached = SALE_INDEX_CACHE
+    if cached is not None and cached[:2] == (date, version):
+        return cached[2]
+    index = build_sale_index(date)
+    SALE_INDEX_CACHE = (date, version, index)
+    return index
+
+
+def invalidate_sale_index():
+    """Force all processes to rebuild their sale indexes."""
+    bump_version(SALE_INDEX_VERSION_KEY)
+
+
+def clear_sale_index_cache():
+    global SALE_INDEX_CACHE
+    SALE_INDEX_CACHE = None
+
+
 def get_product_discounts(product, discounts):
     """Return discount values for all discounts applicable to a product."""
+    if isinstance(discounts, SaleIndex):
+        yield from discounts.get_product_discounts(product)
+        return
     for discount in discounts:
         try:
             yield get_product_discount_on_sale(discount, product)
@@ -78,11 +210,18 @@ def get_shipping_voucher_discount(voucher, total_price, shipping_price):
 
 
 def get_products_voucher_discount(voucher, prices):
-    """Calculate discount value for a voucher of product or category type."""
+    """Calculate discount value for a voucher of product or category type.
+
+    `prices` is an iterable of (unit price, quantity) pairs, so the cost
+    does not depend on quantities.
+    """
     if voucher.apply_once_per_order:
-        product_total = sum(prices, ZERO_TAXED_MONEY)
+        product_total = sum(
+            (price * quantity for price, quantity in prices),
+            ZERO_TAXED_MONEY)
         return voucher.get_discount_amount_for(product_total)
     discounts = (
-        voucher.get_discount_amount_for(price) for price in prices)
+        voucher.get_discount_amount_for(price) * quantity
+        for price, quantity in prices)
     total_amount = sum(discounts, ZERO_MONEY)
     return total_amount
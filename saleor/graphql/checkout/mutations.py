@@ -1,15 +1,17 @@
 import graphene
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 from ...checkout import models
 from ...checkout.utils import (
-    add_variant_to_cart, change_billing_address_in_cart,
+    add_variants_to_cart, change_billing_address_in_cart,
     change_shipping_address_in_cart, create_order, get_taxes_for_cart,
-    ready_to_place_order)
+    ready_to_place_order, update_cart_quantity)
 from ...core import analytics
 from ...core.exceptions import InsufficientStock
 from ...core.utils.taxes import get_taxes_for_address
+from ...order.models import Order as OrderModel
 from ...payment import PaymentError
+from ...payment.tasks import process_payment
 from ...payment.utils import gateway_authorize, gateway_capture, gateway_void
 from ...shipping.models import ShippingMethod as ShippingMethodModel
 from ..account.i18n import I18nMixin
@@ -141,8 +143,7 @@ class CheckoutCreate(ModelMutation, I18nMixin):
         variants = cleaned_input.get('variants')
         quantities = cleaned_input.get('quantities')
         if variants and quantities:
-            for variant, quantity in zip(variants, quantities):
-                add_variant_to_cart(instance, variant, quantity)
+            add_variants_to_cart(instance, zip(variants, quantities))
 
 
 class CheckoutLinesAdd(BaseMutation):
@@ -182,9 +183,8 @@ class CheckoutLinesAdd(BaseMutation):
                     cls.add_error(errors, field=err[0], message=err[1])
 
         if variants and quantities:
-            for variant, quantity in zip(variants, quantities):
-                add_variant_to_cart(
-                    checkout, variant, quantity, replace=replace)
+            add_variants_to_cart(
+                checkout, zip(variants, quantities), replace=replace)
 
         # FIXME test if below function is called
         clean_shipping_method(
@@ -229,6 +229,7 @@ class CheckoutLineDelete(BaseMutation):
             info, line_id, errors, 'line_id', only_type=CheckoutLine)
         if line and line in checkout.lines.all():
             line.delete()
+            update_cart_quantity(checkout)
 
         # FIXME test if below function is called
         clean_shipping_method(
@@ -241,6 +242,43 @@ class CheckoutLineDelete(BaseMutation):
         return CheckoutLineDelete(checkout=checkout, errors=errors)
 
 
+class CheckoutLinesDelete(BaseMutation):
+    checkout = graphene.Field(Checkout, description='An updated checkout.')
+
+    class Arguments:
+        checkout_id = graphene.ID(
+            description='The ID of the Checkout.', required=True)
+        line_ids = graphene.List(
+            graphene.ID, required=True,
+            description='IDs of the CheckoutLines to delete.')
+
+    class Meta:
+        description = 'Deletes many CheckoutLines at once.'
+
+    @classmethod
+    def mutate(cls, root, info, checkout_id, line_ids):
+        errors = []
+        checkout = cls.get_node_or_error(
+            info, checkout_id, errors, 'checkout_id', only_type=Checkout)
+        if not checkout:
+            return CheckoutLinesDelete(errors=errors)
+        lines = cls.get_nodes_or_error(
+            line_ids, errors, 'line_ids', only_type=CheckoutLine)
+        if lines:
+            checkout.lines.filter(pk__in=[line.pk for line in lines]).delete()
+            update_cart_quantity(checkout)
+
+        # FIXME test if below function is called
+        clean_shipping_method(
+            checkout=checkout, method=checkout.shipping_method, errors=errors,
+            discounts=info.context.discounts,
+            taxes=get_taxes_for_address(checkout.shipping_address))
+        if errors:
+            return CheckoutLinesDelete(errors=errors)
+
+        return CheckoutLinesDelete(checkout=checkout, errors=errors)
+
+
 class CheckoutCustomerAttach(BaseMutation):
     checkout = graphene.Field(Checkout, description='An updated checkout.')
 
@@ -418,6 +456,16 @@ class CheckoutComplete(BaseMutation):
 
     class Arguments:
         checkout_id = graphene.ID(description='Checkout ID')
+        asynchronous = graphene.Boolean(
+            description=(
+                'Place the order immediately and process the payment in the '
+                'background. Poll the order\'s payment status for the '
+                'result.'))
+        idempotency_key = graphene.String(
+            description=(
+                'Unique key of this checkout attempt. Retrying the same '
+                'checkout with the same key returns the already placed '
+                'order instead of placing and charging it again.'))
 
     class Meta:
         description = (
@@ -425,12 +473,26 @@ class CheckoutComplete(BaseMutation):
             'charges the customer\'s funding source.')
 
     @classmethod
-    def mutate(cls, root, info, checkout_id):
+    def get_placed_order(cls, checkout, idempotency_key):
+        if not idempotency_key:
+            return None
+        return OrderModel.objects.filter(
+            checkout_token=str(checkout.token),
+            idempotency_key=idempotency_key).first()
+
+    @classmethod
+    def mutate(
+            cls, root, info, checkout_id, asynchronous=False,
+            idempotency_key=None):
         errors = []
         checkout = cls.get_node_or_error(
             info, checkout_id, errors, 'checkout_id', only_type=Checkout)
         if not checkout:
             return CheckoutComplete(errors=errors)
+        order = cls.get_placed_order(checkout, idempotency_key)
+        if order:
+            return CheckoutComplete(order=order, errors=errors)
+
         taxes = get_taxes_for_cart(checkout, info.context.taxes)
         ready, checkout_error = ready_to_place_order(
             checkout, taxes, info.context.discounts)
@@ -442,17 +504,29 @@ class CheckoutComplete(BaseMutation):
             order = create_order(
                 cart=checkout,
                 tracking_code=analytics.get_client_id(info.context),
-                discounts=info.context.discounts, taxes=taxes)
+                discounts=info.context.discounts, taxes=taxes,
+                idempotency_key=idempotency_key)
         except InsufficientStock:
             order = None
             cls.add_error(
                 field=None, message='Insufficient product stock.',
                 errors=errors)
+        except IntegrityError:
+            # a concurrent request with the same key placed the order first
+            order = cls.get_placed_order(checkout, idempotency_key)
+            if order is None:
+                raise
+            return CheckoutComplete(order=order, errors=errors)
 
         payment = checkout.payments.filter(is_active=True).first()
         # FIXME there could be a situation where order was created but payment
         # failed. we should cancel/delete the order at this moment I think
 
+        if asynchronous and order:
+            transaction.on_commit(
+                lambda: process_payment.delay(payment.pk))
+            return CheckoutComplete(order=order, errors=errors)
+
         # authorize payment
         try:
             gateway_authorize(payment, payment.token)
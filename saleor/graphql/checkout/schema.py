@@ -1,5 +1,4 @@
 import graphene
-from graphene_django.fields import DjangoConnectionField
 from graphql_jwt.decorators import permission_required
 
 from ..core.fields import PrefetchingConnectionField
@@ -7,7 +6,8 @@ from ..payment.mutations import CheckoutPaymentCreate
 from .mutations import (
     CheckoutBillingAddressUpdate, CheckoutComplete, CheckoutCreate,
     CheckoutCustomerAttach, CheckoutCustomerDetach, CheckoutEmailUpdate,
-    CheckoutLineDelete, CheckoutLinesAdd, CheckoutLinesUpdate,
+    CheckoutLineDelete, CheckoutLinesAdd, CheckoutLinesDelete,
+    CheckoutLinesUpdate,
     CheckoutShippingAddressUpdate, CheckoutShippingMethodUpdate)
 from .resolvers import (
     resolve_checkout, resolve_checkout_lines, resolve_checkouts)
@@ -19,7 +19,7 @@ class CheckoutQueries(graphene.ObjectType):
         Checkout, description='Single checkout.',
         token=graphene.Argument(graphene.UUID))
     # FIXME we could optimize the below field
-    checkouts = DjangoConnectionField(
+    checkouts = PrefetchingConnectionField(
         Checkout, description='List of checkouts.')
     checkout_line = graphene.Field(
         CheckoutLine, id=graphene.Argument(graphene.ID),
@@ -51,6 +51,7 @@ class CheckoutMutations(graphene.ObjectType):
     checkout_email_update = CheckoutEmailUpdate.Field()
     checkout_line_delete = CheckoutLineDelete.Field()
     checkout_lines_add = CheckoutLinesAdd.Field()
+    checkout_lines_delete = CheckoutLinesDelete.Field()
     checkout_lines_update = CheckoutLinesUpdate.Field()
     checkout_payment_create = CheckoutPaymentCreate.Field()
     checkout_shipping_address_update = CheckoutShippingAddressUpdate.Field()
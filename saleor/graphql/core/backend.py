@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from functools import partial
+from hashlib import sha256
+
+from django.conf import settings
+from graphql.backend.base import GraphQLBackend, GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+from graphql.language.base import parse
+from graphql.validation import validate
+
+
+def get_query_hash(query):
+    return sha256(query.encode('utf-8')).hexdigest()
+
+
+def return_errors(errors, *args, **kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+class CachedDocumentBackend(GraphQLBackend):
+    """Backend that parses and validates every query document only once.
+
+    Documents are kept in a process-level LRU cache keyed by the SHA-256
+    hash of the query, which is also the hash clients send instead of the
+    query when using automatic persisted queries.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_max_size(self):
+        if self.max_size is not None:
+            return self.max_size
+        return settings.GRAPHQL_DOCUMENT_CACHE_SIZE
+
+    def document_from_string(self, schema, document_string):
+        query_hash = get_query_hash(document_string)
+        document = self.get_document(schema, query_hash)
+        if document is None:
+            document = self.build_document(schema, document_string)
+            self.add_document(schema, query_hash, document)
+        return document
+
+    def get_document(self, schema, query_hash):
+        """Return a cached document or None if the hash is unknown."""
+        key = (schema, query_hash)
+        with self.lock:
+            document = self.documents.get(key)
+            if document is not None:
+                self.documents.move_to_end(key)
+        return document
+
+    def add_document(self, schema, query_hash, document):
+        with self.lock:
+            self.documents[(schema, query_hash)] = document
+            while len(self.documents) > self.get_max_size():
+                self.documents.popitem(last=False)
+
+    def build_document(self, schema, document_string):
+        document_ast = parse(document_string)
+        errors = validate(schema, document_ast)
+        if errors:
+            execute_document = partial(return_errors, errors)
+        else:
+            execute_document = partial(execute, schema, document_ast)
+        return GraphQLDocument(
+            schema=schema, document_string=document_string,
+            document_ast=document_ast, execute=execute_document)
+
+    def clear(self):
+        with self.lock:
+            self.documents.clear()
+
+
+document_backend = CachedDocumentBackend()
@@ -40,4 +40,6 @@ class CountableConnection(NonNullConnection):
 
     @staticmethod
     def resolve_total_count(root, info, *args, **kwargs):
+        if root.length is None:
+            root.length = root.iterable.count()
         return root.length
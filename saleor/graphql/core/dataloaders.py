@@ -0,0 +1,34 @@
+from promise import Promise
+from promise.dataloader import DataLoader as BaseLoader
+
+
+class DataLoader(BaseLoader):
+    """Batch loader shared by all resolvers of a single request.
+
+    Instantiating a loader returns the instance stored on the request under
+    `context_key`, so keys loaded by resolvers of every node in a list are
+    fetched with a single `batch_load` call. Subclasses implement
+    `batch_load`, which returns a list of values in the order of the keys.
+    """
+
+    context_key = None
+
+    def __new__(cls, context):
+        if cls.context_key is None:
+            raise TypeError('%s has to define a context_key' % cls.__name__)
+        if not hasattr(context, 'dataloaders'):
+            context.dataloaders = {}
+        if cls.context_key not in context.dataloaders:
+            context.dataloaders[cls.context_key] = super().__new__(cls)
+        return context.dataloaders[cls.context_key]
+
+    def __init__(self, context):
+        if getattr(self, 'context', None) is not context:
+            self.context = context
+            super().__init__()
+
+    def batch_load_fn(self, keys):
+        return Promise.resolve(self.batch_load(keys))
+
+    def batch_load(self, keys):
+        raise NotImplementedError
@@ -8,6 +8,9 @@ from graphene_django.fields import DjangoConnectionField
 from graphene.relay import PageInfo
 from graphql_relay.connection.arrayconnection import connection_from_list_slice
 
+from .pagination import (
+    DEFAULT_CONNECTION_SIZE, Page, encode_cursor, get_keyset_ordering,
+    paginate_queryset)
 from .types.common import Weight
 from .types.money import Money, TaxedMoney
 
@@ -28,13 +31,42 @@ def convert_field_measurements(field, registry=None):
 
 
 class PrefetchingConnectionField(DjangoConnectionField):
+    """Connection field that paginates querysets using keyset cursors.
+
+    Querysets with an ordering that can be expressed as a keyset are
+    paginated by filtering on the sort keys encoded in cursors and the total
+    count is only calculated if `totalCount` is requested. Offset based
+    pagination is used for other iterables, including lists returned by data
+    loaders and querysets with prefetched results, and offset cursors. Pages
+    fetched in advance by data loaders are returned as they are.
+
+    Connections queried without `first` or `last` return the first
+    `DEFAULT_CONNECTION_SIZE` nodes, the size assumed by query cost analysis.
+    """
+
+    @classmethod
+    def connection_resolver(
+            cls, resolver, connection, default_manager, max_limit,
+            enforce_first_or_last, root, info, **args):
+        if args.get('first') is None and args.get('last') is None:
+            args['first'] = DEFAULT_CONNECTION_SIZE
+        return super().connection_resolver(
+            resolver, connection, default_manager, max_limit,
+            enforce_first_or_last, root, info, **args)
 
     @classmethod
     def resolve_connection(cls, connection, default_manager, args, iterable):
         if iterable is None:
             iterable = default_manager
 
-        if isinstance(iterable, QuerySet):
+        if isinstance(iterable, Page):
+            return cls.get_page_connection(connection, iterable)
+
+        if isinstance(iterable, QuerySet) and iterable._result_cache is None:
+            keyset_connection = cls.resolve_keyset_connection(
+                connection, args, iterable)
+            if keyset_connection is not None:
+                return keyset_connection
             _len = iterable.count()
         else:
             _len = len(iterable)
@@ -52,3 +84,33 @@ class PrefetchingConnectionField(DjangoConnectionField):
         connection.iterable = iterable
         connection.length = _len
         return connection
+
+    @classmethod
+    def resolve_keyset_connection(cls, connection, args, queryset):
+        keyset = get_keyset_ordering(queryset)
+        if keyset is None:
+            return None
+        page = paginate_queryset(queryset, keyset, args)
+        if page is None:
+            return None
+        nodes, has_previous_page, has_next_page = page
+        connection = cls.get_page_connection(
+            connection, Page(keyset, nodes, has_previous_page, has_next_page))
+        connection.iterable = queryset
+        return connection
+
+    @classmethod
+    def get_page_connection(cls, connection, page):
+        edges = [
+            connection.Edge(
+                node=node, cursor=encode_cursor(page.keyset, node))
+            for node in page.nodes]
+        page_info = PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=page.has_previous_page,
+            has_next_page=page.has_next_page)
+        connection = connection(edges=edges, page_info=page_info)
+        connection.iterable = page.queryset
+        connection.length = None
+        return connection
@@ -0,0 +1,249 @@
+"""Keyset (cursor) pagination for querysets exposed as Relay connections.
+
+Instead of an offset, the cursor of every edge encodes the values of the
+sort keys of its node, which lets the next page be fetched with
+`WHERE (sort_key, pk) > (...) LIMIT n + 1`, so the cost of a page does not
+depend on how deep into the results it is.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from graphql_relay.utils import base64, unbase64
+from prices import Money
+
+PREFIX = 'keyset:'
+
+# Number of nodes returned by connections queried without `first` or `last`
+DEFAULT_CONNECTION_SIZE = 100
+
+
+class Page:
+    """Nodes of a connection page fetched in advance, e.g. by a data loader.
+
+    The queryset of all nodes of the connection is only used to count them.
+    """
+
+    def __init__(
+            self, keyset, nodes, has_previous_page=False,
+            has_next_page=False, queryset=None):
+        self.keyset = keyset
+        self.nodes = nodes
+        self.has_previous_page = has_previous_page
+        self.has_next_page = has_next_page
+        self.queryset = queryset
+
+
+def get_keyset_ordering(queryset):
+    """Return the ordering of a queryset as a list of (field, desc) pairs.
+
+    The primary key is appended to make the ordering unique. Return None if
+    the queryset is ordered in a way that can not be expressed as a keyset,
+    e.g. by an expression, randomly or by a relation.
+    """
+    query = queryset.query
+    if query.extra_order_by or query.order_by:
+        ordering = query.extra_order_by or query.order_by
+    elif query.default_ordering:
+        ordering = queryset.model._meta.ordering
+    else:
+        ordering = []
+
+    keyset = []
+    for item in ordering:
+        if not isinstance(item, str) or item == '?':
+            return None
+        name = item.lstrip('-')
+        if name in {'pk', 'id', queryset.model._meta.pk.name}:
+            name = 'pk'
+        elif not _is_sortable_field(queryset, name):
+            return None
+        keyset.append((name, item.startswith('-')))
+        if name == 'pk':
+            return keyset
+    keyset.append(('pk', False))
+    return keyset
+
+
+def _is_sortable_field(queryset, name):
+    if name in queryset.query.annotations:
+        return True
+    model = queryset.model
+    parts = name.split('__')
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        if field.is_relation:
+            if index == len(parts) - 1:
+                return False
+            model = field.related_model
+    return True
+
+
+def encode_cursor(keyset, obj):
+    values = [_serialize_value(_get_value(obj, name)) for name, _ in keyset]
+    return base64(PREFIX + json.dumps(values))
+
+
+def decode_cursor(cursor, keyset):
+    """Return sort key values stored in a cursor or None if it's invalid."""
+    try:
+        data = unbase64(cursor)
+    except Exception:
+        return None
+    if not data.startswith(PREFIX):
+        return None
+    try:
+        values = json.loads(data[len(PREFIX):])
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != len(keyset):
+        return None
+    return values
+
+
+def _get_value(obj, name):
+    if name == 'pk':
+        return obj.pk
+    value = obj
+    for part in name.split('__'):
+        value = getattr(value, part, None)
+        if value is None:
+            break
+    return value
+
+
+def _serialize_value(value):
+    if isinstance(value, Money):
+        value = value.amount
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _get_keyset_lookup(keyset, values, reverse=False):
+    """Return a lookup matching rows placed after given sort key values.
+
+    With `reverse` the lookup matches rows placed before them. PostgreSQL
+    puts nulls last in ascending and first in descending order, so nulls
+    are placed after every value when moving towards the end of ascending
+    ordering and towards the beginning of descending ordering.
+    """
+    lookup = Q()
+    equal = Q()
+    for (name, descending), value in zip(keyset, values):
+        nulls_after = descending == reverse
+        if value is None:
+            if not nulls_after:
+                lookup |= equal & Q(**{'%s__isnull' % name: False})
+            equal &= Q(**{'%s__isnull' % name: True})
+            continue
+        if nulls_after:
+            condition = (
+                Q(**{'%s__gt' % name: value}) |
+                Q(**{'%s__isnull' % name: True}))
+        else:
+            condition = Q(**{'%s__lt' % name: value})
+        lookup |= equal & condition
+        equal &= Q(**{name: value})
+    return lookup
+
+
+def _get_order_by(keyset, reverse=False):
+    return [
+        '%s%s' % ('-' if descending != reverse else '', name)
+        for name, descending in keyset]
+
+
+def paginate_queryset(queryset, keyset, args):
+    """Return a page of nodes and page info flags for connection arguments.
+
+    Return None if any of the given cursors is not a keyset cursor, so the
+    caller can fall back to offset based pagination.
+    """
+    first = args.get('first')
+    last = args.get('last')
+    after = args.get('after')
+    before = args.get('before')
+
+    queryset = queryset.order_by(*_get_order_by(keyset))
+    if after:
+        values = decode_cursor(after, keyset)
+        if values is None:
+            return None
+        queryset = queryset.filter(_get_keyset_lookup(keyset, values))
+    if before:
+        values = decode_cursor(before, keyset)
+        if values is None:
+            return None
+        queryset = queryset.filter(
+            _get_keyset_lookup(keyset, values, reverse=True))
+
+    has_previous_page = has_next_page = False
+    if isinstance(first, int):
+        nodes = list(queryset[:first + 1])
+        has_next_page = len(nodes) > first
+        nodes = nodes[:first]
+        if isinstance(last, int):
+            has_previous_page = len(nodes) > last
+            nodes = nodes[-last:] if last else []
+    elif isinstance(last, int):
+        queryset = queryset.order_by(*_get_order_by(keyset, reverse=True))
+        nodes = list(queryset[:last + 1])
+        has_previous_page = len(nodes) > last
+        nodes = nodes[:last][::-1]
+    else:
+        nodes = list(queryset)
+    return nodes, has_previous_page, has_next_page
+
+
+def get_first_page_size(args):
+    """Return the size of the first page requested by connection arguments.
+
+    Return None if the arguments request any other page.
+    """
+    first = args.get('first')
+    if not isinstance(first, int) or any(
+            args.get(name) is not None
+            for name in ['last', 'after', 'before']):
+        return None
+    return first
+
+
+def paginate_partitions(queryset, keyset, partition, first):
+    """Return first pages of all partitions of a queryset in one query.
+
+    Rows are numbered within their partition, given by an expression, using
+    `ROW_NUMBER() OVER (PARTITION BY ...)` and only `first + 1` of each are
+    fetched. Return a dict of pages keyed by partition values, partitions
+    without rows are missing.
+    """
+    order_by = [
+        F(name).desc() if descending else F(name).asc()
+        for name, descending in keyset]
+    queryset = queryset.order_by().annotate(
+        page_partition=partition,
+        page_position=Window(
+            RowNumber(), partition_by=[partition], order_by=order_by))
+    sql, params = queryset.query.sql_with_params()
+    nodes = queryset.model.objects.raw(
+        'SELECT * FROM (%s) AS page WHERE page.page_position <= %%s '
+        'ORDER BY page.page_partition, page.page_position' % sql,
+        params + (first + 1,))
+
+    nodes_by_partition = {}
+    for node in nodes:
+        nodes_by_partition.setdefault(node.page_partition, []).append(node)
+    return {
+        key: Page(
+            keyset, partition_nodes[:first],
+            has_next_page=len(partition_nodes) > first)
+        for key, partition_nodes in nodes_by_partition.items()}
@@ -0,0 +1,218 @@
+"""Static cost analysis of GraphQL queries.
+
+Every field resolving to an object costs one point for each object it
+returns, plus the extra cost of expensive fields listed in `FIELD_COSTS`.
+The estimated cost of a connection's children is multiplied by its `first`
+or `last` argument, and by `DEFAULT_CONNECTION_SIZE` when neither is given,
+as connections then return at most that many nodes. Lists of objects that
+are not connections are assumed to hold `DEFAULT_LIST_SIZE` items.
+
+The actual cost of an executed query is calculated the same way from the
+returned data, so the two can be compared.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql.language import ast
+from graphql.type import (
+    GraphQLInterfaceType, GraphQLList, GraphQLNonNull, GraphQLObjectType,
+    GraphQLUnionType)
+
+from .pagination import DEFAULT_CONNECTION_SIZE
+
+DEFAULT_LIST_SIZE = 10
+
+# Cost of fields that are expensive to resolve, on top of the cost of
+# objects they return.
+FIELD_COSTS = {
+    'Product.availability': 5,
+    'Product.margin': 5,
+    'Product.purchaseCost': 5,
+    'ProductVariant.margin': 2,
+    'ProductVariant.quantityOrdered': 5,
+    'ProductVariant.revenue': 10,
+    'Query.reportProductSales': 50}
+
+QUERY_COST_KEY = 'graphql:query-cost:%s:%d'
+
+
+class QueryCostAnalyzer:
+    """Calculate costs of an operation of a parsed GraphQL document.
+
+    Fields unknown to the schema are ignored, as such documents are rejected
+    by validation anyway.
+    """
+
+    def __init__(self, schema, document_ast, variables=None,
+                 operation_name=None):
+        self.schema = schema
+        self.variables = variables or {}
+        self.fragments = {}
+        self.operation = None
+        operations = []
+        for definition in document_ast.definitions:
+            if isinstance(definition, ast.FragmentDefinition):
+                self.fragments[definition.name.value] = definition
+            elif isinstance(definition, ast.OperationDefinition):
+                operations.append(definition)
+        for operation in operations:
+            name = operation.name.value if operation.name else None
+            if operation_name is None or name == operation_name:
+                self.operation = operation
+                break
+
+    def get_root_type(self):
+        if self.operation is None:
+            return None
+        if self.operation.operation == 'mutation':
+            return self.schema.get_mutation_type()
+        if self.operation.operation == 'query':
+            return self.schema.get_query_type()
+        return None
+
+    def get_estimated_cost(self):
+        root_type = self.get_root_type()
+        if root_type is None:
+            return 0
+        return self._get_selection_set_cost(
+            root_type, self.operation.selection_set, DEFAULT_LIST_SIZE)
+
+    def get_actual_cost(self, data):
+        root_type = self.get_root_type()
+        if root_type is None or data is None:
+            return 0
+        return self._get_data_cost(
+            root_type, self.operation.selection_set, data)
+
+    def _get_selection_set_cost(self, parent_type, selection_set, list_size):
+        cost = 0
+        for node, field in self._get_fields(parent_type, selection_set):
+            cost += get_field_cost(parent_type, node)
+            field_type, is_list = unwrap_type(field.type)
+            if node.selection_set is None or not is_composite(field_type):
+                continue
+            connection_size = self._get_connection_size(node, field)
+            children_cost = self._get_selection_set_cost(
+                field_type, node.selection_set,
+                connection_size or DEFAULT_LIST_SIZE)
+            cost += (list_size if is_list else 1) * (1 + children_cost)
+        return cost
+
+    def _get_data_cost(self, parent_type, selection_set, data):
+        cost = 0
+        for node, field in self._get_fields(parent_type, selection_set):
+            key = node.alias.value if node.alias else node.name.value
+            if not isinstance(data, dict) or key not in data:
+                continue
+            cost += get_field_cost(parent_type, node)
+            field_type, _ = unwrap_type(field.type)
+            if node.selection_set is None or not is_composite(field_type):
+                continue
+            for item in flatten(data[key]):
+                cost += 1 + self._get_data_cost(
+                    field_type, node.selection_set, item)
+        return cost
+
+    def _get_fields(self, parent_type, selection_set, visited=frozenset()):
+        """Yield pairs of field nodes and definitions of a selection set.
+
+        Fields of fragments are included regardless of their type
+        conditions, which can only overestimate the cost.
+        """
+        fields = getattr(parent_type, 'fields', {})
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                name = selection.name.value
+                if name in fields and not name.startswith('__'):
+                    yield selection, fields[name]
+            elif isinstance(selection, ast.InlineFragment):
+                fragment_type = self._get_condition_type(
+                    selection, parent_type)
+                yield from self._get_fields(
+                    fragment_type, selection.selection_set, visited)
+            elif isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = self._get_condition_type(
+                    fragment, parent_type)
+                yield from self._get_fields(
+                    fragment_type, fragment.selection_set, visited | {name})
+
+    def _get_condition_type(self, fragment, parent_type):
+        if fragment.type_condition is None:
+            return parent_type
+        return self.schema.get_type(fragment.type_condition.name.value)
+
+    def _get_connection_size(self, node, field):
+        if 'first' not in field.args and 'last' not in field.args:
+            return None
+        sizes = [
+            self._get_argument_value(argument) for argument in node.arguments
+            if argument.name.value in {'first', 'last'}]
+        sizes = [size for size in sizes if isinstance(size, int)]
+        return max(sizes) if sizes else DEFAULT_CONNECTION_SIZE
+
+    def _get_argument_value(self, argument):
+        value = argument.value
+        if isinstance(value, ast.Variable):
+            return self.variables.get(value.name.value)
+        if isinstance(value, ast.IntValue):
+            return int(value.value)
+        return None
+
+
+def unwrap_type(graphql_type):
+    """Return the named type of a field and whether it is a list."""
+    is_list = False
+    while isinstance(graphql_type, (GraphQLList, GraphQLNonNull)):
+        if isinstance(graphql_type, GraphQLList):
+            is_list = True
+        graphql_type = graphql_type.of_type
+    return graphql_type, is_list
+
+
+def is_composite(graphql_type):
+    return isinstance(
+        graphql_type,
+        (GraphQLInterfaceType, GraphQLObjectType, GraphQLUnionType))
+
+
+def flatten(value):
+    if isinstance(value, list):
+        for item in value:
+            yield from flatten(item)
+    elif value is not None:
+        yield value
+
+
+def get_field_cost(parent_type, node):
+    return FIELD_COSTS.get('%s.%s' % (parent_type.name, node.name.value), 0)
+
+
+def get_client_key(request):
+    if request.user.is_authenticated:
+        return 'user:%s' % request.user.pk
+    return 'ip:%s' % request.META.get('REMOTE_ADDR')
+
+
+def consume_query_cost(request, cost):
+    """Charge a client for a query and return whether it's within budget.
+
+    Clients can run queries of total estimated cost up to
+    `GRAPHQL_QUERY_COST_PER_MINUTE` per minute. Unlimited if unset.
+    """
+    limit = settings.GRAPHQL_QUERY_COST_PER_MINUTE
+    if not limit:
+        return True
+    key = QUERY_COST_KEY % (get_client_key(request), time.time() // 60)
+    cache.add(key, 0, 60)
+    try:
+        total = cache.incr(key, cost)
+    except ValueError:
+        # The key expired between the calls
+        cache.add(key, cost, 60)
+        total = cost
+    return total <= limit
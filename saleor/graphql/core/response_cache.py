@@ -0,0 +1,145 @@
+"""Caching of API responses to anonymous queries.
+
+Responses are cached for `GRAPHQL_RESPONSE_CACHE_TIMEOUT` seconds (caching is
+disabled if unset). Cache keys include everything a response of an anonymous
+query depends on: the query, its variables, the requested currency, country
+and language, and versions of the sale index and site settings, so responses
+are dropped whenever discounts or the shop configuration change.
+
+Only queries selecting nothing but catalog data are cached. Responses about
+checkouts, orders or payments, which anonymous clients look up by token,
+change with every mutation and are never cached.
+
+Cache hits and misses are counted, run `manage.py response_cache_stats`
+to see the hit rate.
+"""
+import json
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+from graphql.language import ast
+
+from ...discount.utils import get_sale_index_version
+from ...site.patch_sites import get_site_cache_version
+
+RESPONSE_CACHE_KEY = 'graphql:response:%s'
+RESPONSE_CACHE_HITS_KEY = 'graphql:response-cache:hits'
+RESPONSE_CACHE_MISSES_KEY = 'graphql:response-cache:misses'
+
+# Root fields of the storefront catalog, queries selecting anything else
+# are not cached
+CACHEABLE_ROOT_FIELDS = frozenset([
+    '__typename', 'attributes', 'categories', 'category', 'collection',
+    'collections', 'menu', 'menuItem', 'menuItems', 'menus', 'page',
+    'pages', 'product', 'productType', 'productTypes', 'productVariant',
+    'productVariants', 'products', 'searchSuggestions', 'shop'])
+
+
+def is_response_cache_enabled(request):
+    """Return whether responses to the request may be cached.
+
+    Only responses to unauthenticated requests are cached, as responses
+    to authenticated ones may depend on the user's permissions.
+    """
+    if not settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT:
+        return False
+    if request.META.get('HTTP_AUTHORIZATION'):
+        return False
+    return not request.user.is_authenticated
+
+
+def get_selected_field_names(selection_set, fragments, visited=None):
+    """Return names of fields selected directly by a selection set.
+
+    Fields selected through fragments are included.
+    """
+    if visited is None:
+        visited = set()
+    names = set()
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.Field):
+            names.add(selection.name.value)
+        elif isinstance(selection, ast.InlineFragment):
+            names.update(get_selected_field_names(
+                selection.selection_set, fragments, visited))
+        elif isinstance(selection, ast.FragmentSpread):
+            fragment_name = selection.name.value
+            if fragment_name in visited or fragment_name not in fragments:
+                continue
+            visited.add(fragment_name)
+            names.update(get_selected_field_names(
+                fragments[fragment_name].selection_set, fragments, visited))
+    return names
+
+
+def is_cacheable_operation(document, operation_name):
+    """Return whether responses to an operation may be cached.
+
+    Only queries selecting nothing but `CACHEABLE_ROOT_FIELDS` are cached,
+    never mutations.
+    """
+    definitions = document.document_ast.definitions
+    operations = [
+        definition for definition in definitions
+        if isinstance(definition, ast.OperationDefinition) and (
+            not operation_name or (
+                definition.name and
+                definition.name.value == operation_name))]
+    if len(operations) != 1 or operations[0].operation != 'query':
+        return False
+    fragments = {
+        definition.name.value: definition for definition in definitions
+        if isinstance(definition, ast.FragmentDefinition)}
+    root_fields = get_selected_field_names(
+        operations[0].selection_set, fragments)
+    return CACHEABLE_ROOT_FIELDS.issuperset(root_fields)
+
+
+def get_response_cache_key(request, query_hash, variables, operation_name):
+    country = getattr(request, 'country', None)
+    key_data = [
+        query_hash, variables, operation_name,
+        getattr(request, 'currency', settings.DEFAULT_CURRENCY),
+        str(country.code) if country else None, get_language(),
+        bool(request.GET.get('pretty')), get_sale_index_version(),
+        get_site_cache_version()]
+    key_hash = sha256(
+        json.dumps(key_data, sort_keys=True, default=str).encode('utf-8'))
+    return RESPONSE_CACHE_KEY % key_hash.hexdigest()
+
+
+def get_cached_response(cache_key):
+    """Return a cached response and count the cache hit or miss."""
+    response = cache.get(cache_key)
+    _increment_counter(
+        RESPONSE_CACHE_HITS_KEY if response is not None
+        else RESPONSE_CACHE_MISSES_KEY)
+    return response
+
+
+def cache_response(cache_key, response):
+    cache.set(cache_key, response, settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT)
+
+
+def get_response_cache_stats():
+    """Return numbers of response cache hits and misses of all processes."""
+    counters = cache.get_many(
+        [RESPONSE_CACHE_HITS_KEY, RESPONSE_CACHE_MISSES_KEY])
+    return {
+        'hits': counters.get(RESPONSE_CACHE_HITS_KEY, 0),
+        'misses': counters.get(RESPONSE_CACHE_MISSES_KEY, 0)}
+
+
+def reset_response_cache_stats():
+    cache.delete_many([RESPONSE_CACHE_HITS_KEY, RESPONSE_CACHE_MISSES_KEY])
+
+
+def _increment_counter(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The key was evicted between the calls
+        cache.add(key, 1, None)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...core.response_cache import (
+    get_response_cache_stats, reset_response_cache_stats)
+
+
+class Command(BaseCommand):
+    help = 'Show hit rate of the GraphQL API response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            dest='reset',
+            help='Reset the counters after showing them')
+
+    def handle(self, *args, **options):
+        stats = get_response_cache_stats()
+        total = stats['hits'] + stats['misses']
+        hit_rate = 100.0 * stats['hits'] / total if total else 0
+        self.stdout.write(
+            'Hits: %(hits)d, misses: %(misses)d, hit rate: %(rate).1f%%' % {
+                'hits': stats['hits'], 'misses': stats['misses'],
+                'rate': hit_rate})
+        if options['reset']:
+            reset_response_cache_stats()
@@ -9,7 +9,8 @@ from ....core.exceptions import InsufficientStock
 from ....core.utils.taxes import ZERO_TAXED_MONEY
 from ....order import OrderEvents, OrderStatus, models
 from ....order.utils import (
-    add_variant_to_order, allocate_stock, recalculate_order)
+    add_variant_to_order, allocate_stock, recalculate_order,
+    update_order_prices)
 from ...account.i18n import I18nMixin
 from ...account.types import AddressInput
 from ...core.mutations import BaseMutation, ModelDeleteMutation, ModelMutation
@@ -123,7 +124,8 @@ class DraftOrderCreate(ModelMutation, I18nMixin):
                 add_variant_to_order(
                     instance, variant, quantity, allow_overselling=True,
                     track_inventory=False)
-        recalculate_order(instance)
+        # Taxes and discounts depend on the customer and addresses
+        update_order_prices(instance, info.context.discounts)
 
 
 class DraftOrderUpdate(DraftOrderCreate):
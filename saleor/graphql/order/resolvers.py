@@ -1,10 +1,11 @@
 import graphene
 import graphene_django_optimizer as gql_optimizer
 
-from ...order import OrderEvents, OrderStatus, models
-from ...order.utils import sum_order_totals
+from ...order import OrderEvents, models
+from ...order.utils import get_sales_total
 from ...shipping import models as shipping_models
-from ..utils import filter_by_period, filter_by_query_param
+from ..utils import (
+    filter_by_period, filter_by_query_param, reporting_period_to_date)
 from .types import Order, OrderStatusFilter
 
 ORDER_SEARCH_FIELDS = (
@@ -34,9 +35,7 @@ def resolve_orders(info, created, status, query):
 
 
 def resolve_orders_total(info, period):
-    qs = models.Order.objects.confirmed().exclude(status=OrderStatus.CANCELED)
-    qs = filter_by_period(qs, period, 'created')
-    return sum_order_totals(qs)
+    return get_sales_total(reporting_period_to_date(period))
 
 
 def resolve_order(info, id):
@@ -48,6 +47,11 @@ def resolve_order(info, id):
     return None
 
 
+def resolve_order_by_token(info, token):
+    """Return order by its token, the same way the order details page does."""
+    return models.Order.objects.filter(token=token).first()
+
+
 def resolve_shipping_methods(obj, info, price):
     if not obj.is_shipping_required():
         return None
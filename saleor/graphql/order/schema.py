@@ -16,8 +16,8 @@ from .mutations.orders import (
     OrderAddNote, OrderCancel, OrderCapture, OrderMarkAsPaid, OrderRefund,
     OrderUpdate, OrderUpdateShipping, OrderVoid)
 from .resolvers import (
-    resolve_homepage_events, resolve_order, resolve_orders,
-    resolve_orders_total)
+    resolve_homepage_events, resolve_order, resolve_order_by_token,
+    resolve_orders, resolve_orders_total)
 from .types import Order, OrderEvent, OrderStatusFilter
 
 
@@ -28,6 +28,9 @@ class OrderQueries(graphene.ObjectType):
     order = graphene.Field(
         Order, description='Lookup an order by ID.',
         id=graphene.Argument(graphene.ID, required=True))
+    order_by_token = graphene.Field(
+        Order, description='Lookup an order by token.',
+        token=graphene.Argument(graphene.UUID, required=True))
     orders = PrefetchingConnectionField(
         Order,
         query=graphene.String(description=DESCRIPTIONS['order']),
@@ -51,6 +54,9 @@ class OrderQueries(graphene.ObjectType):
     def resolve_order(self, info, id):
         return resolve_order(info, id)
 
+    def resolve_order_by_token(self, info, token):
+        return resolve_order_by_token(info, token)
+
     @login_required
     def resolve_orders(
             self, info, created=None, status=None, query=None, **kwargs):
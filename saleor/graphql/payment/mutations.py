@@ -5,6 +5,8 @@ from django.conf import settings
 from graphql_jwt.decorators import permission_required
 from prices import Money, TaxedMoney
 
+from ...checkout.utils import reserve_cart_stock
+from ...core.exceptions import InsufficientStock
 from ...core.utils.taxes import get_taxes_for_address
 from ...payment import PaymentError
 from ...payment.utils import (
@@ -76,6 +78,13 @@ class CheckoutPaymentCreate(BaseMutation, I18nMixin):
                 'amount should be equal checkout\'s total.')
             return CheckoutPaymentCreate(errors=errors)
 
+        # hold the stock while the customer is paying for it
+        try:
+            reserve_cart_stock(checkout)
+        except InsufficientStock:
+            cls.add_error(errors, None, 'Insufficient product stock.')
+            return CheckoutPaymentCreate(errors=errors)
+
         payment = create_payment(
             total=amount,
             currency=settings.DEFAULT_CURRENCY,
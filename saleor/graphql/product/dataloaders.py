@@ -0,0 +1,120 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from ...product import models
+from ..core.dataloaders import DataLoader
+from ..core.pagination import Page, get_keyset_ordering, paginate_partitions
+
+
+class ProductByIdLoader(DataLoader):
+    context_key = 'product_by_id'
+
+    def batch_load(self, keys):
+        products = models.Product.objects.in_bulk(keys)
+        return [products.get(key) for key in keys]
+
+
+class ProductPagesLoader(DataLoader):
+    """Load first pages of products of many parents in one query per batch.
+
+    Keys are pairs of a parent's primary key and a page size.
+    """
+
+    def batch_load(self, keys):
+        products = models.Product.objects.visible_to_user(self.context.user)
+        keyset = get_keyset_ordering(products)
+        pks_by_size = defaultdict(list)
+        for pk, first in keys:
+            pks_by_size[first].append(pk)
+        pages = {}
+        for first, pks in pks_by_size.items():
+            for queryset, partition in self.get_partitions(products, pks):
+                pages.update({
+                    (pk, first): page for pk, page in paginate_partitions(
+                        queryset, keyset, partition, first).items()})
+        return [pages.get(key, Page(keyset, [])) for key in keys]
+
+    def get_partitions(self, products, pks):
+        """Return querysets of products and expressions of their parents."""
+        raise NotImplementedError
+
+
+class ProductPagesByCategoryTreeLoader(ProductPagesLoader):
+    """Load pages of products of categories including their descendants."""
+
+    context_key = 'product_pages_by_category_tree'
+
+    def get_partitions(self, products, pks):
+        # A product belongs to trees of all its category's ancestors, but to
+        # a single tree at each level, so categories are partitioned by level
+        lookups_by_level = defaultdict(dict)
+        categories = models.Category.objects.filter(pk__in=pks).values_list(
+            'pk', 'tree_id', 'lft', 'rght', 'level')
+        for pk, tree_id, lft, rght, level in categories:
+            lookups_by_level[level][pk] = Q(
+                category__tree_id=tree_id, category__lft__gte=lft,
+                category__rght__lte=rght)
+        for lookups in lookups_by_level.values():
+            partition = Case(
+                *[When(lookup, then=Value(pk))
+                  for pk, lookup in lookups.items()],
+                output_field=IntegerField())
+            yield products.filter(reduce(or_, lookups.values())), partition
+
+
+class ProductPagesByProductTypeIdLoader(ProductPagesLoader):
+    context_key = 'product_pages_by_product_type_id'
+
+    def get_partitions(self, products, pks):
+        yield products.filter(product_type__in=pks), F('product_type_id')
+
+
+class VariantsByProductIdLoader(DataLoader):
+    context_key = 'variants_by_product_id'
+
+    def batch_load(self, keys):
+        variants = models.ProductVariant.objects.filter(
+            product__in=keys).select_related('product').order_by('pk')
+        variants_by_product = defaultdict(list)
+        for variant in variants:
+            variants_by_product[variant.product_id].append(variant)
+        return [variants_by_product[key] for key in keys]
+
+
+class ImagesByProductIdLoader(DataLoader):
+    context_key = 'images_by_product_id'
+
+    def batch_load(self, keys):
+        images = models.ProductImage.objects.filter(product__in=keys)
+        images_by_product = defaultdict(list)
+        for image in images:
+            images_by_product[image.product_id].append(image)
+        return [images_by_product[key] for key in keys]
+
+
+class ProductAttributesByProductTypeIdLoader(DataLoader):
+    context_key = 'product_attributes_by_product_type_id'
+
+    def batch_load(self, keys):
+        attributes = models.Attribute.objects.filter(
+            product_type__in=keys).prefetch_related('values')
+        attributes_by_type = defaultdict(list)
+        for attribute in attributes:
+            attributes_by_type[attribute.product_type_id].append(attribute)
+        return [attributes_by_type[key] for key in keys]
+
+
+class VariantAttributesByProductTypeIdLoader(DataLoader):
+    context_key = 'variant_attributes_by_product_type_id'
+
+    def batch_load(self, keys):
+        attributes = models.Attribute.objects.filter(
+            product_variant_type__in=keys).prefetch_related('values')
+        attributes_by_type = defaultdict(list)
+        for attribute in attributes:
+            attributes_by_type[attribute.product_variant_type_id].append(
+                attribute)
+        return [attributes_by_type[key] for key in keys]
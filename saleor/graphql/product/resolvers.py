@@ -2,19 +2,23 @@ import graphene
 import graphene_django_optimizer as gql_optimizer
 from django.db.models import Sum, Q
 
-from ...order import OrderStatus
 from ...product import models
+from ...search.autocomplete import get_suggestions
 from ..utils import (
-    filter_by_query_param, filter_by_period, get_database_id, get_nodes)
+    filter_by_query_param, get_database_id, get_nodes,
+    reporting_period_to_date)
 from .filters import (
     filter_products_by_attributes, filter_products_by_categories,
     filter_products_by_collections, filter_products_by_price, sort_qs)
-from .types import Category, Collection, ProductVariant, StockAvailability
+from .types import (
+    Category, Collection, ProductVariant, SearchSuggestion, StockAvailability)
 
 PRODUCT_SEARCH_FIELDS = ('name', 'description', 'category__name')
 CATEGORY_SEARCH_FIELDS = ('name', 'slug', 'description', 'parent__name')
 COLLECTION_SEARCH_FIELDS = ('name', 'slug')
 ATTRIBUTES_SEARCH_FIELDS = ('name', 'slug')
+DEFAULT_SEARCH_SUGGESTIONS = 10
+MAX_SEARCH_SUGGESTIONS = 20
 
 
 def resolve_attributes(info, category_id, query):
@@ -79,11 +83,13 @@ def resolve_products(
         qs = filter_products_by_collections(qs, collections)
 
     if stock_availability:
-        qs = qs.annotate(total_quantity=Sum('variants__quantity'))
         if stock_availability == StockAvailability.IN_STOCK:
-            qs = qs.filter(total_quantity__gt=0)
+            qs = qs.filter(summary__quantity__gt=0)
         elif stock_availability == StockAvailability.OUT_OF_STOCK:
-            qs = qs.filter(total_quantity__lte=0)
+            # Products without variants are neither in nor out of stock
+            qs = qs.filter(
+                summary__quantity__lte=0,
+                pk__in=models.ProductVariant.objects.values('product_id'))
 
     qs = filter_products_by_price(qs, price_lte, price_gte)
     qs = sort_qs(qs, sort_by)
@@ -109,15 +115,20 @@ def resolve_product_variants(info, ids=None):
 
 def resolve_report_product_sales(info, period):
     qs = models.ProductVariant.objects.prefetch_related(
-        'product', 'product__images', 'order_lines__order').all()
+        'product', 'product__images').all()
 
-    # exclude draft and canceled orders
-    exclude_status = [OrderStatus.DRAFT, OrderStatus.CANCELED]
-    qs = qs.exclude(order_lines__order__status__in=exclude_status)
+    # summaries exclude draft and canceled orders
+    start_date = reporting_period_to_date(period)
+    qs = qs.filter(daily_sales__date__gte=start_date.date())
 
-    # filter by period
-    qs = filter_by_period(qs, period, 'order_lines__order__created')
-
-    qs = qs.annotate(quantity_ordered=Sum('order_lines__quantity'))
-    qs = qs.filter(quantity_ordered__isnull=False)
+    qs = qs.annotate(quantity_ordered=Sum('daily_sales__quantity'))
     return qs.order_by('-quantity_ordered')
+
+
+def resolve_search_suggestions(query, first=None):
+    if first is None:
+        first = DEFAULT_SEARCH_SUGGESTIONS
+    limit = max(1, min(first, MAX_SEARCH_SUGGESTIONS))
+    return [
+        SearchSuggestion(**suggestion)
+        for suggestion in get_suggestions(query, limit)]
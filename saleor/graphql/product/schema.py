@@ -20,11 +20,11 @@ from .mutations.products import (
 from .resolvers import (
     resolve_attributes, resolve_categories, resolve_collections,
     resolve_products, resolve_product_types, resolve_product_variants,
-    resolve_report_product_sales)
+    resolve_report_product_sales, resolve_search_suggestions)
 from .scalars import AttributeScalar
 from .types import (
     Category, Collection, Product, Attribute, ProductType, ProductVariant,
-    StockAvailability)
+    SearchSuggestion, StockAvailability)
 
 
 class ProductQueries(graphene.ObjectType):
@@ -85,6 +85,13 @@ class ProductQueries(graphene.ObjectType):
         period=graphene.Argument(
             ReportingPeriod, required=True, description='Span of time.'),
         description='List of top selling products.')
+    search_suggestions = graphene.List(
+        graphene.NonNull(SearchSuggestion),
+        query=graphene.String(
+            required=True, description='Phrase typed by the user.'),
+        first=graphene.Int(description='Maximum number of suggestions.'),
+        description='Suggest products, categories and collections while '
+                    'the user types a search phrase.')
 
     def resolve_attributes(self, info, in_category=None, query=None, **kwargs):
         return resolve_attributes(info, in_category, query)
@@ -123,6 +130,9 @@ class ProductQueries(graphene.ObjectType):
     def resolve_report_product_sales(self, info, period, **kwargs):
         return resolve_report_product_sales(info, period)
 
+    def resolve_search_suggestions(self, info, query, first=None):
+        return resolve_search_suggestions(query, first)
+
 
 class ProductMutations(graphene.ObjectType):
     attribute_create = AttributeCreate.Field()
@@ -15,10 +15,16 @@ from ...product.utils.costs import (
     get_margin_for_variant, get_product_costs_data)
 from ..core.decorators import permission_required
 from ..core.fields import PrefetchingConnectionField
+from ..core.pagination import get_first_page_size
 from ..core.types import (
     CountableDjangoObjectType, Money, MoneyRange, ReportingPeriod, TaxedMoney,
     TaxedMoneyRange, TaxRateType)
 from ..utils import get_database_id, reporting_period_to_date
+from .dataloaders import (
+    ImagesByProductIdLoader, ProductAttributesByProductTypeIdLoader,
+    ProductByIdLoader, ProductPagesByCategoryTreeLoader,
+    ProductPagesByProductTypeIdLoader, VariantAttributesByProductTypeIdLoader,
+    VariantsByProductIdLoader)
 from .descriptions import AttributeDescriptions, AttributeValueDescriptions
 
 COLOR_PATTERN = r'^(#[0-9a-fA-F]{3}|#(?:[0-9a-fA-F]{2}){2,4}|(rgb|hsl)a?\((-?\d+%?[,\s]+){2,3}\s*[\d\.]+%?\))$'  # noqa
@@ -148,9 +154,7 @@ class ProductVariant(CountableDjangoObjectType):
     revenue = graphene.Field(
         TaxedMoney, period=graphene.Argument(ReportingPeriod),
         description=dedent('''Total revenue generated by a variant in given
-        period of time. Note: this field should be queried using
-        `reportProductSales` query as it uses optimizations suitable
-        for such calculations.'''))
+        period of time.'''))
 
     class Meta:
         description = dedent("""Represents a version of a product such as
@@ -162,11 +166,18 @@ class ProductVariant(CountableDjangoObjectType):
     def resolve_stock_quantity(self, info):
         return self.quantity_available
 
-    @gql_optimizer.resolver_hints(
-        prefetch_related='product__product_type__variant_attributes__values')
     def resolve_attributes(self, info):
-        attributes_qs = self.product.product_type.variant_attributes.all()
-        return resolve_attribute_list(self.attributes, attributes_qs)
+        context = info.context
+
+        def resolve(product):
+            return VariantAttributesByProductTypeIdLoader(context).load(
+                product.product_type_id).then(
+                    lambda attributes: resolve_attribute_list(
+                        self.attributes, attributes))
+
+        if models.ProductVariant.product.is_cached(self):
+            return resolve(self.product)
+        return ProductByIdLoader(context).load(self.product_id).then(resolve)
 
     def resolve_margin(self, info):
         return get_margin_for_variant(self)
@@ -244,10 +255,8 @@ class Product(CountableDjangoObjectType):
         id=graphene.Argument(
             graphene.ID, description='ID of a product image.'),
         description='Get a single product image by ID')
-    variants = gql_optimizer.field(
-        PrefetchingConnectionField(ProductVariant), model_field='variants')
-    images = gql_optimizer.field(
-        PrefetchingConnectionField(lambda: ProductImage), model_field='images')
+    variants = PrefetchingConnectionField(ProductVariant)
+    images = PrefetchingConnectionField(lambda: ProductImage)
 
     class Meta:
         description = dedent("""Represents an individual item for sale in the
@@ -255,12 +264,17 @@ class Product(CountableDjangoObjectType):
         interfaces = [relay.Node]
         model = models.Product
 
-    @gql_optimizer.resolver_hints(prefetch_related='images')
     def resolve_thumbnail_url(self, info, *, size=None):
         if not size:
             size = 255
-        url = get_thumbnail(self.get_first_image(), size, method='thumbnail')
-        return info.context.build_absolute_uri(url)
+
+        def resolve(images):
+            image = images[0].image if images else None
+            url = get_thumbnail(image, size, method='thumbnail')
+            return info.context.build_absolute_uri(url)
+
+        return ImagesByProductIdLoader(info.context).load(self.pk).then(
+            resolve)
 
     def resolve_url(self, info):
         return self.get_absolute_url()
@@ -274,11 +288,11 @@ class Product(CountableDjangoObjectType):
             self, context.discounts, context.taxes, context.currency)
         return ProductAvailability(**availability._asdict())
 
-    @gql_optimizer.resolver_hints(
-        prefetch_related='product_type__product_attributes__values')
     def resolve_attributes(self, info):
-        attributes_qs = self.product_type.product_attributes.all()
-        return resolve_attribute_list(self.attributes, attributes_qs)
+        return ProductAttributesByProductTypeIdLoader(info.context).load(
+            self.product_type_id).then(
+                lambda attributes: resolve_attribute_list(
+                    self.attributes, attributes))
 
     @permission_required('product.manage_products')
     def resolve_purchase_cost(self, info):
@@ -297,12 +311,11 @@ class Product(CountableDjangoObjectType):
         except models.ProductImage.DoesNotExist:
             raise GraphQLError('Product image not found.')
 
-    @gql_optimizer.resolver_hints(model_field='images')
     def resolve_images(self, info, **kwargs):
-        return self.images.all()
+        return ImagesByProductIdLoader(info.context).load(self.pk)
 
     def resolve_variants(self, info, **kwargs):
-        return self.variants.all()
+        return VariantsByProductIdLoader(info.context).load(self.pk)
 
 
 def prefetch_products(info, *args, **kwargs):
@@ -319,11 +332,26 @@ def prefetch_products(info, *args, **kwargs):
         to_attr='prefetched_products')
 
 
+def resolve_product_page(info, loader, parent_pk, qs, args):
+    """Resolve products of a parent, loading first pages of all parents.
+
+    First pages of products of all parents in the response are fetched by
+    the loader together, other pages are paginated using the queryset.
+    """
+    first = get_first_page_size(args)
+    if first is None:
+        return gql_optimizer.query(qs, info)
+
+    def set_queryset(page):
+        page.queryset = qs
+        return page
+
+    return loader(info.context).load((parent_pk, first)).then(set_queryset)
+
+
 class ProductType(CountableDjangoObjectType):
-    products = gql_optimizer.field(
-        PrefetchingConnectionField(
-            Product, description='List of products of this type.'),
-        prefetch_related=prefetch_products)
+    products = PrefetchingConnectionField(
+        Product, description='List of products of this type.')
     product_attributes = gql_optimizer.field(
         PrefetchingConnectionField(Attribute),
         model_field='product_attributes')
@@ -349,10 +377,9 @@ class ProductType(CountableDjangoObjectType):
         return self.variant_attributes.all()
 
     def resolve_products(self, info, **kwargs):
-        if hasattr(self, 'prefetched_products'):
-            return self.prefetched_products
         qs = self.products.visible_to_user(info.context.user)
-        return gql_optimizer.query(qs, info)
+        return resolve_product_page(
+            info, ProductPagesByProductTypeIdLoader, self.pk, qs, kwargs)
 
 
 class Collection(CountableDjangoObjectType):
@@ -379,10 +406,8 @@ class Collection(CountableDjangoObjectType):
 
 
 class Category(CountableDjangoObjectType):
-    products = gql_optimizer.field(
-        PrefetchingConnectionField(
-            Product, description='List of products in the category.'),
-        prefetch_related=prefetch_products)
+    products = PrefetchingConnectionField(
+        Product, description='List of products in the category.')
     url = graphene.String(
         description='The storefront\'s URL for the category.')
     ancestors = PrefetchingConnectionField(
@@ -418,17 +443,12 @@ class Category(CountableDjangoObjectType):
         return self.get_absolute_url()
 
     def resolve_products(self, info, **kwargs):
-        # If the category has no children, we use the prefetched data.
-        children = self.children.all()
-        if not children and hasattr(self, 'prefetched_products'):
-            return self.prefetched_products
-
-        # Otherwise we want to include products from child categories which
-        # requires performing additional logic.
+        # Products of all categories in the tree of the category
         tree = self.get_descendants(include_self=True)
-        qs = models.Product.objects.available_products()
-        qs = qs.filter(category__in=tree)
-        return gql_optimizer.query(qs, info)
+        qs = models.Product.objects.visible_to_user(
+            info.context.user).filter(category__in=tree)
+        return resolve_product_page(
+            info, ProductPagesByCategoryTreeLoader, self.pk, qs, kwargs)
 
 
 class ProductImage(CountableDjangoObjectType):
@@ -451,3 +471,16 @@ class ProductImage(CountableDjangoObjectType):
         else:
             url = self.image.url
         return info.context.build_absolute_uri(url)
+
+
+class SearchSuggestion(graphene.ObjectType):
+    kind = graphene.String(
+        required=True,
+        description='Kind of the suggested object: product, category or '
+                    'collection.')
+    name = graphene.String(required=True, description='Name of the object.')
+    url = graphene.String(
+        required=True, description='The storefront URL of the object.')
+
+    class Meta:
+        description = 'Represents a suggestion of a search phrase.'
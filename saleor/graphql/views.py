@@ -0,0 +1,199 @@
+import json
+
+from django.conf import settings
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed)
+from graphene_django.views import HttpError
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult
+
+from .core.backend import document_backend, get_query_hash
+from .core.query_cost import QueryCostAnalyzer, consume_query_cost
+from .core.response_cache import (
+    cache_response, get_cached_response, get_response_cache_key,
+    is_cacheable_operation, is_response_cache_enabled)
+from .file_upload.views import FileUploadGraphQLView
+
+
+class GraphQLView(FileUploadGraphQLView):
+    """GraphQL view that limits the cost of queries.
+
+    The estimated cost of every operation is calculated before it's executed.
+    Operations over `GRAPHQL_QUERY_MAX_COST` are rejected and clients that
+    exceed their `GRAPHQL_QUERY_COST_PER_MINUTE` budget are throttled.
+    Estimated and actual costs are reported in the `extensions` of responses.
+
+    Query documents are parsed and validated once and can be sent as
+    automatic persisted queries, i.e. as SHA-256 hashes of queries sent
+    before. Responses to anonymous queries are cached if
+    `GRAPHQL_RESPONSE_CACHE_TIMEOUT` is set.
+    """
+
+    query_cost = None
+
+    def __init__(self, backend=None, **kwargs):
+        if backend is None:
+            backend = document_backend
+        super().__init__(backend=backend, **kwargs)
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(
+            request, data)
+
+        self.query_cost = None
+        cache_key = None
+        try:
+            query, query_hash = self.get_persisted_query(request, data, query)
+        except GraphQLError as e:
+            execution_result = ExecutionResult(errors=[e])
+        else:
+            if query and not (self.batch or show_graphiql):
+                cache_key = self.get_response_cache_key(
+                    request, query, query_hash, variables, operation_name)
+            if cache_key:
+                result = get_cached_response(cache_key)
+                if result is not None:
+                    return result, 200
+            execution_result = self.execute_graphql_request(
+                request, data, query, variables, operation_name,
+                show_graphiql)
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                response['errors'] = [
+                    self.format_error(e) for e in execution_result.errors]
+
+            if execution_result.invalid:
+                status_code = 400
+            else:
+                response['data'] = execution_result.data
+
+            if self.query_cost is not None:
+                response['extensions'] = {'cost': self.query_cost}
+
+            if self.batch:
+                response['id'] = id
+                response['status'] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+            if cache_key and not execution_result.errors:
+                cache_response(cache_key, result)
+        else:
+            result = None
+
+        return result, status_code
+
+    def get_persisted_query(self, request, data, query):
+        """Return the query to run and its hash if sent as a persisted query.
+
+        Clients may send the SHA-256 hash of a query in the `persistedQuery`
+        extension instead of the query itself. Unknown hashes result in
+        a `PersistedQueryNotFound` error, after which clients resend the hash
+        together with the query.
+        """
+        extensions = request.GET.get('extensions') or data.get('extensions')
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(
+                    HttpResponseBadRequest('Extensions are invalid JSON.'))
+        persisted_query = (
+            extensions.get('persistedQuery')
+            if isinstance(extensions, dict) else None)
+        if not isinstance(persisted_query, dict):
+            return query, get_query_hash(query) if query else None
+
+        query_hash = persisted_query.get('sha256Hash')
+        if query:
+            if get_query_hash(query) != query_hash:
+                raise GraphQLError('Provided sha256Hash does not match query.')
+            return query, query_hash
+        document = self.get_backend(request).get_document(
+            self.schema, query_hash)
+        if document is None:
+            raise GraphQLError('PersistedQueryNotFound')
+        return document.document_string, query_hash
+
+    def get_response_cache_key(
+            self, request, query, query_hash, variables, operation_name):
+        """Return the response cache key or None if it can't be cached.
+
+        Only responses to queries of catalog data are cached, see
+        `is_cacheable_operation`.
+        """
+        if not is_response_cache_enabled(request):
+            return None
+        try:
+            document = self.get_backend(request).document_from_string(
+                self.schema, query)
+        except Exception:
+            return None
+        if not is_cacheable_operation(document, operation_name):
+            return None
+        return get_response_cache_key(
+            request, query_hash, variables, operation_name)
+
+    def execute_graphql_request(
+            self, request, data, query, variables, operation_name,
+            show_graphiql=False):
+        if not query:
+            return super().execute_graphql_request(
+                request, data, query, variables, operation_name,
+                show_graphiql)
+
+        try:
+            backend = self.get_backend(request)
+            document = backend.document_from_string(self.schema, query)
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+        if request.method.lower() == 'get':
+            operation_type = document.get_operation_type(operation_name)
+            if operation_type and operation_type != 'query':
+                if show_graphiql:
+                    return None
+                raise HttpError(HttpResponseNotAllowed(
+                    ['POST'],
+                    'Can only perform a %s operation from a POST request.' % (
+                        operation_type,)))
+
+        analyzer = QueryCostAnalyzer(
+            self.schema, document.document_ast, variables, operation_name)
+        estimated_cost = analyzer.get_estimated_cost()
+        max_cost = settings.GRAPHQL_QUERY_MAX_COST
+        self.query_cost = {
+            'requestedQueryCost': estimated_cost,
+            'maximumAvailable': max_cost}
+        if estimated_cost > max_cost:
+            error = GraphQLError(
+                'Query cost of %d exceeds the maximum of %d. Request fewer '
+                'objects using first or last arguments.' % (
+                    estimated_cost, max_cost))
+            return ExecutionResult(errors=[error], invalid=True)
+        if not consume_query_cost(request, estimated_cost):
+            raise HttpError(
+                HttpResponse(status=429),
+                'Query cost budget exceeded. Try again later.')
+
+        try:
+            extra_options = {}
+            if self.executor:
+                extra_options['executor'] = self.executor
+            execution_result = document.execute(
+                root=self.get_root_value(request),
+                variables=variables,
+                operation_name=operation_name,
+                context=self.get_context(request),
+                middleware=self.get_middleware(request),
+                **extra_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+        if execution_result and not execution_result.invalid:
+            self.query_cost['actualQueryCost'] = analyzer.get_actual_cost(
+                execution_result.data)
+        return execution_result
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class MenuAppConfig(AppConfig):
+    name = 'saleor.menu'
+
+    def ready(self):
+        from . import signals  # noqa
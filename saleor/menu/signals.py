@@ -0,0 +1,61 @@
+"""Updates of compiled menus.
+
+Menus are compiled to JSON rendered by the storefront. Menus affected by
+changes of their items or of linked categories, collections and pages are
+collected and compiled again by a Celery task once the transaction commits,
+so reordering or removing many items compiles each menu once.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..core.utils.transactions import OnCommitQueue
+from ..page.models import Page
+from ..product.models import Category, Collection
+from .models import MenuItem, MenuItemTranslation
+from .tasks import rebuild_menus
+
+LINKED_OBJECT_FIELDS = {'slug'}
+
+
+def send_menu_updates(menu_pks):
+    """Send all queued menus to the compiling task."""
+    rebuild_menus.delay(sorted(menu_pks))
+
+
+menu_updates = OnCommitQueue(send_menu_updates)
+
+
+def queue_menu_update(menu_pks):
+    menu_updates.add(menu_pks)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def menu_item_changed(sender, instance, **kwargs):
+    queue_menu_update([instance.menu_id])
+
+
+@receiver(post_save, sender=MenuItemTranslation)
+@receiver(post_delete, sender=MenuItemTranslation)
+def menu_item_translation_changed(sender, instance, **kwargs):
+    menu_pks = MenuItem.objects.filter(
+        pk=instance.menu_item_id).values_list('menu_id', flat=True)
+    queue_menu_update(menu_pks)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Collection)
+@receiver(post_save, sender=Page)
+def linked_object_changed(sender, instance, update_fields=None, **kwargs):
+    """Compile menus linking to the object again as its URL may change.
+
+    Deleted objects need no handling here, menu items linking to them are
+    deleted as well.
+    """
+    if update_fields and not LINKED_OBJECT_FIELDS.intersection(update_fields):
+        return
+    lookup = {sender._meta.model_name: instance}
+    menu_pks = MenuItem.objects.filter(**lookup).values_list(
+        'menu_id', flat=True).distinct()
+    if menu_pks:
+        queue_menu_update(menu_pks)
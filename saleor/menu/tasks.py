@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from ..dashboard.menu.utils import update_menus
+
+
+@shared_task
+def rebuild_menus(menu_pks):
+    """Compile the JSON content of menus again."""
+    update_menus(menu_pks)
@@ -0,0 +1,50 @@
+from django.core.cache import cache
+
+from ..core.utils.cache import bump_version, get_version
+from .models import Menu
+
+MENU_VERSION_KEY = 'menu:version:%s'
+MENU_CACHE_KEY = 'menu:%s:%s:%s'
+# Compiled menus are dropped from the cache after a day even if unchanged
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_menu_cache_key(menu_pk, language_code):
+    version = get_version(MENU_VERSION_KEY % menu_pk)
+    return MENU_CACHE_KEY % (menu_pk, version, language_code)
+
+
+def invalidate_menu_cache(menu_pk):
+    """Force all processes to read the compiled content of the menu again."""
+    bump_version(MENU_VERSION_KEY % menu_pk)
+
+
+def translate_menu_items(items, language_code):
+    """Return compiled menu items with names in the given language."""
+    translated_items = []
+    for item in items:
+        translated = item['translations'].get(language_code)
+        translated_items.append({
+            'name': translated['name'] if translated else item['name'],
+            'url': item['url'],
+            'child_items': translate_menu_items(
+                item.get('child_items', []), language_code)})
+    return translated_items
+
+
+def get_menu_items(menu, language_code):
+    """Return menu items in the given language.
+
+    Items are cached under the version of the menu, changed whenever the
+    menu is compiled. On a miss the content is read from the database rather
+    than from the passed instance, which may be kept in the process-wide
+    site cache for long.
+    """
+    key = get_menu_cache_key(menu.pk, language_code)
+    items = cache.get(key)
+    if items is None:
+        content = Menu.objects.filter(pk=menu.pk).values_list(
+            'json_content', flat=True).first()
+        items = translate_menu_items(content or [], language_code)
+        cache.set(key, items, MENU_CACHE_TIMEOUT)
+    return items
@@ -5,6 +5,8 @@ from django.utils.translation import npgettext_lazy, pgettext_lazy
 from django_prices.templatetags import prices_i18n
 from prices import Money
 
+default_app_config = 'saleor.order.apps.OrderAppConfig'
+
 
 class OrderStatus:
     DRAFT = 'draft'
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class OrderAppConfig(AppConfig):
+    name = 'saleor.order'
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ...models import Order
+from ...utils import update_daily_sales
+
+
+class Command(BaseCommand):
+    help = 'Recalculate daily sales summaries from orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            dest='since',
+            help='First day to recalculate (YYYY-MM-DD), by default the day '
+                 'of the first order')
+
+    def handle(self, *args, **options):
+        if options['since']:
+            try:
+                date = parse_date(options['since'])
+            except ValueError:
+                date = None
+            if date is None:
+                raise CommandError('Invalid date: %s' % options['since'])
+        else:
+            first_created = Order.objects.aggregate(Min('created'))[
+                'created__min']
+            if first_created is None:
+                return
+            date = first_created.astimezone(timezone.utc).date()
+        today = timezone.now().astimezone(timezone.utc).date()
+        days = 0
+        while date <= today:
+            update_daily_sales(date)
+            date += timedelta(days=1)
+            days += 1
+        self.stdout.write('Recalculated sales summaries of %d days' % days)
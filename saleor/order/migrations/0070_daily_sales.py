@@ -0,0 +1,106 @@
+# Generated by Django 2.1.3 on 2026-10-18 22:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DateTimeField, DecimalField, F, Sum
+from django.db.models.functions import Trunc
+import django.db.models.deletion
+import django.utils.timezone
+import django_prices.models
+from prices import Money
+import saleor.core.utils.taxes
+
+EXCLUDED_STATUSES = ['draft', 'canceled']
+
+
+def get_day(field_name):
+    return Trunc(
+        field_name, 'day', output_field=DateTimeField(),
+        tzinfo=django.utils.timezone.utc)
+
+
+def create_daily_sales(apps, schema_editor):
+    Order = apps.get_model('order', 'Order')
+    OrderLine = apps.get_model('order', 'OrderLine')
+    DailySales = apps.get_model('order', 'DailySales')
+    DailyVariantSales = apps.get_model('order', 'DailyVariantSales')
+    currency = settings.DEFAULT_CURRENCY
+
+    days = Order.objects.exclude(status__in=EXCLUDED_STATUSES).annotate(
+        day=get_day('created')).values('day').annotate(
+            orders_count=Count('pk'),
+            net=Sum('total_net', output_field=DecimalField()),
+            gross=Sum('total_gross', output_field=DecimalField()))
+    DailySales.objects.bulk_create([
+        DailySales(
+            date=day['day'].date(), orders_count=day['orders_count'],
+            total_net=Money(day['net'] or 0, currency),
+            total_gross=Money(day['gross'] or 0, currency))
+        for day in days], batch_size=1000)
+
+    lines = OrderLine.objects.exclude(
+        order__status__in=EXCLUDED_STATUSES).filter(variant__isnull=False)
+    lines = lines.annotate(day=get_day('order__created')).values(
+        'day', 'variant').annotate(
+            total_quantity=Sum('quantity'),
+            net=Sum(
+                F('unit_price_net') * F('quantity'),
+                output_field=DecimalField()),
+            gross=Sum(
+                F('unit_price_gross') * F('quantity'),
+                output_field=DecimalField()))
+    DailyVariantSales.objects.bulk_create([
+        DailyVariantSales(
+            date=line['day'].date(), variant_id=line['variant'],
+            quantity=line['total_quantity'],
+            revenue_net=Money(line['net'] or 0, currency),
+            revenue_gross=Money(line['gross'] or 0, currency))
+        for line in lines], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0081_trigram_indexes'),
+        ('order', '0069_order_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='created',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('total_net', django_prices.models.MoneyField(currency='USD', decimal_places=2, default=saleor.core.utils.taxes.zero_money, max_digits=12)),
+                ('total_gross', django_prices.models.MoneyField(currency='USD', decimal_places=2, default=saleor.core.utils.taxes.zero_money, max_digits=12)),
+            ],
+            options={
+                'ordering': ('date',),
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyVariantSales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue_net', django_prices.models.MoneyField(currency='USD', decimal_places=2, default=saleor.core.utils.taxes.zero_money, max_digits=12)),
+                ('revenue_gross', django_prices.models.MoneyField(currency='USD', decimal_places=2, default=saleor.core.utils.taxes.zero_money, max_digits=12)),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='product.ProductVariant')),
+            ],
+            options={
+                'ordering': ('date',),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyvariantsales',
+            unique_together={('date', 'variant')},
+        ),
+        migrations.RunPython(create_daily_sales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.1.3 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0070_daily_sales'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='checkout_token',
+            field=models.CharField(blank=True, editable=False, max_length=36),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='order',
+            unique_together={('checkout_token', 'idempotency_key')},
+        ),
+    ]
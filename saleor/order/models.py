@@ -4,6 +4,8 @@ from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.db.models import ExpressionWrapper, F, Max, Sum
@@ -60,7 +62,7 @@ class OrderQueryset(models.QuerySet):
 
 class Order(models.Model):
     created = models.DateTimeField(
-        default=now, editable=False)
+        default=now, editable=False, db_index=True)
     status = models.CharField(
         max_length=32, default=OrderStatus.UNFULFILLED,
         choices=OrderStatus.CHOICES)
@@ -123,6 +125,11 @@ class Order(models.Model):
     weight = MeasurementField(
         measurement=Weight, unit_choices=WeightUnits.CHOICES,
         default=zero_weight)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+    checkout_token = models.CharField(
+        max_length=36, blank=True, editable=False)
+    idempotency_key = models.CharField(
+        max_length=255, null=True, blank=True, editable=False)
     objects = OrderQueryset.as_manager()
 
     class Meta:
@@ -130,6 +137,8 @@ class Order(models.Model):
         permissions = ((
             'manage_orders',
             pgettext_lazy('Permission description', 'Manage orders.')),)
+        indexes = [GinIndex(fields=['search_vector'])]
+        unique_together = (('checkout_token', 'idempotency_key'),)
 
     def save(self, *args, **kwargs):
         if not self.token:
@@ -377,3 +386,63 @@ class OrderEvent(models.Model):
 
     def get_event_display(self):
         return display_order_event(self)
+
+
+class DailySales(models.Model):
+    """Totals of orders placed on a day, excluding drafts and canceled ones.
+
+    Days are UTC days, the same as of the API's reporting periods. Kept up
+    to date by `saleor.order.utils.update_daily_sales` so reports do not
+    aggregate the whole order history.
+    """
+
+    date = models.DateField(unique=True)
+    orders_count = models.PositiveIntegerField(default=0)
+    total_net = MoneyField(
+        currency=settings.DEFAULT_CURRENCY,
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+        default=zero_money)
+    total_gross = MoneyField(
+        currency=settings.DEFAULT_CURRENCY,
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+        default=zero_money)
+    total = TaxedMoneyField(net_field='total_net', gross_field='total_gross')
+
+    class Meta:
+        ordering = ('date',)
+
+    def __repr__(self):
+        return 'DailySales(date=%r, orders_count=%r)' % (
+            self.date, self.orders_count)
+
+
+class DailyVariantSales(models.Model):
+    """Quantity and revenue of a variant sold on a day, see `DailySales`."""
+
+    date = models.DateField()
+    variant = models.ForeignKey(
+        'product.ProductVariant', related_name='daily_sales',
+        on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue_net = MoneyField(
+        currency=settings.DEFAULT_CURRENCY,
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+        default=zero_money)
+    revenue_gross = MoneyField(
+        currency=settings.DEFAULT_CURRENCY,
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES,
+        default=zero_money)
+    revenue = TaxedMoneyField(
+        net_field='revenue_net', gross_field='revenue_gross')
+
+    class Meta:
+        ordering = ('date',)
+        unique_together = (('date', 'variant'),)
+
+    def __repr__(self):
+        return 'DailyVariantSales(date=%r, variant_pk=%r, quantity=%r)' % (
+            self.date, self.variant_id, self.quantity)
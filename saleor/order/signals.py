@@ -0,0 +1,60 @@
+"""Updates of daily sales summaries.
+
+Days touched by saved or deleted orders and order lines are collected once
+the transaction commits and recalculated by a Celery task scheduled
+`SALES_UPDATE_DELAY` seconds later. Days already scheduled are not
+scheduled again, so each day is recalculated at most once per delay however
+many orders are placed.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ..core.utils.transactions import OnCommitQueue
+from . import OrderStatus
+from .models import Order, OrderLine
+from .tasks import (
+    SALES_UPDATE_DELAY, SALES_UPDATE_PENDING_KEY,
+    SALES_UPDATE_PENDING_TIMEOUT, update_sales_summaries)
+
+# Queued items are days of changed orders and the orders of changed lines
+DATE = 'date'
+ORDER = 'order'
+
+
+def send_sales_updates(updates):
+    """Schedule the summary task for days of queued changes."""
+    dates = {value for kind, value in updates if kind == DATE}
+    order_pks = {value for kind, value in updates if kind == ORDER}
+    if order_pks:
+        created = Order.objects.filter(pk__in=order_pks).exclude(
+            status=OrderStatus.DRAFT).values_list('created', flat=True)
+        dates.update(
+            value.astimezone(timezone.utc).date() for value in created)
+    unscheduled = [
+        date.isoformat() for date in sorted(dates)
+        if cache.add(
+            SALES_UPDATE_PENDING_KEY % date.isoformat(), True,
+            SALES_UPDATE_PENDING_TIMEOUT)]
+    if unscheduled:
+        update_sales_summaries.apply_async(
+            args=[unscheduled], countdown=SALES_UPDATE_DELAY)
+
+
+sales_updates = OnCommitQueue(send_sales_updates)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    if instance.status == OrderStatus.DRAFT:
+        return
+    date = instance.created.astimezone(timezone.utc).date()
+    sales_updates.add([(DATE, date)])
+
+
+@receiver(post_save, sender=OrderLine)
+@receiver(post_delete, sender=OrderLine)
+def order_line_changed(sender, instance, **kwargs):
+    sales_updates.add([(ORDER, instance.order_id)])
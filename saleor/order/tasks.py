@@ -0,0 +1,23 @@
+from celery import shared_task
+from django.core.cache import cache
+from django.utils.dateparse import parse_date
+
+from .utils import update_daily_sales
+
+# Days with summary updates scheduled, changes of their orders made
+# meanwhile are counted by the scheduled update
+SALES_UPDATE_PENDING_KEY = 'order:sales-update-pending:%s'
+# Number of seconds changes of orders are collected for before summaries
+# of their days are recalculated
+SALES_UPDATE_DELAY = 60
+# Lost updates stop blocking new ones once this many seconds pass
+SALES_UPDATE_PENDING_TIMEOUT = 10 * 60
+
+
+@shared_task
+def update_sales_summaries(dates):
+    """Recalculate sales summaries of days given as ISO 8601 strings."""
+    for date in dates:
+        # changes committed from now on schedule another update
+        cache.delete(SALES_UPDATE_PENDING_KEY % date)
+        update_daily_sales(parse_date(date))
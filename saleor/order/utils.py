@@ -1,7 +1,12 @@
+from datetime import datetime, time, timedelta
 from functools import wraps
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case, DecimalField, ExpressionWrapper, F, Sum, Value, When)
 from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
 from prices import Money, TaxedMoney
 
 from ..account.utils import store_user_address
@@ -11,9 +16,10 @@ from ..core.utils.taxes import (
 from ..dashboard.order.utils import get_voucher_discount_for_order
 from ..discount.models import NotApplicable
 from ..order import FulfillmentStatus, OrderStatus
-from ..order.models import OrderLine
+from ..order.models import DailySales, DailyVariantSales, Order, OrderLine
 from ..payment import ChargeStatus
-from ..product.utils import allocate_stock, deallocate_stock, increase_stock
+from ..product.utils import (
+    allocate_stock, allocate_stocks, deallocate_stock, increase_stock)
 
 
 def check_order_status(func):
@@ -65,10 +71,8 @@ def recalculate_order(order, **kwargs):
     Voucher discount amount is recalculated by default. To avoid this, pass
     update_voucher_discount argument set to False.
     """
-    # avoid using prefetched order lines
-    lines = [OrderLine.objects.get(pk=line.pk) for line in order]
-    prices = [line.get_total() for line in lines]
-    total = sum(prices, order.shipping_price)
+    # sum up lines in the database to avoid using prefetched order lines
+    total = get_lines_total(order) + order.shipping_price
     # discount amount can't be greater than order total
     order.discount_amount = min(order.discount_amount, total.gross)
     if order.discount_amount:
@@ -77,16 +81,47 @@ def recalculate_order(order, **kwargs):
     order.save()
 
 
+def get_lines_total(order):
+    """Return the total price of order lines using a single SQL aggregate."""
+    output_field = DecimalField(
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES)
+    totals = order.lines.aggregate(
+        net=Sum(
+            ExpressionWrapper(
+                F('unit_price_net') * F('quantity'),
+                output_field=output_field)),
+        gross=Sum(
+            ExpressionWrapper(
+                F('unit_price_gross') * F('quantity'),
+                output_field=output_field)))
+    currency = settings.DEFAULT_CURRENCY
+    return TaxedMoney(
+        net=Money(totals['net'] or 0, currency),
+        gross=Money(totals['gross'] or 0, currency))
+
+
 def update_order_prices(order, discounts):
-    """Update prices in order with given discounts and proper taxes."""
+    """Update prices in order with given discounts and proper taxes.
+
+    Lines are fetched once with everything needed to price them and only
+    the changed ones are saved, using a single query.
+    """
     taxes = get_taxes_for_address(order.shipping_address)
 
-    for line in order:
-        if line.variant:
-            line.unit_price = line.variant.get_price(discounts, taxes)
-            line.tax_rate = get_tax_rate_by_name(
-                line.variant.product.tax_rate, taxes)
-            line.save()
+    lines = order.lines.filter(variant__isnull=False).select_related(
+        'variant__product__product_type')
+    if discounts:
+        lines = lines.prefetch_related('variant__product__collections')
+    changed_lines = []
+    for line in lines:
+        unit_price = line.variant.get_price(discounts, taxes)
+        tax_rate = get_tax_rate_by_name(line.variant.product.tax_rate, taxes)
+        if unit_price != line.unit_price or tax_rate != line.tax_rate:
+            line.unit_price = unit_price
+            line.tax_rate = tax_rate
+            changed_lines.append(line)
+    _update_lines_prices(changed_lines)
 
     if order.shipping_method:
         order.shipping_price = order.shipping_method.get_total(taxes)
@@ -95,6 +130,21 @@ def update_order_prices(order, discounts):
     recalculate_order(order)
 
 
+def _update_lines_prices(lines):
+    if not lines:
+        return
+    updates = {
+        field: Case(
+            *[When(pk=line.pk, then=Value(value(line))) for line in lines],
+            output_field=DecimalField())
+        for field, value in (
+            ('unit_price_net', lambda line: line.unit_price.net.amount),
+            ('unit_price_gross', lambda line: line.unit_price.gross.amount),
+            ('tax_rate', lambda line: line.tax_rate))}
+    OrderLine.objects.filter(pk__in=[line.pk for line in lines]).update(
+        **updates)
+
+
 def cancel_order(order, restock):
     """Cancel order and associated fulfillments.
 
@@ -171,7 +221,12 @@ def add_variant_to_order(
     By default, raises InsufficientStock exception if  quantity could not be
     fulfilled. This can be disabled by setting `allow_overselling` to True.
     """
-    if not allow_overselling:
+    allocate = variant.track_inventory and track_inventory
+    if allocate and not allow_overselling:
+        allocate_stocks({variant: quantity})
+    elif allocate:
+        allocate_stock(variant, quantity)
+    elif not allow_overselling:
         variant.check_quantity(quantity)
     try:
         line = order.lines.get(variant=variant)
@@ -191,8 +246,6 @@ def add_variant_to_order(
             variant=variant,
             unit_price=variant.get_price(discounts, taxes),
             tax_rate=get_tax_rate_by_name(variant.product.tax_rate, taxes))
-    if variant.track_inventory and track_inventory:
-        allocate_stock(variant, quantity)
     return line
 
 
@@ -227,7 +280,61 @@ def restock_fulfillment_lines(fulfillment):
                 line.order_line.variant, line.quantity, allocate=True)
 
 
+def _get_taxed_money(net_amount, gross_amount):
+    currency = settings.DEFAULT_CURRENCY
+    return TaxedMoney(
+        net=Money(net_amount or 0, currency),
+        gross=Money(gross_amount or 0, currency))
+
+
 def sum_order_totals(qs):
-    zero = Money(0, currency=settings.DEFAULT_CURRENCY)
-    taxed_zero = TaxedMoney(zero, zero)
-    return sum([order.total for order in qs], taxed_zero)
+    """Sum totals of orders in the queryset in the database."""
+    totals = qs.aggregate(
+        net=Sum('total_net', output_field=DecimalField()),
+        gross=Sum('total_gross', output_field=DecimalField()))
+    return _get_taxed_money(totals['net'], totals['gross'])
+
+
+def get_sales_total(start_date):
+    """Return total of orders placed since the start of the given day."""
+    totals = DailySales.objects.filter(date__gte=start_date.date()).aggregate(
+        net=Sum('total_net', output_field=DecimalField()),
+        gross=Sum('total_gross', output_field=DecimalField()))
+    return _get_taxed_money(totals['net'], totals['gross'])
+
+
+@transaction.atomic
+def update_daily_sales(date):
+    """Recalculate sales summaries of a day from its orders.
+
+    The summary row of the day stays locked until the transaction ends, so
+    concurrent updates of the same day cannot overwrite each other's
+    results with stale ones.
+    """
+    DailySales.objects.get_or_create(date=date)
+    summary = DailySales.objects.select_for_update().get(date=date)
+    start = datetime.combine(date, time.min).replace(tzinfo=timezone.utc)
+    orders = Order.objects.confirmed().exclude(
+        status=OrderStatus.CANCELED).filter(
+            created__gte=start, created__lt=start + timedelta(days=1))
+    summary.orders_count = orders.count()
+    summary.total = sum_order_totals(orders)
+    summary.save(update_fields=['orders_count', 'total_net', 'total_gross'])
+
+    lines = OrderLine.objects.filter(
+        order__in=orders, variant__isnull=False).values('variant').annotate(
+            total_quantity=Sum('quantity'),
+            revenue_net=Sum(
+                F('unit_price_net') * F('quantity'),
+                output_field=DecimalField()),
+            revenue_gross=Sum(
+                F('unit_price_gross') * F('quantity'),
+                output_field=DecimalField()))
+    DailyVariantSales.objects.filter(date=date).delete()
+    DailyVariantSales.objects.bulk_create([
+        DailyVariantSales(
+            date=date, variant_id=line['variant'],
+            quantity=line['total_quantity'],
+            revenue=_get_taxed_money(
+                line['revenue_net'], line['revenue_gross']))
+        for line in lines])
@@ -0,0 +1,76 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+
+from . import ChargeStatus, PaymentError, TransactionKind
+from ..order import OrderEvents
+from ..order.utils import cancel_order
+from .models import Payment
+from .utils import gateway_authorize, gateway_capture, gateway_void
+
+logger = logging.getLogger(__name__)
+
+
+def is_authorized(payment):
+    return payment.transactions.filter(
+        kind=TransactionKind.AUTH, is_success=True).exists()
+
+
+def fail_payment(payment):
+    """Deactivate the payment and cancel its order, returning the stock."""
+    payment.is_active = False
+    payment.save(update_fields=['is_active'])
+    order = payment.order
+    if order:
+        cancel_order(order=order, restock=True)
+        order.events.create(type=OrderEvents.CANCELED.value)
+
+
+def get_payment_to_process(payment_pk):
+    """Lock and return the payment unless it is already settled."""
+    payment = Payment.objects.select_for_update().get(pk=payment_pk)
+    if not payment.is_active or (
+            payment.charge_status != ChargeStatus.NOT_CHARGED):
+        return None
+    return payment
+
+
+@shared_task
+def process_payment(payment_pk):
+    """Authorize and capture the payment of an order placed asynchronously.
+
+    The payment row stays locked while the gateway is called, so a task that
+    got delivered twice waits and then skips the payment that is already
+    charged. The authorization is committed before the capture starts, so
+    one that succeeded before a worker crash is not repeated and the task
+    proceeds straight to the capture.
+    """
+    with transaction.atomic():
+        payment = get_payment_to_process(payment_pk)
+        if payment is None:
+            return
+        if not is_authorized(payment):
+            try:
+                gateway_authorize(payment, payment.token)
+            except PaymentError:
+                logger.warning(
+                    'Authorization of payment %s failed', payment_pk,
+                    exc_info=True)
+                fail_payment(payment)
+                return
+
+    with transaction.atomic():
+        payment = get_payment_to_process(payment_pk)
+        if payment is None or not is_authorized(payment):
+            return
+        try:
+            gateway_capture(payment, payment.total)
+        except PaymentError:
+            logger.warning(
+                'Capture of payment %s failed', payment_pk, exc_info=True)
+            try:
+                gateway_void(payment)
+            except PaymentError:
+                logger.exception('Voiding payment %s failed', payment_pk)
+            fail_payment(payment)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ProductAppConfig(AppConfig):
+    name = 'saleor.product'
+
+    def ready(self):
+        from . import signals  # noqa
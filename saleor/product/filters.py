@@ -18,9 +18,16 @@ SORT_BY_FIELDS = OrderedDict([
 class ProductFilter(SortedFilterSet):
     sort_by = OrderingFilter(
         label=pgettext_lazy('Product list sorting form', 'Sort by'),
-        fields=SORT_BY_FIELDS.keys(),
-        field_labels=SORT_BY_FIELDS)
+        fields=OrderedDict([
+            ('name', 'name'),
+            ('summary__min_price', 'price'),
+            ('updated_at', 'updated_at')]),
+        field_labels={
+            'name': SORT_BY_FIELDS['name'],
+            'summary__min_price': SORT_BY_FIELDS['price'],
+            'updated_at': SORT_BY_FIELDS['updated_at']})
     price = RangeFilter(
+        field_name='summary__min_price',
         label=pgettext_lazy('Currency amount', 'Price'))
 
     class Meta:
@@ -0,0 +1,50 @@
+# Generated by Django 2.1.3 on 2026-10-18 18:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_prices.models
+
+
+def create_product_summaries(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    ProductSummary = apps.get_model('product', 'ProductSummary')
+    products = Product.objects.prefetch_related('variants')
+    summaries = []
+    for product in products:
+        variants = list(product.variants.all())
+        prices = [
+            variant.price_override or product.price for variant in variants]
+        if not prices:
+            prices = [product.price]
+        summaries.append(ProductSummary(
+            product=product, min_price=min(prices), max_price=max(prices),
+            quantity=sum(variant.quantity for variant in variants),
+            quantity_allocated=sum(
+                variant.quantity_allocated for variant in variants),
+            is_in_stock=any(
+                variant.quantity > variant.quantity_allocated
+                for variant in variants)))
+    ProductSummary.objects.bulk_create(summaries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0077_generate_versatile_background_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSummary',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='product.Product')),
+                ('min_price', django_prices.models.MoneyField(currency='USD', db_index=True, decimal_places=2, max_digits=12)),
+                ('max_price', django_prices.models.MoneyField(currency='USD', decimal_places=2, max_digits=12)),
+                ('quantity', models.IntegerField(db_index=True, default=0)),
+                ('quantity_allocated', models.IntegerField(default=0)),
+                ('is_in_stock', models.BooleanField(db_index=True, default=False)),
+            ],
+        ),
+        migrations.RunPython(
+            create_product_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Case-insensitive lookups (icontains, istartswith) compare upper-cased
+# values, so the indexes are built on upper-cased columns
+TRIGRAM_INDEXES = [
+    ('product_product', 'name'),
+    ('product_productvariant', 'name'),
+    ('product_productvariant', 'sku'),
+    ('product_category', 'name'),
+    ('product_collection', 'name')]
+
+
+def create_index_sql(table, column):
+    return (
+        'CREATE INDEX %s_%s_trgm ON %s USING gin '
+        '(UPPER(%s) gin_trgm_ops);' % (table, column, table, column))
+
+
+def drop_index_sql(table, column):
+    return 'DROP INDEX %s_%s_trgm;' % (table, column)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0080_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            create_index_sql(table, column), drop_index_sql(table, column))
+        for table, column in TRIGRAM_INDEXES]
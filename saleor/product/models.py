@@ -3,6 +3,8 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.contrib.postgres.fields import HStoreField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
@@ -111,6 +113,29 @@ class ProductQuerySet(models.QuerySet):
             return self.all()
         return self.available_products()
 
+    def update(self, **kwargs):
+        """Update products, their summaries and cached storefront pages.
+
+        Queryset updates send no signals, so summaries are refreshed here.
+        Search vectors are not shown anywhere, updating them alone needs no
+        refresh.
+        """
+        # pylint: disable=cyclic-import
+        from .utils import update_product_summaries
+        if set(kwargs) == {'search_vector'}:
+            return super().update(**kwargs)
+        product_pks = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        update_product_summaries(product_pks)
+        return updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # pylint: disable=cyclic-import
+        from .utils import update_product_summaries
+        objs = super().bulk_create(objs, *args, **kwargs)
+        update_product_summaries([obj.pk for obj in objs])
+        return objs
+
 
 class Product(SeoModel):
     product_type = models.ForeignKey(
@@ -133,12 +158,14 @@ class Product(SeoModel):
     weight = MeasurementField(
         measurement=Weight, unit_choices=WeightUnits.CHOICES,
         blank=True, null=True)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
 
     objects = ProductQuerySet.as_manager()
     translated = TranslationProxy()
 
     class Meta:
         app_label = 'product'
+        indexes = [GinIndex(fields=['search_vector'])]
         permissions = ((
             'manage_products', pgettext_lazy(
                 'Permission description',
@@ -209,6 +236,34 @@ class ProductTranslation(SeoModelTranslation):
             class_.__name__, self.pk, self.name, self.product_id)
 
 
+class ProductVariantQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """Update variants and the summaries of their products.
+
+        Queryset updates send no signals, so summaries are refreshed here.
+        Summaries of stock updates are refreshed after the commit, see
+        `queue_summary_update`.
+        """
+        # pylint: disable=cyclic-import
+        from .utils import queue_summary_update, update_product_summaries
+        from .utils.cache import is_stock_update
+        product_pks = set(self.values_list('product_id', flat=True))
+        updated = super().update(**kwargs)
+        if is_stock_update(kwargs):
+            queue_summary_update(product_pks)
+        else:
+            update_product_summaries(product_pks)
+        return updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # pylint: disable=cyclic-import
+        from .utils import update_product_summaries
+        objs = super().bulk_create(objs, *args, **kwargs)
+        update_product_summaries({obj.product_id for obj in objs})
+        return objs
+
+
 class ProductVariant(models.Model):
     sku = models.CharField(max_length=32, unique=True)
     name = models.CharField(max_length=255, blank=True)
@@ -232,6 +287,9 @@ class ProductVariant(models.Model):
     weight = MeasurementField(
         measurement=Weight, unit_choices=WeightUnits.CHOICES,
         blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    objects = ProductVariantQuerySet.as_manager()
     translated = TranslationProxy()
 
     class Meta:
@@ -325,6 +383,41 @@ class ProductVariantTranslation(models.Model):
         return self.name or str(self.product_variant)
 
 
+class ProductSummary(models.Model):
+    """Denormalized price and stock totals of a product's variants.
+
+    Kept up to date by `saleor.product.utils.update_product_summary` so
+    listings can filter and sort products without aggregating variants.
+    Saves and deletes refresh it through signals, queryset updates and
+    bulk creation of products and variants refresh it explicitly. Stock
+    changes refresh it after their transaction commits.
+    """
+
+    product = models.OneToOneField(
+        Product, related_name='summary', primary_key=True,
+        on_delete=models.CASCADE)
+    min_price = MoneyField(
+        currency=settings.DEFAULT_CURRENCY,
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES, db_index=True)
+    max_price = MoneyField(
+        currency=settings.DEFAULT_CURRENCY,
+        max_digits=settings.DEFAULT_MAX_DIGITS,
+        decimal_places=settings.DEFAULT_DECIMAL_PLACES)
+    quantity = models.IntegerField(default=0, db_index=True)
+    quantity_allocated = models.IntegerField(default=0)
+    is_in_stock = models.BooleanField(default=False, db_index=True)
+
+    class Meta:
+        app_label = 'product'
+
+    def __repr__(self):
+        class_ = type(self)
+        return '%s(product_pk=%r, quantity=%r, is_in_stock=%r)' % (
+            class_.__name__, self.product_id, self.quantity,
+            self.is_in_stock)
+
+
 class Attribute(models.Model):
     slug = models.SlugField(max_length=50)
     name = models.CharField(max_length=50)
@@ -0,0 +1,71 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from ..core.utils.cache import invalidate_on_commit
+from ..core.utils.rendered_text import render_field
+from .models import (
+    Collection, Product, ProductImage, ProductTranslation, ProductVariant)
+from .utils import queue_summary_update, update_product_summary
+from .utils.cache import (
+    invalidate_catalog_cache, invalidate_product_cache, is_stock_update)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_product_summary(instance)
+        invalidate_on_commit(invalidate_catalog_cache)
+        render_field(instance, 'description', 'plain')
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    invalidate_product_cache(instance.pk)
+    invalidate_on_commit(invalidate_catalog_cache)
+
+
+@receiver(post_save, sender=ProductTranslation)
+def product_translation_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        render_field(instance, 'description', 'plain')
+        invalidate_product_cache(instance.product_id)
+
+
+@receiver(post_save, sender=ProductVariant)
+def variant_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    # Stock changes alter no product lists, only the pages of products
+    # shown by them, which are checked separately
+    if is_stock_update(update_fields):
+        queue_summary_update([instance.product_id])
+    else:
+        update_product_summary(instance.product)
+        invalidate_on_commit(invalidate_catalog_cache)
+
+
+@receiver(post_delete, sender=ProductVariant)
+def variant_deleted(sender, instance, **kwargs):
+    # Variants are also deleted when their product is, so never recreate
+    # a summary that may already be gone
+    update_product_summary(instance.product, create=False)
+    invalidate_on_commit(invalidate_catalog_cache)
+
+
+@receiver(post_delete, sender=ProductTranslation)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_related_changed(sender, instance, **kwargs):
+    invalidate_product_cache(instance.product_id)
+
+
+@receiver(m2m_changed, sender=Collection.products.through)
+def collection_products_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    invalidate_on_commit(invalidate_catalog_cache)
+    if isinstance(instance, Product):
+        invalidate_product_cache(instance.pk)
+    elif pk_set:
+        for product_pk in pk_set:
+            invalidate_product_cache(product_pk)
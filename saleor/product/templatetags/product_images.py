@@ -6,6 +6,9 @@ from django import template
 from django.conf import settings
 from django.templatetags.static import static
 
+from ...core.utils.thumbnails import (
+    cache_thumbnail_url, get_cached_thumbnail_url)
+
 logger = logging.getLogger(__name__)
 register = template.Library()
 
@@ -84,8 +87,16 @@ def get_thumbnail_size(size, method, rendition_key_set):
 
 @register.simple_tag()
 def get_thumbnail(instance, size, method, rendition_key_set='products'):
+    """Return the URL of a thumbnail of an image.
+
+    Thumbnails recorded in the manifest are resolved without checking
+    the storage, others are created on demand if enabled.
+    """
     if instance:
         used_size = get_thumbnail_size(size, method, rendition_key_set)
+        url = get_cached_thumbnail_url(instance, method, used_size)
+        if url is not None:
+            return url
         try:
             thumbnail = getattr(instance, method)[used_size]
         except Exception:
@@ -93,5 +104,10 @@ def get_thumbnail(instance, size, method, rendition_key_set='products'):
                 'Thumbnail fetch failed',
                 extra={'instance': instance, 'size': size})
         else:
+            if settings.VERSATILEIMAGEFIELD_SETTINGS[
+                    'create_images_on_demand']:
+                # The thumbnail was created if it didn't exist
+                cache_thumbnail_url(
+                    instance, method, used_size, thumbnail.url)
             return thumbnail.url
     return static(choose_placeholder('%sx%s' % (size, size)))
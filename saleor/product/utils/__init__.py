@@ -2,15 +2,24 @@ from urllib.parse import urlencode
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.db.models import F
+from django.db import transaction
+from django.db.models import (
+    Case, DecimalField, F, IntegerField, Sum, Value, When)
 
 from ...checkout.utils import (
     get_cart_from_request, get_or_create_cart_from_request)
+from ...core.exceptions import InsufficientStock
 from ...core.utils import get_paginator_items
+from ...core.utils.cache import invalidate_on_commit
 from ...core.utils.filters import get_now_sorted_by
-from ...core.utils.taxes import ZERO_TAXED_MONEY, TaxedMoney
+from ...core.utils.taxes import Money, TaxedMoney
+from ...core.utils.transactions import OnCommitQueue
 from ..forms import ProductForm
 from .availability import products_with_availability
+from .cache import (
+    get_catalog_version, get_or_build, get_storefront_cache_key,
+    get_storefront_versions, invalidate_catalog_cache,
+    invalidate_product_cache, is_cacheable)
 
 
 def products_visible_to_user(user):
@@ -81,6 +90,69 @@ def get_variant_url(variant):
     return get_variant_url_from_product(variant.product, attributes)
 
 
+def update_product_summary(product, create=True):
+    """Recalculate the price and stock summary of a product.
+
+    Pass `create=False` to only update an existing summary, e.g. while the
+    product itself may be in the middle of being deleted.
+    """
+    # pylint: disable=cyclic-import
+    from ..models import ProductSummary
+    variants = list(product.variants.values_list(
+        'price_override', 'quantity', 'quantity_allocated'))
+    prices = [price or product.price for price, _, _ in variants]
+    if not prices:
+        prices = [product.price]
+    values = {
+        'min_price': min(prices),
+        'max_price': max(prices),
+        'quantity': sum(quantity for _, quantity, _ in variants),
+        'quantity_allocated': sum(
+            allocated for _, _, allocated in variants),
+        'is_in_stock': any(
+            quantity > allocated for _, quantity, allocated in variants)}
+    updated = ProductSummary.objects.filter(product=product).update(**values)
+    if not updated and create:
+        ProductSummary.objects.create(product=product, **values)
+    invalidate_on_commit(invalidate_product_cache, product.pk)
+
+
+def update_product_summaries(product_pks):
+    """Recalculate summaries of products changed without sending signals."""
+    # pylint: disable=cyclic-import
+    from ..models import Product
+    for product in Product.objects.filter(pk__in=product_pks):
+        update_product_summary(product)
+    invalidate_on_commit(invalidate_catalog_cache)
+
+
+def refresh_product_summaries(product_pks):
+    """Recalculate summaries of products, each in a transaction of its own.
+
+    Each summary is locked before its variants are read, so the summary
+    refreshed last always counts stock committed by all transactions.
+    """
+    # pylint: disable=cyclic-import
+    from ..models import Product, ProductSummary
+    for product in Product.objects.filter(pk__in=product_pks):
+        with transaction.atomic():
+            list(ProductSummary.objects.select_for_update().filter(
+                product=product))
+            update_product_summary(product)
+
+
+summary_updates = OnCommitQueue(refresh_product_summaries)
+
+
+def queue_summary_update(product_pks):
+    """Refresh summaries of products with changed stock after the commit.
+
+    Transactions changing stock, e.g. checkouts, never lock summaries, so
+    buyers of variants of the same product do not wait for each other.
+    """
+    summary_updates.add(product_pks)
+
+
 def allocate_stock(variant, quantity):
     variant.quantity_allocated = F('quantity_allocated') + quantity
     variant.save(update_fields=['quantity_allocated'])
@@ -91,6 +163,55 @@ def deallocate_stock(variant, quantity):
     variant.save(update_fields=['quantity_allocated'])
 
 
+def _get_quantity_expression(quantities):
+    return Case(
+        *[When(pk=variant.pk, then=Value(quantity))
+          for variant, quantity in quantities.items()],
+        output_field=IntegerField())
+
+
+def allocate_stocks(quantities):
+    """Allocate stock of several variants in a single statement.
+
+    `quantities` maps variants to the quantity to allocate. Only rows that
+    still have enough stock available are updated, so concurrent checkouts
+    can never allocate the same units and each row is locked only for the
+    duration of the statement.
+
+    Raise InsufficientStock and allocate nothing if any variant runs short.
+    """
+    # pylint: disable=cyclic-import
+    from ..models import ProductVariant
+    if not quantities:
+        return
+    requested = _get_quantity_expression(quantities)
+    with transaction.atomic():
+        updated = ProductVariant.objects.filter(
+            pk__in=[variant.pk for variant in quantities],
+            quantity__gte=F('quantity_allocated') + requested).update(
+                quantity_allocated=F('quantity_allocated') + requested)
+        if updated < len(quantities):
+            transaction.set_rollback(True)
+    if updated < len(quantities):
+        for variant, quantity in quantities.items():
+            variant.refresh_from_db(fields=['quantity', 'quantity_allocated'])
+            if quantity > variant.quantity_available:
+                raise InsufficientStock(variant)
+        raise InsufficientStock(next(iter(quantities)))
+
+
+def deallocate_stocks(quantities):
+    """Deallocate stock of several variants in a single statement."""
+    # pylint: disable=cyclic-import
+    from ..models import ProductVariant
+    if not quantities:
+        return
+    ProductVariant.objects.filter(
+        pk__in=[variant.pk for variant in quantities]).update(
+            quantity_allocated=F('quantity_allocated') - (
+                _get_quantity_expression(quantities)))
+
+
 def decrease_stock(variant, quantity):
     variant.quantity = F('quantity') - quantity
     variant.quantity_allocated = F('quantity_allocated') - quantity
@@ -107,22 +228,51 @@ def increase_stock(variant, quantity, allocate=False):
     variant.save(update_fields=update_fields)
 
 
-def get_product_list_context(request, filter_set):
-    """
-    :param request: request object
-    :param filter_set: filter set for product list
-    :return: context dictionary
+def get_products_page(request, filter_set, track_products=None):
+    """Return products of the requested page with their availability.
+
+    The total number of products in the list is returned as well. Primary
+    keys of the products are passed to `track_products` before the
+    products are fetched, see `get_or_build`.
     """
-    # Avoiding circular dependency
-    from ..filters import SORT_BY_FIELDS
     qs = filter_set.qs
     if not filter_set.form.is_valid():
         qs = qs.none()
     products_paginated = get_paginator_items(
         qs, settings.PAGINATE_BY, request.GET.get('page'))
+    if track_products is not None:
+        track_products(list(
+            products_paginated.object_list.prefetch_related(
+                None).values_list('pk', flat=True)))
     products_and_availability = list(products_with_availability(
         products_paginated, request.discounts, request.taxes,
         request.currency))
+    return products_and_availability, products_paginated.paginator.count
+
+
+def get_product_list_context(request, filter_set, cache_name=None):
+    """
+    :param request: request object
+    :param filter_set: filter set for product list
+    :param cache_name: name of the list, caches it for anonymous visitors
+    :return: context dictionary
+    """
+    # Avoiding circular dependency
+    from ..filters import SORT_BY_FIELDS
+    if cache_name is not None and is_cacheable(request):
+        key = get_storefront_cache_key(
+            request, '%s:%s' % (cache_name, request.GET.urlencode()))
+        products_and_availability, count = get_or_build(
+            key, get_storefront_versions(get_catalog_version()),
+            lambda track_products: get_products_page(
+                request, filter_set, track_products),
+            track_products=True)
+    else:
+        products_and_availability, count = get_products_page(
+            request, filter_set)
+    # Only the numbers of pages are used, the products are already fetched
+    products_paginated = get_paginator_items(
+        range(count), settings.PAGINATE_BY, request.GET.get('page'))
     now_sorted_by = get_now_sorted_by(filter_set)
     arg_sort_by = request.GET.get('sort_by')
     is_descending = arg_sort_by.startswith('-') if arg_sort_by else False
@@ -144,11 +294,16 @@ def collections_visible_to_user(user):
 
 
 def calculate_revenue_for_variant(variant, start_date):
-    """Calculate total revenue generated by a product variant."""
-    revenue = ZERO_TAXED_MONEY
-    for order_line in variant.order_lines.all():
-        if order_line.order.created >= start_date:
-            net = order_line.unit_price_net * order_line.quantity
-            gross = order_line.unit_price_gross * order_line.quantity
-            revenue += TaxedMoney(net, gross)
-    return revenue
+    """Calculate total revenue generated by a product variant.
+
+    Summed from daily sales summaries of the variant, so the cost does not
+    grow with the number of orders.
+    """
+    revenue = variant.daily_sales.filter(
+        date__gte=start_date.date()).aggregate(
+            net=Sum('revenue_net', output_field=DecimalField()),
+            gross=Sum('revenue_gross', output_field=DecimalField()))
+    currency = settings.DEFAULT_CURRENCY
+    return TaxedMoney(
+        net=Money(revenue['net'] or 0, currency),
+        gross=Money(revenue['gross'] or 0, currency))
@@ -1,18 +1,30 @@
 from collections import namedtuple
 
+from django.db.models import prefetch_related_objects
+from prices import TaxedMoney, TaxedMoneyRange
+
 from .. import ProductAvailabilityStatus, VariantAvailabilityStatus
 from ...core.utils import to_local_currency
+from ...core.utils.taxes import get_tax_by_name, include_taxes_in_prices
+from ...discount.utils import get_product_discounts
 
 ProductAvailability = namedtuple(
     'ProductAvailability', (
         'available', 'on_sale', 'price_range', 'price_range_undiscounted',
         'discount', 'price_range_local_currency', 'discount_local_currency'))
 
+VariantPrice = namedtuple(
+    'VariantPrice', ('variant', 'price', 'price_undiscounted'))
+
+ProductPrices = namedtuple(
+    'ProductPrices', ('variants', 'price_range', 'price_range_undiscounted'))
+
 
 def products_with_availability(products, discounts, taxes, local_currency):
-    for product in products:
-        yield (product, get_availability(
-            product, discounts, taxes, local_currency))
+    products = list(products)
+    availabilities = get_product_availabilities(
+        products, discounts, taxes, local_currency)
+    return zip(products, availabilities)
 
 
 def get_product_availability_status(product):
@@ -49,6 +61,114 @@ def get_availability(product, discounts=None, taxes=None, local_currency=None):
     # In default currency
     price_range = product.get_price_range(discounts=discounts, taxes=taxes)
     undiscounted = product.get_price_range(taxes=taxes)
+    return _get_availability_for_price_ranges(
+        product, price_range, undiscounted, local_currency)
+
+
+def get_product_prices(product, discounts=None, taxes=None):
+    """Return price ranges of a product and prices of each of its variants.
+
+    Every variant is priced once with and once without discounts, while
+    site settings, taxes and sales of the product are resolved only once,
+    so the prices can be shared by everything shown on a product page.
+    Returns prices equal to `get_availability` and `ProductVariant.get_price`.
+    """
+    keep_gross = include_taxes_in_prices() if taxes else None
+    tax = _get_product_tax(product, taxes)
+    product_discounts = []
+    if discounts:
+        product_discounts = list(get_product_discounts(product, discounts))
+    variant_prices = [
+        VariantPrice(
+            variant,
+            _get_price(
+                variant.base_price, product_discounts, tax, keep_gross),
+            _get_price(variant.base_price, None, tax, keep_gross))
+        for variant in product.variants.all()]
+    if variant_prices:
+        prices = [variant_price.price for variant_price in variant_prices]
+        undiscounted = [
+            variant_price.price_undiscounted
+            for variant_price in variant_prices]
+    else:
+        prices = [_get_price(
+            product.price, product_discounts, tax, keep_gross)]
+        undiscounted = [_get_price(product.price, None, tax, keep_gross)]
+    return ProductPrices(
+        variant_prices, TaxedMoneyRange(min(prices), max(prices)),
+        TaxedMoneyRange(min(undiscounted), max(undiscounted)))
+
+
+def get_availability_from_prices(product, prices, local_currency=None):
+    """Return availability of a product priced by `get_product_prices`."""
+    return _get_availability_for_price_ranges(
+        product, prices.price_range, prices.price_range_undiscounted,
+        local_currency)
+
+
+def get_product_availabilities(
+        products, discounts=None, taxes=None, local_currency=None):
+    """Return a list of availabilities for a page of products.
+
+    Works like calling `get_availability` for each product but resolves
+    site settings once per page and the sales of a product once per
+    product. Since discounts and taxes never change the order of prices
+    only the cheapest and the most expensive variant are priced.
+    Products are expected to have their variants prefetched.
+    """
+    products = list(products)
+    keep_gross = None
+    if taxes:
+        keep_gross = include_taxes_in_prices()
+        prefetch_related_objects(
+            [product for product in products if not product.tax_rate],
+            'product_type')
+    return [
+        _get_bulk_availability(
+            product, discounts, taxes, keep_gross, local_currency)
+        for product in products]
+
+
+def _get_bulk_availability(
+        product, discounts, taxes, keep_gross, local_currency):
+    base_prices = [
+        variant.price_override or product.price for variant in product]
+    if not base_prices:
+        base_prices = [product.price]
+    cheapest, most_expensive = min(base_prices), max(base_prices)
+
+    tax = _get_product_tax(product, taxes)
+    product_discounts = []
+    if discounts:
+        product_discounts = list(get_product_discounts(product, discounts))
+
+    price_range = TaxedMoneyRange(
+        _get_price(cheapest, product_discounts, tax, keep_gross),
+        _get_price(most_expensive, product_discounts, tax, keep_gross))
+    undiscounted = TaxedMoneyRange(
+        _get_price(cheapest, None, tax, keep_gross),
+        _get_price(most_expensive, None, tax, keep_gross))
+    return _get_availability_for_price_ranges(
+        product, price_range, undiscounted, local_currency)
+
+
+def _get_product_tax(product, taxes):
+    if not product.charge_taxes or not taxes:
+        return None
+    tax_rate = product.tax_rate or product.product_type.tax_rate
+    return get_tax_by_name(tax_rate, taxes)
+
+
+def _get_price(base, discounts, tax, keep_gross):
+    if discounts:
+        base = min(discount(base) for discount in discounts)
+    if tax is not None:
+        return tax(base, keep_gross=keep_gross)
+    return TaxedMoney(net=base, gross=base)
+
+
+def _get_availability_for_price_ranges(
+        product, price_range, undiscounted, local_currency):
     if undiscounted.start > price_range.start:
         discount = undiscounted.start - price_range.start
     else:
@@ -70,9 +190,10 @@ def get_availability(product, discounts=None, taxes=None, local_currency=None):
         price_range_local = None
         discount_local_currency = None
 
-    is_available = product.is_in_stock() and product.is_available()
+    is_product_available = product.is_available()
+    is_available = product.is_in_stock() and is_product_available
     is_on_sale = (
-        product.is_available() and discount is not None and
+        is_product_available and discount is not None and
         undiscounted.start != price_range.start)
 
     return ProductAvailability(
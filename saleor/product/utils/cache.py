@@ -0,0 +1,164 @@
+"""Cache of storefront product pages for anonymous visitors.
+
+Product details and product lists only vary by language, currency, country,
+date and the versions of the products, sales, tax rates and site settings
+they show, so data rendered for one anonymous visitor is reused for all
+others. Product versions are changed whenever product summaries are
+updated, which happens on every change of a product, its variants or their
+stock, see `update_product_summary`.
+
+Product lists are checked against the versions of the products they show,
+so a stock change only rebuilds the pages listing that product. The
+catalog version changes when the products a list may contain could
+change, e.g. when products are saved, deleted or added to collections, but
+not when their stock does.
+"""
+import datetime
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from ...core.utils.cache import bump_version, get_version
+from ...core.utils.taxes import get_tax_rates_version
+from ...discount.utils import get_sale_index_version
+from ...site.patch_sites import get_site_cache_version
+
+PRODUCT_VERSION_KEY = 'product:version:%s'
+CATALOG_VERSION_KEY = 'product:catalog-version'
+STOREFRONT_CACHE_KEY = 'storefront:%s'
+STOREFRONT_LOCK_KEY = 'storefront-lock:%s'
+# Longest time a rebuild of an outdated entry may take before another
+# process rebuilds it
+STOREFRONT_LOCK_TIMEOUT = 30
+# Longest time to wait for another process building a missing entry
+STOREFRONT_LOCK_WAIT = 3
+STOREFRONT_LOCK_POLL_INTERVAL = 0.1
+# Variant fields that never change which products a list contains
+STOCK_FIELDS = {'quantity', 'quantity_allocated'}
+
+
+def get_product_version(product_pk):
+    return get_version(PRODUCT_VERSION_KEY % product_pk)
+
+
+def get_product_versions(product_pks):
+    """Return a dict of versions of several products fetched at once."""
+    keys = {PRODUCT_VERSION_KEY % pk: pk for pk in product_pks}
+    versions = cache.get_many(keys.keys())
+    return {
+        pk: versions.get(key) or get_version(key)
+        for key, pk in keys.items()}
+
+
+def get_catalog_version():
+    """Return the version of the products contained by product lists."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def invalidate_catalog_cache():
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def invalidate_product_cache(product_pk):
+    bump_version(PRODUCT_VERSION_KEY % product_pk)
+
+
+def is_stock_update(update_fields):
+    """Return whether the updated variant fields only concern stock."""
+    return bool(update_fields) and STOCK_FIELDS.issuperset(update_fields)
+
+
+def is_cacheable(request):
+    return request.method == 'GET' and not request.user.is_authenticated
+
+
+def get_storefront_cache_key(request, name):
+    """Return the cache key of data shown to anonymous visitors."""
+    parts = [
+        name, get_language(), request.currency, request.country.code,
+        datetime.date.today().isoformat()]
+    return STOREFRONT_CACHE_KEY % md5(
+        ':'.join(parts).encode('utf-8')).hexdigest()
+
+
+def get_storefront_versions(*versions):
+    """Return versions of the data shown and of everything affecting it."""
+    versions = versions + (
+        get_sale_index_version(), get_site_cache_version())
+    if settings.VATLAYER_ACCESS_KEY:
+        versions += (get_tax_rates_version(),)
+    return versions
+
+
+def is_current(entry, versions):
+    entry_versions, product_versions, _ = entry
+    if entry_versions != versions:
+        return False
+    return not product_versions or (
+        get_product_versions(product_versions) == product_versions)
+
+
+def wait_for_entry(key):
+    """Wait for another process to build a missing entry.
+
+    Return None if it is not built in time.
+    """
+    lock_key = STOREFRONT_LOCK_KEY % key
+    deadline = time.monotonic() + STOREFRONT_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(STOREFRONT_LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None or not cache.get(lock_key):
+            return entry
+    return None
+
+
+def get_or_build(key, versions, build, track_products=False):
+    """Return cached data or build and cache it.
+
+    Entries store the versions of the data they were built from, which must
+    be read before the data. Pass `track_products` for lists of products,
+    `build` is then called with a function it must pass primary keys of the
+    listed products to before reading them. Versions of those products are
+    stored too and the entry is outdated once any of them changes.
+
+    Entries are built by a single process holding a lock. Meanwhile others
+    keep serving the outdated entry or wait for a missing one, so changing
+    a popular product or an expiring entry does not send all visitors to
+    the database at once.
+
+    Nothing is cached unless the cache is shared by all processes.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return build(lambda product_pks: None) if track_products else build()
+    cached = cache.get(key)
+    if cached is not None and is_current(cached, versions):
+        return cached[2]
+    lock_key = STOREFRONT_LOCK_KEY % key
+    locked = cache.add(lock_key, True, STOREFRONT_LOCK_TIMEOUT)
+    if not locked:
+        if cached is None:
+            cached = wait_for_entry(key)
+        if cached is not None:
+            return cached[2]
+    try:
+        if track_products:
+            product_versions = {}
+
+            def read_product_versions(product_pks):
+                product_versions.update(get_product_versions(product_pks))
+
+            data = build(read_product_versions)
+        else:
+            product_versions = None
+            data = build()
+        cache.set(
+            key, (versions, product_versions, data),
+            settings.STOREFRONT_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return data
@@ -5,23 +5,34 @@ from django_prices.templatetags import prices_i18n
 from ...core.utils import to_local_currency
 from ...core.utils.taxes import display_gross_prices, get_tax_rate_by_name
 from ...seo.schema.product import variant_json_ld
-from .availability import get_availability
+from .availability import get_availability_from_prices, get_product_prices
 
 
 def get_variant_picker_data(
-        product, discounts=None, taxes=None, local_currency=None):
-    availability = get_availability(product, discounts, taxes, local_currency)
-    variants = product.variants.all()
+        product, discounts=None, taxes=None, local_currency=None,
+        prices=None, availability=None):
+    """Return data of the variant picker of a product page.
+
+    Pass prices from `get_product_prices` and availability computed from
+    them to share them with the rest of the page instead of pricing
+    the variants again.
+    """
+    # pylint: disable=cyclic-import
+    from ..models import AttributeValue
+
+    if prices is None:
+        prices = get_product_prices(product, discounts, taxes)
+    if availability is None:
+        availability = get_availability_from_prices(
+            product, prices, local_currency)
     data = {'variantAttributes': [], 'variants': []}
 
     variant_attributes = product.product_type.variant_attributes.all()
 
     # Collect only available variants
-    filter_available_variants = defaultdict(list)
+    filter_available_variants = defaultdict(set)
 
-    for variant in variants:
-        price = variant.get_price(discounts, taxes)
-        price_undiscounted = variant.get_price(taxes=taxes)
+    for variant, price, price_undiscounted in prices.variants:
         if local_currency:
             price_local_currency = to_local_currency(price, local_currency)
         else:
@@ -39,13 +50,23 @@ def get_variant_picker_data(
         data['variants'].append(variant_data)
 
         for variant_key, variant_value in variant.attributes.items():
-            filter_available_variants[int(variant_key)].append(
+            filter_available_variants[int(variant_key)].add(
                 int(variant_value))
 
+    values_by_attribute = defaultdict(list)
+    value_pks = set().union(*filter_available_variants.values())
+    if value_pks:
+        values = AttributeValue.objects.filter(
+            attribute__in=variant_attributes,
+            pk__in=value_pks).prefetch_related('translations')
+        for value in values:
+            if value.pk in filter_available_variants[value.attribute_id]:
+                values_by_attribute[value.attribute_id].append(value)
+
     for attribute in variant_attributes:
-        available_variants = filter_available_variants.get(attribute.pk, None)
+        available_values = values_by_attribute.get(attribute.pk)
 
-        if available_variants:
+        if available_values:
             data['variantAttributes'].append({
                 'pk': attribute.pk,
                 'name': attribute.translated.name,
@@ -54,9 +75,7 @@ def get_variant_picker_data(
                     {
                         'pk': value.pk, 'name': value.translated.name,
                         'slug': value.translated.slug}
-                    for value in attribute.values.filter(
-                        pk__in=available_variants).prefetch_related(
-                            'translations')]})
+                    for value in available_values]})
 
     data['availability'] = {
         'discount': price_as_dict(availability.discount),
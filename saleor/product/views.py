@@ -16,7 +16,11 @@ from .utils import (
     handle_cart_form, products_for_cart, products_for_products_list,
     products_with_details)
 from .utils.attributes import get_product_attributes_data
-from .utils.availability import get_availability
+from .utils.availability import (
+    get_availability_from_prices, get_product_prices)
+from .utils.cache import (
+    get_or_build, get_product_version, get_storefront_cache_key,
+    get_storefront_versions, is_cacheable)
 from .utils.variants_picker import get_variant_picker_data
 
 
@@ -50,28 +54,54 @@ def product_details(request, slug, product_id, form=None):
         currency. The value will be None if exchange rate is not available or
         the local currency is the same as site's default currency.
     """
-    products = products_with_details(user=request.user)
-    product = get_object_or_404(products, id=product_id)
+    if form is None and is_cacheable(request):
+        key = get_storefront_cache_key(
+            request, 'product-details:%s' % (product_id,))
+        versions = get_storefront_versions(get_product_version(product_id))
+        ctx = get_or_build(
+            key, versions,
+            lambda: get_product_details_context(request, product_id))
+    else:
+        ctx = get_product_details_context(request, product_id)
+    product = ctx['product']
     if product.get_slug() != slug:
         return HttpResponsePermanentRedirect(product.get_absolute_url())
+    if form is None:
+        form = handle_cart_form(request, product, create_cart=False)[0]
+    ctx = dict(ctx, form=form)
+    return TemplateResponse(request, 'product/details.html', ctx)
+
+
+def get_product_details_context(request, product_id):
+    """Return data of the product details page shared by all visitors.
+
+    Contains everything but the add-to-cart form, so it may be cached for
+    anonymous visitors.
+    """
+    products = products_with_details(user=request.user)
+    product = get_object_or_404(products, id=product_id)
     today = datetime.date.today()
     is_visible = (
         product.available_on is None or product.available_on <= today)
-    if form is None:
-        form = handle_cart_form(request, product, create_cart=False)[0]
-    availability = get_availability(
-        product, discounts=request.discounts, taxes=request.taxes,
-        local_currency=request.currency)
+    # Variants are priced once for the whole page
+    prices = get_product_prices(
+        product, discounts=request.discounts, taxes=request.taxes)
+    availability = get_availability_from_prices(
+        product, prices, local_currency=request.currency)
     product_images = get_product_images(product)
     variant_picker_data = get_variant_picker_data(
-        product, request.discounts, request.taxes, request.currency)
+        product, request.discounts, request.taxes, request.currency,
+        prices=prices, availability=availability)
     product_attributes = get_product_attributes_data(product)
     # show_variant_picker determines if variant picker is used or select input
     show_variant_picker = all([v.attributes for v in product.variants.all()])
-    json_ld_data = product_json_ld(product, product_attributes)
-    ctx = {
+    json_ld_data = product_json_ld(
+        product, product_attributes,
+        variant_prices=[
+            (variant_price.variant, variant_price.price)
+            for variant_price in prices.variants])
+    return {
         'is_visible': is_visible,
-        'form': form,
         'availability': availability,
         'product': product,
         'product_attributes': product_attributes,
@@ -81,7 +111,6 @@ def product_details(request, slug, product_id, form=None):
             variant_picker_data, default=serialize_decimal),
         'json_ld_product_data': json.dumps(
             json_ld_data, default=serialize_decimal)}
-    return TemplateResponse(request, 'product/details.html', ctx)
 
 
 def product_add_to_cart(request, slug, product_id):
@@ -125,7 +154,8 @@ def category_index(request, slug, category_id):
         category__in=categories).order_by('name')
     product_filter = ProductCategoryFilter(
         request.GET, queryset=products, category=category)
-    ctx = get_product_list_context(request, product_filter)
+    ctx = get_product_list_context(
+        request, product_filter, cache_name='category:%s' % (category.pk,))
     ctx.update({'object': category})
     return TemplateResponse(request, 'category/index.html', ctx)
 
@@ -140,6 +170,8 @@ def collection_index(request, slug, pk):
         collections__id=collection.id).order_by('name')
     product_filter = ProductCollectionFilter(
         request.GET, queryset=products, collection=collection)
-    ctx = get_product_list_context(request, product_filter)
+    ctx = get_product_list_context(
+        request, product_filter,
+        cache_name='collection:%s' % (collection.pk,))
     ctx.update({'object': collection})
     return TemplateResponse(request, 'collection/index.html', ctx)
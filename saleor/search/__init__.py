@@ -0,0 +1,5 @@
+default_app_config = 'saleor.search.apps.SearchAppConfig'
+
+# Shortest phrase to suggest results for, Elasticsearch indexes prefixes of
+# product titles starting from this length so they match on all backends
+MIN_PHRASE_LENGTH = 2
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+POSTGRESQL_BACKEND = 'saleor.search.backends.postgresql'
+
+
+class SearchAppConfig(AppConfig):
+    name = 'saleor.search'
+
+    def ready(self):
+        from . import signals
+        if settings.SEARCH_BACKEND == POSTGRESQL_BACKEND:
+            signals.connect_search_vector_updates()
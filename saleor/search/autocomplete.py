@@ -0,0 +1,81 @@
+"""Search suggestions for storefront typeahead.
+
+Products are suggested by the configured search backend, categories and
+collections by prefix and substring matches of their names, which are
+served by trigram indexes. Suggestions for recently typed phrases are
+cached in memory of each process for `SUGGESTIONS_CACHE_TIMEOUT` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models import Case, IntegerField, Value, When
+
+from ..product.models import Category, Collection
+from . import MIN_PHRASE_LENGTH
+from .backends.picker import pick_autocomplete_backend
+
+SUGGESTIONS_CACHE_SIZE = 1000
+SUGGESTIONS_CACHE_TIMEOUT = 60
+
+lock = threading.Lock()
+SUGGESTIONS_CACHE = OrderedDict()
+
+
+def order_by_prefix_match(queryset, phrase, field='name'):
+    """Order objects with names starting with the phrase first."""
+    prefix_match = Case(
+        When(**{'%s__istartswith' % field: phrase, 'then': Value(0)}),
+        default=Value(1), output_field=IntegerField())
+    return queryset.annotate(prefix_match=prefix_match).order_by(
+        'prefix_match', field)
+
+
+def get_suggestion(kind, obj):
+    return {'kind': kind, 'name': obj.name, 'url': obj.get_absolute_url()}
+
+
+def build_suggestions(phrase, limit):
+    products = pick_autocomplete_backend()(phrase, limit)
+    suggestions = [get_suggestion('product', product) for product in products]
+    if len(suggestions) < limit:
+        categories = order_by_prefix_match(
+            Category.objects.filter(name__icontains=phrase), phrase)
+        suggestions += [
+            get_suggestion('category', category)
+            for category in categories[:limit - len(suggestions)]]
+    if len(suggestions) < limit:
+        collections = order_by_prefix_match(
+            Collection.objects.public().filter(name__icontains=phrase),
+            phrase)
+        suggestions += [
+            get_suggestion('collection', collection)
+            for collection in collections[:limit - len(suggestions)]]
+    return suggestions
+
+
+def get_suggestions(phrase, limit=10):
+    """Return up to `limit` suggestions of products, categories and
+    collections matching a phrase typed by the user."""
+    phrase = ' '.join(phrase.lower().split())
+    if len(phrase) < MIN_PHRASE_LENGTH:
+        return []
+    key = (phrase, limit)
+    now = time.monotonic()
+    with lock:
+        cached = SUGGESTIONS_CACHE.get(key)
+        if cached is not None and cached[0] > now:
+            SUGGESTIONS_CACHE.move_to_end(key)
+            return cached[1]
+    suggestions = build_suggestions(phrase, limit)
+    with lock:
+        SUGGESTIONS_CACHE[key] = (now + SUGGESTIONS_CACHE_TIMEOUT, suggestions)
+        SUGGESTIONS_CACHE.move_to_end(key)
+        while len(SUGGESTIONS_CACHE) > SUGGESTIONS_CACHE_SIZE:
+            SUGGESTIONS_CACHE.popitem(last=False)
+    return suggestions
+
+
+def clear_suggestions_cache():
+    with lock:
+        SUGGESTIONS_CACHE.clear()
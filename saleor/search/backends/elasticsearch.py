@@ -7,3 +7,7 @@ def search_storefront(phrase):
 
 def search_dashboard(phrase):
     return elasticsearch_dashboard.search(phrase)
+
+
+def autocomplete_products(phrase, limit):
+    return elasticsearch_storefront.autocomplete(phrase, limit)
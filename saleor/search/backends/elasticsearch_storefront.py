@@ -15,3 +15,17 @@ def get_search_query(phrase):
 
 def search(phrase):
     return get_search_query(phrase).to_queryset()
+
+
+def autocomplete(phrase, limit):
+    """Return published products with titles matching a phrase.
+
+    Titles are indexed as edge n-grams, so prefixes of words match.
+    """
+    query = MultiMatch(fields=['title'], query=phrase)
+    search = (
+        ProductDocument.search()
+        .query(query)
+        .source(False)
+        .filter('term', is_published=True))
+    return search[:limit].to_queryset()
@@ -16,3 +16,12 @@ def pick_dashboard_backend():
     Returns a callable that accepts the search phrase.
     """
     return import_module(settings.SEARCH_BACKEND).search_dashboard
+
+
+def pick_autocomplete_backend():
+    """Return the currently configured product autocomplete function.
+
+    Returns a callable that accepts the typed phrase and the maximum number
+    of products.
+    """
+    return import_module(settings.SEARCH_BACKEND).autocomplete_products
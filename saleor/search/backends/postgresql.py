@@ -7,3 +7,7 @@ def search_storefront(phrase):
 
 def search_dashboard(phrase):
     return postgresql_dashboard.search(phrase)
+
+
+def autocomplete_products(phrase, limit):
+    return postgresql_storefront.autocomplete(phrase, limit)
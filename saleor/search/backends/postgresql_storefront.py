@@ -1,5 +1,5 @@
-from django.contrib.postgres.search import TrigramSimilarity
-from django.db.models import Q
+from django.contrib.postgres.search import SearchQuery, TrigramSimilarity
+from django.db.models import Case, IntegerField, Q, Value, When
 
 from ...product.models import Product
 
@@ -8,8 +8,8 @@ def search(phrase):
     """Return matching products for storefront views.
 
     Fuzzy storefront search that is resistant to small typing errors made
-    by user. Name is matched using trigram similarity, description uses
-    standard postgres full text search.
+    by user. Name is matched using trigram similarity, name and description
+    are also matched using their stored full text search vector.
 
     Args:
         phrase (str): searched phrase
@@ -17,7 +17,23 @@ def search(phrase):
     """
     name_sim = TrigramSimilarity('name', phrase)
     published = Q(is_published=True)
-    ft_in_description = Q(description__search=phrase)
+    ft_match = Q(search_vector=SearchQuery(phrase))
     name_similar = Q(name_sim__gt=0.2)
     return Product.objects.annotate(name_sim=name_sim).filter(
-        (ft_in_description | name_similar) & published)
+        (ft_match | name_similar) & published)
+
+
+def autocomplete(phrase, limit):
+    """Return published products with names or SKUs matching a phrase.
+
+    Products with names starting with the phrase come first. Substring
+    matches of names and prefix matches of SKUs are served by trigram
+    indexes.
+    """
+    matches = Q(name__icontains=phrase) | Q(variants__sku__istartswith=phrase)
+    prefix_match = Case(
+        When(name__istartswith=phrase, then=Value(0)),
+        default=Value(1), output_field=IntegerField())
+    products = Product.objects.filter(matches, is_published=True).annotate(
+        prefix_match=prefix_match).order_by('prefix_match', 'name').distinct()
+    return products[:limit]
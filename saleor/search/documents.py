@@ -4,13 +4,14 @@ from elasticsearch_dsl import analyzer, token_filter
 from ..account.models import User
 from ..order.models import Order
 from ..product.models import Product
+from . import MIN_PHRASE_LENGTH
 
 storefront = Index('storefront')
 storefront.settings(number_of_shards=1, number_of_replicas=0)
 
 
 partial_words = token_filter(
-    'partial_words', 'edge_ngram', min_gram=3, max_gram=15)
+    'partial_words', 'edge_ngram', min_gram=MIN_PHRASE_LENGTH, max_gram=15)
 title_analyzer = analyzer(
     'title_analyzer',
     tokenizer='standard',
@@ -40,6 +41,9 @@ class UserDocument(DocType):
     first_name = fields.StringField()
     last_name = fields.StringField()
 
+    def get_queryset(self):
+        return User.objects.select_related('default_billing_address')
+
     def prepare_user(self, instance):
         return instance.email
 
@@ -68,6 +72,9 @@ orders.settings(number_of_shards=1, number_of_replicas=0)
 class OrderDocument(DocType):
     user = fields.StringField(analyzer=email_analyzer)
 
+    def get_queryset(self):
+        return Order.objects.select_related('user')
+
     def prepare_user(self, instance):
         if instance.user:
             return instance.user.email
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django_elasticsearch_dsl.registries import registry
+from elasticsearch.helpers import parallel_bulk
+from elasticsearch_dsl.connections import connections
+
+
+class Command(BaseCommand):
+    help = 'Recreate search indices and index all documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            dest='threads',
+            default=4,
+            help='Number of threads sending bulk requests')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            dest='chunk_size',
+            default=500,
+            help='Number of documents sent in a single bulk request')
+
+    def handle(self, *args, **options):
+        for index in registry.get_indices():
+            index.delete(ignore=404)
+            index.create()
+            self.stdout.write('Recreated index %s' % index._name)
+        for doc_class in registry.get_documents():
+            num_indexed = self.index_documents(
+                doc_class(), options['threads'], options['chunk_size'])
+            self.stdout.write('Indexed %d %s documents' % (
+                num_indexed, doc_class._doc_type.model.__name__))
+
+    def index_documents(self, doc, threads, chunk_size):
+        """Stream objects from the database to bulk requests sent in parallel.
+
+        Objects are read with a server-side cursor where supported, so the
+        whole queryset is never held in memory.
+        """
+        queryset = doc.get_queryset().order_by('pk').iterator(
+            chunk_size=chunk_size)
+        actions = (
+            doc._prepare_action(instance, 'index') for instance in queryset)
+        results = parallel_bulk(
+            connections.get_connection(), actions, thread_count=threads,
+            chunk_size=chunk_size)
+        return sum(1 for success, dummy_info in results if success)
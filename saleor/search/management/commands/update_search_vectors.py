@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from ....account.models import User
+from ....order.models import Order
+from ....product.models import Product
+from ...utils import (
+    update_order_search_vectors, update_product_search_vectors,
+    update_user_search_vectors)
+
+SEARCH_VECTOR_UPDATES = [
+    (Product, update_product_search_vectors),
+    (Order, update_order_search_vectors),
+    (User, update_user_search_vectors)]
+
+
+class Command(BaseCommand):
+    help = 'Update search vectors used by the PostgreSQL search backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            default=5000,
+            help='Number of objects updated by a single query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model, update_search_vectors in SEARCH_VECTOR_UPDATES:
+            pk_range = model.objects.aggregate(Min('pk'), Max('pk'))
+            if pk_range['pk__min'] is None:
+                continue
+            # Update in batches of primary keys to keep transactions short
+            start = pk_range['pk__min']
+            while start <= pk_range['pk__max']:
+                update_search_vectors(model.objects.filter(
+                    pk__gte=start, pk__lt=start + batch_size))
+                start += batch_size
+            self.stdout.write('Updated search vectors of %s' % (
+                model._meta.verbose_name_plural,))
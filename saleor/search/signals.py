@@ -0,0 +1,117 @@
+"""Updates of search indices.
+
+Saving an object indexed by Elasticsearch would normally update its document
+synchronously, adding a round trip to the search service to every save.
+Instead, changed objects are queued and sent to a Celery task once the
+transaction commits, which updates all of them in a single bulk request.
+
+Search vectors stored for PostgreSQL search are updated on saves changing
+searched fields, only when PostgreSQL search is used.
+"""
+from django.db.models import Q, signals
+from django.db.models.signals import post_save
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import BaseSignalProcessor
+
+from ..account.models import Address, User
+from ..core.utils.transactions import OnCommitQueue
+from ..order.models import Order
+from ..product.models import Product
+from .tasks import update_search_index
+from .utils import (
+    update_order_search_vectors, update_product_search_vectors,
+    update_user_search_vectors)
+
+
+def send_index_updates(updates):
+    """Send all queued updates to the indexing task."""
+    update_search_index.delay(sorted(updates))
+
+
+index_updates = OnCommitQueue(send_index_updates)
+
+
+def queue_index_update(instance):
+    index_updates.add([(instance._meta.label, instance.pk)])
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """Signal processor queueing index updates of saved and deleted objects.
+
+    Used instead of the real-time processor of django_elasticsearch_dsl,
+    see `ELASTICSEARCH_DSL_SIGNAL_PROCESSOR`.
+    """
+
+    def setup(self):
+        signals.post_save.connect(self.handle_save)
+        signals.post_delete.connect(self.handle_delete)
+
+    def teardown(self):
+        signals.post_save.disconnect(self.handle_save)
+        signals.post_delete.disconnect(self.handle_delete)
+
+    def handle_save(self, sender, instance, **kwargs):
+        if self.is_indexed(sender):
+            queue_index_update(instance)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if self.is_indexed(sender):
+            queue_index_update(instance)
+
+    def is_indexed(self, model):
+        return (
+            DEDConfig.autosync_enabled() and
+            model in registry.get_models())
+
+
+# Fields of saved objects their search vectors are built from
+PRODUCT_SEARCHED_FIELDS = {'name', 'description'}
+ORDER_SEARCHED_FIELDS = {'user', 'user_id', 'user_email'}
+USER_SEARCHED_FIELDS = {
+    'email', 'default_billing_address', 'default_shipping_address'}
+
+
+def is_search_update(update_fields, searched_fields):
+    """Return whether a save may change the search vector of an object.
+
+    Saves of selected fields, like status changes of orders or updates of
+    last login, are skipped unless they touch searched fields.
+    """
+    return not update_fields or bool(
+        searched_fields.intersection(update_fields))
+
+
+def product_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and is_search_update(update_fields, PRODUCT_SEARCHED_FIELDS):
+        update_product_search_vectors(
+            Product.objects.filter(pk=instance.pk))
+
+
+def order_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and is_search_update(update_fields, ORDER_SEARCHED_FIELDS):
+        update_order_search_vectors(Order.objects.filter(pk=instance.pk))
+
+
+def user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and is_search_update(update_fields, USER_SEARCHED_FIELDS):
+        update_user_search_vectors(User.objects.filter(pk=instance.pk))
+        update_order_search_vectors(Order.objects.filter(user=instance))
+
+
+def address_saved(sender, instance, raw=False, **kwargs):
+    """Update vectors of users using the address as a default one."""
+    if not raw:
+        users = User.objects.filter(
+            Q(default_billing_address=instance) |
+            Q(default_shipping_address=instance))
+        update_user_search_vectors(users)
+        update_order_search_vectors(Order.objects.filter(user__in=users))
+
+
+def connect_search_vector_updates():
+    """Update search vectors on saves, they are only used by PostgreSQL."""
+    post_save.connect(product_saved, sender=Product)
+    post_save.connect(order_saved, sender=Order)
+    post_save.connect(user_saved, sender=User)
+    post_save.connect(address_saved, sender=Address)
@@ -0,0 +1,36 @@
+from celery import shared_task
+from django.apps import apps
+from django_elasticsearch_dsl.registries import registry
+from elasticsearch.helpers import bulk
+from elasticsearch_dsl.connections import connections
+
+
+def get_index_actions(model, pks):
+    """Yield bulk actions indexing objects of a model and deleting
+    documents of objects that no longer exist."""
+    for doc_class in registry.get_documents([model]):
+        doc = doc_class()
+        instances = doc.get_queryset().filter(pk__in=pks)
+        found = set()
+        for instance in instances:
+            found.add(instance.pk)
+            yield doc._prepare_action(instance, 'index')
+        for pk in set(pks) - found:
+            yield doc._prepare_action(model(pk=pk), 'delete')
+
+
+@shared_task
+def update_search_index(updates):
+    """Update search documents of objects in a single bulk request.
+
+    Takes a list of (model label, primary key) pairs. Duplicates are
+    indexed once.
+    """
+    pks_by_model = {}
+    for model_label, pk in updates:
+        pks_by_model.setdefault(model_label, set()).add(pk)
+    actions = (
+        action for model_label, pks in pks_by_model.items()
+        for action in get_index_actions(apps.get_model(model_label), pks))
+    # Deleting documents that were never indexed is not an error
+    bulk(connections.get_connection(), actions, raise_on_error=False)
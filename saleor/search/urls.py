@@ -3,4 +3,5 @@ from django.conf.urls import url
 from . import views
 
 urlpatterns = [
-    url(r'^$', views.search, name='search')]
+    url(r'^$', views.search, name='search'),
+    url(r'^autocomplete/$', views.autocomplete, name='autocomplete')]
@@ -0,0 +1,55 @@
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery
+
+from ..account.models import User
+
+
+def get_user_field(field_name, user_field='user_id'):
+    """Return a subquery selecting a field of a related user.
+
+    Subqueries are used instead of joins, as the search vectors are
+    stored using `UPDATE` queries, which cannot join related tables.
+    """
+    users = User.objects.filter(pk=OuterRef(user_field)).values(field_name)
+    return Subquery(users[:1])
+
+
+def get_product_search_vector():
+    return (
+        SearchVector('name', weight='A') +
+        SearchVector('description', weight='B'))
+
+
+def get_order_search_vector():
+    return (
+        SearchVector(get_user_field('email'), weight='A') +
+        SearchVector('user_email', weight='A') +
+        SearchVector(
+            get_user_field('default_shipping_address__first_name'),
+            weight='B') +
+        SearchVector(
+            get_user_field('default_shipping_address__last_name'),
+            weight='B'))
+
+
+def get_user_search_vector():
+    return (
+        SearchVector('email', weight='A') +
+        SearchVector(
+            get_user_field('default_billing_address__first_name', 'pk'),
+            weight='B') +
+        SearchVector(
+            get_user_field('default_billing_address__last_name', 'pk'),
+            weight='B'))
+
+
+def update_product_search_vectors(products):
+    products.update(search_vector=get_product_search_vector())
+
+
+def update_order_search_vectors(orders):
+    orders.update(search_vector=get_order_search_vector())
+
+
+def update_user_search_vectors(users):
+    users.update(search_vector=get_user_search_vector())
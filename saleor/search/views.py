@@ -1,10 +1,11 @@
 from django.conf import settings
 from django.core.paginator import InvalidPage, Paginator
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
 
 from ..product.utils import products_with_details
 from ..product.utils.availability import products_with_availability
+from .autocomplete import get_suggestions
 from .forms import SearchForm
 
 
@@ -40,3 +41,11 @@ def search(request):
         'results': page,
         'query_string': '?q=%s' % query}
     return render(request, 'search/results.html', ctx)
+
+
+def autocomplete(request):
+    """Return suggestions of products, categories and collections."""
+    if not settings.ENABLE_SEARCH:
+        raise Http404('No such page!')
+    suggestions = get_suggestions(request.GET.get('q', ''))
+    return JsonResponse({'results': suggestions})
@@ -1,5 +1,7 @@
 from django.utils.encoding import smart_text
 
+from ...core.utils.rendered_text import render_field
+
 IN_STOCK = 'http://schema.org/InStock'
 OUT_OF_STOCK = 'http://schema.org/OutOfStock'
 
@@ -17,23 +19,29 @@ def get_brand_from_attributes(attributes):
     return brand
 
 
-def product_json_ld(product, attributes=None):
+def product_json_ld(product, attributes=None, variant_prices=None):
     # type: (saleor.product.models.Product, saleor.product.utils.ProductAvailability, dict) -> dict  # noqa
-    """Generate JSON-LD data for product."""
+    """Generate JSON-LD data for product.
+
+    Offers are made of pairs of variants and their prices, variants are
+    priced without discounts and taxes if none are given.
+    """
     data = {'@context': 'http://schema.org/',
             '@type': 'Product',
             'name': smart_text(product),
             'image': [
                 product_image.image.url
                 for product_image in product.images.all()],
-            'description': product.description,
+            'description': render_field(product, 'description', 'plain'),
             'offers': []}
 
-    for variant in product.variants.all():
-        price = variant.get_price()
-        in_stock = True
-        if not product.is_available() or not variant.is_in_stock():
-            in_stock = False
+    if variant_prices is None:
+        variant_prices = [
+            (variant, variant.get_price())
+            for variant in product.variants.all()]
+    is_available = product.is_available()
+    for variant, price in variant_prices:
+        in_stock = is_available and variant.is_in_stock()
         variant_data = variant_json_ld(price, variant, in_stock)
         data['offers'].append(variant_data)
 
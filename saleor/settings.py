@@ -48,6 +48,13 @@ REDIS_URL = os.environ.get('REDIS_URL')
 if REDIS_URL:
     CACHE_URL = os.environ.setdefault('CACHE_URL', REDIS_URL)
 CACHES = {'default': django_cache_url.config()}
+# Sale indexes, tax rates and sites are kept in the memory of each process,
+# which learn about their changes from versions stored in the cache, like
+# storefront pages are. This needs a cache shared by all web and Celery
+# processes, such as Redis or Memcached. Without one the data is loaded
+# again whenever it's used and storefront pages are not cached.
+CACHE_IS_SHARED = not CACHES['default']['BACKEND'].endswith(
+    ('LocMemCache', 'DummyCache'))
 
 DATABASES = {
     'default': dj_database_url.config(
@@ -382,6 +389,26 @@ MESSAGE_TAGS = {
 
 LOW_STOCK_THRESHOLD = 10
 MAX_CART_LINE_QUANTITY = int(os.environ.get('MAX_CART_LINE_QUANTITY', 50))
+# Number of seconds stock of a checkout being paid for is held for it
+STOCK_RESERVATION_TIMEOUT = int(
+    os.environ.get('STOCK_RESERVATION_TIMEOUT', 15 * 60))
+# Number of seconds storefront pages are cached for anonymous visitors,
+# bounds how long changes of categories and attributes take to show up
+STOREFRONT_CACHE_TIMEOUT = int(
+    os.environ.get('STOREFRONT_CACHE_TIMEOUT', 60 * 60))
+
+# Maximum estimated cost of a single GraphQL query and total estimated cost
+# of queries a single client can run per minute (unlimited if not set)
+GRAPHQL_QUERY_MAX_COST = int(os.environ.get('GRAPHQL_QUERY_MAX_COST', 50000))
+GRAPHQL_QUERY_COST_PER_MINUTE = int(
+    os.environ.get('GRAPHQL_QUERY_COST_PER_MINUTE', 0))
+
+# Number of parsed and validated GraphQL documents kept in memory and number
+# of seconds responses to anonymous queries are cached (disabled if not set)
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(
+    os.environ.get('GRAPHQL_DOCUMENT_CACHE_SIZE', 1000))
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = int(
+    os.environ.get('GRAPHQL_RESPONSE_CACHE_TIMEOUT', 0))
 
 PAGINATE_BY = 16
 DASHBOARD_PAGINATE_BY = 30
@@ -478,6 +505,9 @@ if ES_URL:
     ELASTICSEARCH_DSL = {
         'default': {
             'hosts': ES_URL}}
+    # Update the index in bulk from a Celery task instead of on every save
+    ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = (
+        'saleor.search.signals.QueuedSignalProcessor')
 AUTHENTICATION_BACKENDS = [
     'saleor.account.backends.facebook.CustomFacebookOAuth2',
     'saleor.account.backends.google.CustomGoogleOAuth2',
@@ -514,6 +544,10 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_RESULT_BACKEND = 'django-db'
+CELERY_BEAT_SCHEDULE = {
+    'release-stock-reservations': {
+        'task': 'saleor.checkout.tasks.release_stock_reservations',
+        'schedule': 60}}
 ###############################################################################################################################################
 
 # Impersonate module settings
@@ -10,9 +10,14 @@ from django.contrib.sites.models import Site, SiteManager
 from django.core.exceptions import ImproperlyConfigured
 from django.http.request import split_domain_port
 
+from ..core.utils.cache import bump_version, get_version
+
+SITE_CACHE_VERSION_KEY = 'site:cache-version'
+
 lock = threading.Lock()
 with lock:
     THREADED_SITE_CACHE = {}
+    SITE_CACHE_VERSION = None
 
 
 def new_get_current(self, request=None):
@@ -52,11 +57,39 @@ def new_get_current(self, request=None):
 
 
 def new_clear_cache(self):
+    clear_site_cache()
+
+
+def clear_site_cache():
     global THREADED_SITE_CACHE
     with lock:
         THREADED_SITE_CACHE = {}
 
 
+def get_site_cache_version():
+    return get_version(SITE_CACHE_VERSION_KEY)
+
+
+def refresh_site_cache():
+    """Clear cached sites if any process changed them since the last call.
+
+    This requires a single cache lookup, so unlike clearing the cache it's
+    cheap enough to be called on every request.
+    """
+    global SITE_CACHE_VERSION
+    version = get_site_cache_version()
+    if version != SITE_CACHE_VERSION:
+        clear_site_cache()
+        with lock:
+            SITE_CACHE_VERSION = version
+
+
+def invalidate_site_cache():
+    """Force all processes to fetch sites and their settings again."""
+    bump_version(SITE_CACHE_VERSION_KEY)
+    clear_site_cache()
+
+
 def new_get_by_natural_key(self, domain):
     return self.prefetch_related('settings').filter(domain__iexact=domain)[0]
 
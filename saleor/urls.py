@@ -16,7 +16,7 @@ from .core.urls import urlpatterns as core_urls
 from .dashboard.urls import urlpatterns as dashboard_urls
 from .data_feeds.urls import urlpatterns as feed_urls
 from .graphql.api import schema
-from .graphql.file_upload.views import FileUploadGraphQLView
+from .graphql.views import GraphQLView
 from .order.urls import urlpatterns as order_urls
 from .page.urls import urlpatterns as page_urls
 from .product.urls import urlpatterns as product_urls
@@ -33,7 +33,7 @@ non_translatable_urlpatterns = [
         include((dashboard_urls, 'dashboard'), namespace='dashboard')),
 # https://blog.csdn.net/kongxx/article/details/77322657
 # 可以配跨域访问 csrf_exempt
-    url(r'^graphql/', csrf_exempt(FileUploadGraphQLView.as_view( schema=schema, graphiql=settings.DEBUG)), name='api'),
+    url(r'^graphql/', csrf_exempt(GraphQLView.as_view( schema=schema, graphiql=settings.DEBUG)), name='api'),
     url(r'^sitemap\.xml$', sitemap, {'sitemaps': sitemaps},
         name='django.contrib.sitemaps.views.sitemap'),
     url(r'^i18n/$', set_language, name='set_language'),
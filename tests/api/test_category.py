@@ -1,10 +1,12 @@
 import pytest
 
 import graphene
+from django.db import connection
 from django.template.defaultfilters import slugify
+from django.test.utils import CaptureQueriesContext
 from unittest.mock import Mock
 
-from saleor.product.models import Category
+from saleor.product.models import Category, Product, ProductVariant
 from tests.utils import create_image
 from tests.api.utils import get_graphql_content, get_multipart_request_body
 
@@ -361,3 +363,190 @@ def test_category_image_query_without_associated_file(
     data = content['data']['category']
     assert data['name'] == category.name
     assert data['backgroundImage'] is None
+
+
+def _create_category_tree(product, name):
+    parent = Category.objects.create(name=name, slug=name)
+    child = Category.objects.create(
+        name='%s child' % name, slug='%s-child' % name, parent=parent)
+    for category in [parent, child]:
+        _create_category_product(product, category, category.name)
+    return parent
+
+
+def _create_category_product(product, category, name):
+    category_product = Product.objects.create(
+        name='%s product' % name, price=product.price,
+        product_type=product.product_type, category=category,
+        attributes=product.attributes)
+    ProductVariant.objects.create(
+        product=category_product, sku='%s-sku' % slugify(name))
+
+
+CATEGORY_PRODUCTS_QUERY = """
+query {
+    categories(level: 0, first: 20) {
+        edges {
+            node {
+                name
+                products(first: 20) {
+                    edges {
+                        node {
+                            name
+                            thumbnailUrl
+                            attributes {
+                                value {
+                                    name
+                                }
+                            }
+                            variants(first: 20) {
+                                edges {
+                                    node {
+                                        attributes {
+                                            value {
+                                                name
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+
+def test_category_products_query_count_does_not_depend_on_products(
+        user_api_client, product):
+    tree = _create_category_tree(product, 'first')
+    user_api_client.post_graphql(CATEGORY_PRODUCTS_QUERY)
+    with CaptureQueriesContext(connection) as queries:
+        get_graphql_content(
+            user_api_client.post_graphql(CATEGORY_PRODUCTS_QUERY))
+    query_count = len(queries)
+
+    child = tree.children.get()
+    for name in ['second', 'third']:
+        _create_category_product(product, child, name)
+    with CaptureQueriesContext(connection) as queries:
+        content = get_graphql_content(
+            user_api_client.post_graphql(CATEGORY_PRODUCTS_QUERY))
+    assert len(queries) == query_count
+
+    products = {
+        edge['node']['name']
+        for category in content['data']['categories']['edges']
+        for edge in category['node']['products']['edges']}
+    assert 'first child product' in products
+    assert 'third product' in products
+
+
+def test_category_products_are_paginated_in_database(
+        user_api_client, product):
+    query = """
+    query {
+        categories(level: 0, first: 20) {
+            edges {
+                node {
+                    products(first: 1) {
+                        edges {
+                            node {
+                                name
+                            }
+                        }
+                        pageInfo {
+                            hasNextPage
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    _create_category_tree(product, 'first')
+    with CaptureQueriesContext(connection) as queries:
+        content = get_graphql_content(user_api_client.post_graphql(query))
+    product_queries = [
+        query['sql'] for query in queries
+        if 'FROM "product_product"' in query['sql']]
+    assert len(product_queries) == 1
+    assert 'ROW_NUMBER()' in product_queries[0]
+    pages = [
+        category['node']['products']
+        for category in content['data']['categories']['edges']]
+    assert all(len(page['edges']) == 1 for page in pages)
+    assert any(page['pageInfo']['hasNextPage'] for page in pages)
+
+
+def test_category_products_query_count_does_not_depend_on_categories(
+        user_api_client, product):
+    _create_category_tree(product, 'first')
+    user_api_client.post_graphql(CATEGORY_PRODUCTS_QUERY)
+    with CaptureQueriesContext(connection) as queries:
+        get_graphql_content(
+            user_api_client.post_graphql(CATEGORY_PRODUCTS_QUERY))
+    query_count = len(queries)
+
+    for name in ['second', 'third', 'fourth', 'fifth']:
+        _create_category_tree(product, name)
+    with CaptureQueriesContext(connection) as queries:
+        content = get_graphql_content(
+            user_api_client.post_graphql(CATEGORY_PRODUCTS_QUERY))
+    assert len(queries) == query_count
+
+    categories = content['data']['categories']['edges']
+    assert len(categories) == 6
+    products_by_category = {
+        category['node']['name']: {
+            edge['node']['name']
+            for edge in category['node']['products']['edges']}
+        for category in categories}
+    assert products_by_category['fifth'] == {
+        'fifth product', 'fifth child product'}
+
+
+def test_category_products_next_page(user_api_client, product):
+    query = """
+    query ($after: String) {
+        categories(level: 0, first: 20) {
+            edges {
+                node {
+                    name
+                    products(first: 1, after: $after) {
+                        totalCount
+                        edges {
+                            node {
+                                name
+                            }
+                        }
+                        pageInfo {
+                            endCursor
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    tree = _create_category_tree(product, 'first')
+
+    def get_category(content):
+        return next(
+            category['node']
+            for category in content['data']['categories']['edges']
+            if category['node']['name'] == tree.name)
+
+    content = get_graphql_content(user_api_client.post_graphql(query))
+    category = get_category(content)
+    assert category['products']['totalCount'] == 2
+    variables = {'after': category['products']['pageInfo']['endCursor']}
+    content = get_graphql_content(
+        user_api_client.post_graphql(query, variables))
+    next_products = get_category(content)['products']['edges']
+    assert len(next_products) == 1
+    assert next_products[0]['node']['name'] != (
+        category['products']['edges'][0]['node']['name'])
@@ -6,6 +6,7 @@ import pytest
 from tests.api.utils import get_graphql_content
 
 from saleor.checkout.models import Cart
+from saleor.checkout.utils import add_variant_to_cart
 from saleor.order.models import Order
 
 
@@ -187,6 +188,43 @@ def test_checkout_line_delete(user_api_client, cart_with_item):
     assert cart.lines.count() == 0
 
 
+def test_checkout_lines_delete(user_api_client, cart_with_item, variant):
+    cart = cart_with_item
+    add_variant_to_cart(cart, variant, 1)
+    assert cart.lines.count() == 2
+    query = """
+        mutation checkoutLinesDelete($checkoutId: ID!, $lineIds: [ID]!) {
+            checkoutLinesDelete(checkoutId: $checkoutId, lineIds: $lineIds) {
+                checkout {
+                    token
+                    lines {
+                        quantity
+                    }
+                }
+                errors {
+                    field
+                    message
+                }
+            }
+        }
+    """
+    checkout_id = graphene.Node.to_global_id('Checkout', cart.pk)
+    line_ids = [
+        graphene.Node.to_global_id('CheckoutLine', line.pk)
+        for line in cart.lines.all()]
+
+    variables = {'checkoutId': checkout_id, 'lineIds': line_ids}
+    response = user_api_client.post_graphql(query, variables)
+    content = get_graphql_content(response)
+
+    data = content['data']['checkoutLinesDelete']
+    assert not data['errors']
+    assert data['checkout']['lines'] == []
+    cart.refresh_from_db()
+    assert cart.lines.count() == 0
+    assert cart.quantity == 0
+
+
 def test_checkout_customer_attach(
         user_api_client, cart_with_item, customer_user):
     cart = cart_with_item
@@ -415,6 +453,111 @@ def test_checkout_complete(
     assert payment.transactions.count() == 2
 
 
+@pytest.fixture
+def checkout_ready_to_complete(
+        cart_with_item, payment_dummy, address, shipping_method):
+    checkout = cart_with_item
+    checkout.shipping_address = address
+    checkout.shipping_method = shipping_method
+    checkout.save()
+    total = checkout.get_total()
+    payment = payment_dummy
+    payment.is_active = True
+    payment.order = None
+    payment.total = total.gross.amount
+    payment.currency = total.gross.currency
+    payment.checkout = checkout
+    payment.save()
+    return checkout
+
+
+MUTATION_CHECKOUT_COMPLETE = """
+    mutation checkoutComplete(
+            $checkoutId: ID!, $asynchronous: Boolean,
+            $idempotencyKey: String) {
+        checkoutComplete(
+                checkoutId: $checkoutId, asynchronous: $asynchronous,
+                idempotencyKey: $idempotencyKey) {
+            order {
+                token
+                paymentStatus
+            }
+            errors {
+                field
+                message
+            }
+        }
+    }
+"""
+
+
+@patch('saleor.graphql.checkout.mutations.process_payment.delay')
+def test_checkout_complete_asynchronous(
+        mock_process_payment, transactional_db, user_api_client,
+        checkout_ready_to_complete):
+    checkout = checkout_ready_to_complete
+    payment = checkout.payments.get()
+    variables = {
+        'checkoutId': graphene.Node.to_global_id('Checkout', checkout.pk),
+        'asynchronous': True}
+    response = user_api_client.post_graphql(
+        MUTATION_CHECKOUT_COMPLETE, variables)
+    content = get_graphql_content(response)
+    data = content['data']['checkoutComplete']
+    assert not data['errors']
+    assert data['order']['paymentStatus'] == 'NOT_CHARGED'
+    order = Order.objects.get(token=data['order']['token'])
+    assert order.payments.get() == payment
+    assert not payment.transactions.exists()
+    mock_process_payment.assert_called_once_with(payment.pk)
+
+
+def test_checkout_complete_with_idempotency_key(
+        user_api_client, checkout_ready_to_complete):
+    checkout = checkout_ready_to_complete
+    payment = checkout.payments.get()
+    variables = {
+        'checkoutId': graphene.Node.to_global_id('Checkout', checkout.pk),
+        'idempotencyKey': 'checkout-attempt-1'}
+    orders_count = Order.objects.count()
+    response = user_api_client.post_graphql(
+        MUTATION_CHECKOUT_COMPLETE, variables)
+    content = get_graphql_content(response)
+    order_token = content['data']['checkoutComplete']['order']['token']
+    assert payment.transactions.count() == 2
+
+    response = user_api_client.post_graphql(
+        MUTATION_CHECKOUT_COMPLETE, variables)
+    content = get_graphql_content(response)
+    data = content['data']['checkoutComplete']
+    assert not data['errors']
+    assert data['order']['token'] == order_token
+    assert Order.objects.count() == orders_count + 1
+    assert payment.transactions.count() == 2
+    order = Order.objects.get(token=order_token)
+    assert order.checkout_token == str(checkout.token)
+
+
+def test_checkout_complete_with_idempotency_key_of_other_checkout(
+        user_api_client, checkout_ready_to_complete, order):
+    order.checkout_token = str(uuid.uuid4())
+    order.idempotency_key = '1'
+    order.save()
+    checkout = checkout_ready_to_complete
+    variables = {
+        'checkoutId': graphene.Node.to_global_id('Checkout', checkout.pk),
+        'idempotencyKey': '1'}
+    response = user_api_client.post_graphql(
+        MUTATION_CHECKOUT_COMPLETE, variables)
+    content = get_graphql_content(response)
+    data = content['data']['checkoutComplete']
+    assert not data['errors']
+    assert data['order']['token'] != order.token
+    placed_order = Order.objects.get(token=data['order']['token'])
+    assert placed_order.checkout_token == str(checkout.token)
+    assert placed_order.idempotency_key == '1'
+
+
 def test_fetch_checkout_by_token(user_api_client, cart_with_item):
     query = """
     query getCheckout($token: UUID!) {
@@ -1,15 +1,23 @@
+from io import StringIO
 from unittest.mock import Mock, patch
 
 import pytest
 
 import graphene
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.db.models import Q
 from django.http import HttpResponse
 from django.shortcuts import reverse
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from graphql_jwt.shortcuts import get_token
 from graphql_relay import to_global_id
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+from saleor.graphql.core.backend import CachedDocumentBackend, get_query_hash
+from saleor.graphql.core.response_cache import get_response_cache_stats
 from saleor.graphql.middleware import jwt_middleware
 from saleor.graphql.product.types import Product
 from saleor.graphql.utils import (
@@ -238,3 +246,331 @@ def test_generate_query_argument_description():
     expected = 'Supported filter parameters:\n* field_1\n* field_2\n'
     field_list = ['field_1', 'field_2']
     assert generate_query_argument_description(field_list) == expected
+
+
+PRODUCTS_PAGE_QUERY = """
+    query Products(
+            $first: Int, $last: Int, $after: String, $before: String,
+            $sortBy: String) {
+        products(
+                first: $first, last: $last, after: $after, before: $before,
+                sortBy: $sortBy) {
+            edges {
+                node {
+                    name
+                }
+            }
+            pageInfo {
+                hasNextPage
+                hasPreviousPage
+                startCursor
+                endCursor
+            }
+        }
+    }
+"""
+
+
+def get_products_page(client, **variables):
+    response = client.post_graphql(PRODUCTS_PAGE_QUERY, variables)
+    content = get_graphql_content(response)
+    data = content['data']['products']
+    names = [edge['node']['name'] for edge in data['edges']]
+    return names, data['pageInfo']
+
+
+@pytest.mark.parametrize('sort_by, expected_names', [
+    ('name', ['Test product 1', 'Test product 3']),
+    ('-name', ['Test product 3', 'Test product 1']),
+    ('-price', ['Test product 3', 'Test product 1'])])
+def test_products_keyset_pagination_forward(
+        user_api_client, product_list, sort_by, expected_names):
+    names, page_info = get_products_page(
+        user_api_client, first=1, sortBy=sort_by)
+    assert names == expected_names[:1]
+    assert page_info['hasNextPage']
+
+    names, page_info = get_products_page(
+        user_api_client, first=1, sortBy=sort_by,
+        after=page_info['endCursor'])
+    assert names == expected_names[1:]
+    assert not page_info['hasNextPage']
+
+
+def test_products_keyset_pagination_backward(user_api_client, product_list):
+    names, page_info = get_products_page(
+        user_api_client, last=1, sortBy='name')
+    assert names == ['Test product 3']
+    assert page_info['hasPreviousPage']
+
+    names, page_info = get_products_page(
+        user_api_client, last=1, sortBy='name',
+        before=page_info['startCursor'])
+    assert names == ['Test product 1']
+    assert not page_info['hasPreviousPage']
+
+
+def test_products_keyset_pagination_with_equal_sort_keys(
+        user_api_client, product_list):
+    product_list[0].price = product_list[2].price
+    product_list[0].save()
+    names, page_info = get_products_page(
+        user_api_client, first=1, sortBy='price')
+    assert names == ['Test product 1']
+
+    names, page_info = get_products_page(
+        user_api_client, first=1, sortBy='price',
+        after=page_info['endCursor'])
+    assert names == ['Test product 3']
+
+
+def test_products_pagination_accepts_offset_cursors(
+        user_api_client, product_list):
+    names, _ = get_products_page(
+        user_api_client, first=1, sortBy='name',
+        after=offset_to_cursor(0))
+    assert names == ['Test product 3']
+
+
+def test_total_count_is_calculated_only_when_requested(
+        user_api_client, product_list):
+    query = """
+    {
+        products(first: 1) {
+            edges {
+                node {
+                    name
+                }
+            }
+        }
+    }
+    """
+    with CaptureQueriesContext(connection) as queries:
+        get_graphql_content(user_api_client.post_graphql(query))
+    assert not any('COUNT(' in query['sql'] for query in queries)
+
+    query = """
+    {
+        products(first: 1) {
+            totalCount
+        }
+    }
+    """
+    with CaptureQueriesContext(connection) as queries:
+        content = get_graphql_content(user_api_client.post_graphql(query))
+    assert content['data']['products']['totalCount'] == 2
+    assert any('COUNT(' in query['sql'] for query in queries)
+
+
+@patch('saleor.graphql.core.query_cost.DEFAULT_CONNECTION_SIZE', 1)
+@patch('saleor.graphql.core.fields.DEFAULT_CONNECTION_SIZE', 1)
+def test_unbounded_connection_returns_priced_number_of_nodes(
+        user_api_client, product_list):
+    query = """
+    {
+        products {
+            edges {
+                node {
+                    name
+                }
+            }
+            pageInfo {
+                hasNextPage
+            }
+        }
+    }
+    """
+    content = get_graphql_content(user_api_client.post_graphql(query))
+    data = content['data']['products']
+    assert len(data['edges']) == 1
+    assert data['pageInfo']['hasNextPage']
+    cost = content['extensions']['cost']
+    assert cost['actualQueryCost'] <= cost['requestedQueryCost']
+
+
+PRODUCTS_QUERY = """
+query {
+    products(first: 5) {
+        edges {
+            node {
+                ...ProductName
+            }
+        }
+    }
+}
+
+fragment ProductName on Product {
+    name
+}
+"""
+
+
+def test_query_cost_is_reported_in_extensions(user_api_client, product_list):
+    content = get_graphql_content(user_api_client.post_graphql(PRODUCTS_QUERY))
+    cost = content['extensions']['cost']
+    assert cost['requestedQueryCost'] == 11
+    assert cost['actualQueryCost'] == 5
+
+
+def test_query_cost_uses_variables(user_api_client, product_list):
+    query = """
+    query Products($first: Int) {
+        products(first: $first) {
+            edges {
+                node {
+                    name
+                }
+            }
+        }
+    }
+    """
+    response = user_api_client.post_graphql(query, {'first': 1})
+    content = get_graphql_content(response)
+    assert content['extensions']['cost']['requestedQueryCost'] == 3
+
+
+def test_query_over_max_cost_is_rejected(
+        user_api_client, product_list, settings):
+    settings.GRAPHQL_QUERY_MAX_COST = 10
+    with CaptureQueriesContext(connection) as queries:
+        response = user_api_client.post_graphql(PRODUCTS_QUERY)
+    assert response.status_code == 400
+    content = response.json()
+    assert 'data' not in content
+    assert 'exceeds the maximum of 10' in content['errors'][0]['message']
+    assert not any('product_product' in query['sql'] for query in queries)
+
+
+@patch('saleor.graphql.core.query_cost.time')
+def test_query_cost_budget_is_throttled(
+        mocked_time, user_api_client, product_list, settings):
+    mocked_time.time.return_value = 600
+    settings.GRAPHQL_QUERY_COST_PER_MINUTE = 20
+    response = user_api_client.post_graphql(PRODUCTS_QUERY)
+    assert response.status_code == 200
+    response = user_api_client.post_graphql(PRODUCTS_QUERY)
+    assert response.status_code == 429
+
+    mocked_time.time.return_value = 660
+    response = user_api_client.post_graphql(PRODUCTS_QUERY)
+    assert response.status_code == 200
+
+
+def test_document_backend_evicts_least_recently_used_documents():
+    backend = CachedDocumentBackend(max_size=2)
+    schema = Mock()
+    first, second, third = '{ a }', '{ b }', '{ c }'
+    with patch.object(backend, 'build_document') as build_document:
+        backend.document_from_string(schema, first)
+        backend.document_from_string(schema, second)
+        backend.document_from_string(schema, first)
+        backend.document_from_string(schema, third)
+        assert build_document.call_count == 3
+    assert backend.get_document(schema, get_query_hash(first))
+    assert backend.get_document(schema, get_query_hash(second)) is None
+    assert backend.get_document(schema, get_query_hash(third))
+
+
+def test_persisted_query(api_client, product_list):
+    extensions = {'persistedQuery': {
+        'version': 1, 'sha256Hash': get_query_hash(PRODUCTS_QUERY)}}
+    query = 'query { shop { name } }'
+    unknown_extensions = {'persistedQuery': {
+        'version': 1, 'sha256Hash': get_query_hash(query)}}
+    response = api_client.post({'extensions': unknown_extensions})
+    content = response.json()
+    assert content['errors'][0]['message'] == 'PersistedQueryNotFound'
+
+    response = api_client.post(
+        {'query': PRODUCTS_QUERY, 'extensions': extensions})
+    assert response.status_code == 200
+    response = api_client.post({'extensions': extensions})
+    content = get_graphql_content(response)
+    assert len(content['data']['products']['edges']) == 5
+
+
+def test_persisted_query_hash_must_match_query(api_client):
+    extensions = {'persistedQuery': {'version': 1, 'sha256Hash': 'abc'}}
+    response = api_client.post(
+        {'query': PRODUCTS_QUERY, 'extensions': extensions})
+    content = response.json()
+    assert content['errors'][0]['message'] == (
+        'Provided sha256Hash does not match query.')
+
+
+@pytest.fixture
+def response_cache(settings):
+    settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT = 60
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_anonymous_query_response_is_cached(
+        response_cache, api_client, product_list):
+    content = get_graphql_content(api_client.post_graphql(PRODUCTS_QUERY))
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post_graphql(PRODUCTS_QUERY)
+    assert get_graphql_content(response) == content
+    assert not any('product_product' in query['sql'] for query in queries)
+    assert get_response_cache_stats() == {'hits': 1, 'misses': 1}
+
+
+def test_cached_response_is_dropped_on_sale_change(
+        response_cache, api_client, product_list, sale):
+    api_client.post_graphql(PRODUCTS_QUERY)
+    sale.save()
+    api_client.post_graphql(PRODUCTS_QUERY)
+    assert get_response_cache_stats() == {'hits': 0, 'misses': 2}
+
+
+def test_authenticated_query_response_is_not_cached(
+        response_cache, user_api_client, product_list):
+    user_api_client.post_graphql(PRODUCTS_QUERY)
+    user_api_client.post_graphql(PRODUCTS_QUERY)
+    assert get_response_cache_stats() == {'hits': 0, 'misses': 0}
+
+
+def test_checkout_query_response_is_not_cached(
+        response_cache, api_client, cart_with_item):
+    query = """
+    query Checkout($token: UUID) {
+        shop {
+            name
+        }
+        checkout(token: $token) {
+            token
+        }
+    }
+    """
+    variables = {'token': str(cart_with_item.token)}
+    api_client.post_graphql(query, variables)
+    api_client.post_graphql(query, variables)
+    assert get_response_cache_stats() == {'hits': 0, 'misses': 0}
+
+
+def test_catalog_fields_selected_by_fragments_are_cached(
+        response_cache, api_client, product_list):
+    query = """
+    fragment Catalog on Query {
+        products(first: 1) {
+            totalCount
+        }
+    }
+    query {
+        ...Catalog
+    }
+    """
+    api_client.post_graphql(query)
+    api_client.post_graphql(query)
+    assert get_response_cache_stats() == {'hits': 1, 'misses': 1}
+
+
+def test_response_cache_stats_command(
+        response_cache, api_client, product_list):
+    api_client.post_graphql(PRODUCTS_QUERY)
+    api_client.post_graphql(PRODUCTS_QUERY)
+    out = StringIO()
+    call_command('response_cache_stats', reset=True, stdout=out)
+    assert 'Hits: 1, misses: 1, hit rate: 50.0%' in out.getvalue()
+    assert get_response_cache_stats() == {'hits': 0, 'misses': 0}
@@ -1,3 +1,4 @@
+import uuid
 from unittest.mock import MagicMock, Mock
 
 import graphene
@@ -16,6 +17,7 @@ from saleor.graphql.order.types import OrderEventsEmailsEnum, OrderStatusFilter
 from saleor.graphql.payment.types import PaymentChargeStatusEnum
 from saleor.order import OrderEvents, OrderEventsEmails, OrderStatus
 from saleor.order.models import Order, OrderEvent
+from saleor.order.utils import update_daily_sales
 from saleor.payment import CustomPaymentChoices
 from saleor.payment.models import Payment
 from saleor.shipping.models import ShippingMethod
@@ -233,6 +235,25 @@ def test_non_staff_user_can_only_see_his_order(user_api_client, order):
     assert not order_data
 
 
+def test_order_by_token_query(api_client, order):
+    query = """
+    query OrderByToken($token: UUID!) {
+        orderByToken(token: $token) {
+            number
+        }
+    }
+    """
+    variables = {'token': order.token}
+    response = api_client.post_graphql(query, variables)
+    content = get_graphql_content(response)
+    assert content['data']['orderByToken']['number'] == str(order.pk)
+
+    variables = {'token': str(uuid.uuid4())}
+    response = api_client.post_graphql(query, variables)
+    content = get_graphql_content(response)
+    assert content['data']['orderByToken'] is None
+
+
 def test_draft_order_create(
         staff_api_client, permission_manage_orders, customer_user,
         product_without_shipping, shipping_method, variant, voucher,
@@ -1236,6 +1257,7 @@ def test_order_update_shipping_incorrect_shipping_method(
 
 def test_orders_total(
         staff_api_client, permission_manage_orders, order_with_lines):
+    update_daily_sales(order_with_lines.created.date())
     query = """
     query Orders($period: ReportingPeriod) {
         ordersTotal(period: $period) {
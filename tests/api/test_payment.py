@@ -3,6 +3,7 @@ from unittest.mock import patch
 import graphene
 from tests.api.utils import get_graphql_content
 
+from saleor.checkout.models import StockReservation
 from saleor.core.utils import get_country_name_by_code
 from saleor.graphql.payment.types import (
     OrderAction, PaymentChargeStatusEnum, PaymentGatewayEnum)
@@ -118,6 +119,37 @@ def test_checkout_add_payment(
     assert payment.charge_status == ChargeStatus.NOT_CHARGED
 
 
+def test_checkout_add_payment_reserves_stock(
+        user_api_client, cart_with_item, graphql_address_data):
+    cart = cart_with_item
+    line = cart.lines.get()
+    variant = line.variant
+    stock_before = variant.quantity_allocated
+    variables = {
+        'input': {
+            'checkoutId': graphene.Node.to_global_id('Checkout', cart.pk),
+            'gateway': 'DUMMY',
+            'token': 'sample-token',
+            'amount': str(cart.get_total().gross.amount),
+            'billingAddress': graphql_address_data}}
+    response = user_api_client.post_graphql(CREATE_QUERY, variables)
+    content = get_graphql_content(response)
+    assert not content['data']['checkoutPaymentCreate']['errors']
+    variant.refresh_from_db()
+    assert variant.quantity_allocated == stock_before + line.quantity
+    reservation = StockReservation.objects.get(cart_token=cart.token)
+    assert reservation.quantity == line.quantity
+
+    variant.quantity = variant.quantity_allocated
+    variant.save()
+    cart.lines.update(quantity=line.quantity + 1)
+    variables['input']['amount'] = str(cart.get_total().gross.amount)
+    response = user_api_client.post_graphql(CREATE_QUERY, variables)
+    content = get_graphql_content(response)
+    data = content['data']['checkoutPaymentCreate']
+    assert data['errors'][0]['message'] == 'Insufficient product stock.'
+
+
 CAPTURE_QUERY = """
     mutation PaymentCharge($paymentId: ID!, $amount: Decimal!) {
         paymentCapture(paymentId: $paymentId, amount: $amount) {
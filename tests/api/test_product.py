@@ -2,6 +2,8 @@ from unittest.mock import Mock, patch
 
 import graphene
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.text import slugify
 from graphql_relay import to_global_id
 from prices import Money
@@ -11,10 +13,12 @@ from tests.utils import create_image, create_pdf_file_with_image_ext
 from saleor.graphql.core.types import ReportingPeriod
 from saleor.graphql.product.types import (
     StockAvailability, resolve_attribute_list)
+from saleor.order.utils import update_daily_sales
 from saleor.product.models import (
     Attribute, AttributeValue, Category, Product, ProductImage, ProductType,
     ProductVariant)
 from saleor.product.tasks import update_variants_names
+from saleor.product.utils import summary_updates
 
 from .utils import assert_no_permission, get_multipart_request_body
 
@@ -608,6 +612,47 @@ def test_product_type(user_api_client, product_type):
     assert len(content['data']['productTypes']['edges']) == no_product_types
 
 
+def test_product_types_products_query_count(user_api_client, product):
+    query = """
+    query {
+        productTypes(first: 20) {
+            edges {
+                node {
+                    products(first: 1) {
+                        edges {
+                            node {
+                                name
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    user_api_client.post_graphql(query)
+    with CaptureQueriesContext(connection) as queries:
+        get_graphql_content(user_api_client.post_graphql(query))
+    query_count = len(queries)
+
+    for name in ['second', 'third', 'fourth', 'fifth']:
+        product_type = ProductType.objects.create(name=name)
+        Product.objects.create(
+            name='%s product' % name, price=product.price,
+            product_type=product_type, category=product.category)
+    with CaptureQueriesContext(connection) as queries:
+        content = get_graphql_content(user_api_client.post_graphql(query))
+    assert len(queries) == query_count
+
+    products = {
+        edge['node']['name']
+        for product_type in content['data']['productTypes']['edges']
+        for edge in product_type['node']['products']['edges']}
+    assert products == {
+        product.name, 'second product', 'third product', 'fourth product',
+        'fifth product'}
+
+
 def test_product_type_query(
         user_api_client, staff_api_client, product_type, product,
         permission_manage_products):
@@ -1246,6 +1291,7 @@ def test_stock_availability_filter(user_api_client, product):
 
     # Change product stock availability and test again
     product.variants.update(quantity=0)
+    summary_updates.flush()
 
     # There should be no products in stock
     variables = {'stockAvailability': StockAvailability.IN_STOCK.name}
@@ -1254,9 +1300,28 @@ def test_stock_availability_filter(user_api_client, product):
     assert content['data']['products']['totalCount'] == 0
 
 
+def test_stock_availability_filter_skips_products_without_variants(
+        user_api_client, product):
+    query = """
+    query Products($stockAvailability: StockAvailability) {
+        products(stockAvailability: $stockAvailability) {
+            totalCount
+        }
+    }
+    """
+    product.variants.all().delete()
+
+    for availability in ['IN_STOCK', 'OUT_OF_STOCK']:
+        variables = {'stockAvailability': availability}
+        response = user_api_client.post_graphql(query, variables)
+        content = get_graphql_content(response)
+        assert content['data']['products']['totalCount'] == 0
+
+
 def test_product_sales(
         staff_api_client, order_with_lines, permission_manage_products,
         permission_manage_orders):
+    update_daily_sales(order_with_lines.created.date())
     query = """
     query TopProducts($period: ReportingPeriod!) {
         reportProductSales(period: $period) {
@@ -1293,3 +1358,40 @@ def test_product_sales(
     assert (
         node_b['revenue']['gross']['amount'] ==
         line_b.quantity * line_b.unit_price_gross.amount)
+
+
+def test_search_suggestions(api_client, product, category):
+    query = """
+    query SearchSuggestions($query: String!) {
+        searchSuggestions(query: $query, first: 5) {
+            kind
+            name
+            url
+        }
+    }
+    """
+    category.name = product.name + ' category'
+    category.save()
+    variables = {'query': product.name[:4]}
+    response = api_client.post_graphql(query, variables)
+    content = get_graphql_content(response)
+    assert content['data']['searchSuggestions'] == [
+        {'kind': 'product', 'name': product.name,
+         'url': product.get_absolute_url()},
+        {'kind': 'category', 'name': category.name,
+         'url': category.get_absolute_url()}]
+
+
+def test_search_suggestions_with_non_positive_limit(
+        api_client, product):
+    query = """
+    query SearchSuggestions($query: String!, $first: Int) {
+        searchSuggestions(query: $query, first: $first) {
+            name
+        }
+    }
+    """
+    variables = {'query': product.name[:4], 'first': -1}
+    response = api_client.post_graphql(query, variables)
+    content = get_graphql_content(response)
+    assert content['data']['searchSuggestions'] == [{'name': product.name}]
@@ -5,6 +5,7 @@ import pytest
 
 from django.contrib.auth.models import Permission
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms import ModelForm
@@ -20,9 +21,11 @@ from saleor.account.models import Address, User
 from saleor.checkout import utils
 from saleor.checkout.models import Cart
 from saleor.checkout.utils import add_variant_to_cart
+from saleor.core.utils.taxes import clear_taxes_cache
 from saleor.dashboard.menu.utils import update_menu
 from saleor.dashboard.order.utils import fulfill_order_line
 from saleor.discount.models import Sale, Voucher, VoucherTranslation
+from saleor.discount.utils import clear_sale_index_cache
 from saleor.menu.models import Menu, MenuItem
 from saleor.order import OrderStatus, OrderEvents
 from saleor.order.models import Order, OrderEvent
@@ -33,6 +36,7 @@ from saleor.payment.models import Payment
 from saleor.product.models import (
     Attribute, AttributeTranslation, AttributeValue, Category, Collection,
     Product, ProductImage, ProductTranslation, ProductType, ProductVariant)
+from saleor.search.autocomplete import clear_suggestions_cache
 from saleor.shipping.models import (
     ShippingMethod, ShippingMethodType, ShippingZone)
 from saleor.site import AuthenticationBackends
@@ -64,6 +68,38 @@ def site_settings(db, settings):
     return obj
 
 
+@pytest.fixture(autouse=True)
+def sale_index_cache():
+    """Make sure sale indexes built by one test do not leak into another."""
+    clear_sale_index_cache()
+    yield
+    clear_sale_index_cache()
+
+
+@pytest.fixture(autouse=True)
+def taxes_cache():
+    """Make sure tax tables built by one test do not leak into another."""
+    clear_taxes_cache()
+    yield
+    clear_taxes_cache()
+
+
+@pytest.fixture(autouse=True)
+def suggestions_cache():
+    """Make sure search suggestions of one test do not leak into another."""
+    clear_suggestions_cache()
+    yield
+    clear_suggestions_cache()
+
+
+@pytest.fixture(autouse=True)
+def thumbnail_url_cache():
+    """Make sure thumbnail URLs cached by one test do not leak into another."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def cart(db):
     return Cart.objects.create()
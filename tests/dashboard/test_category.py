@@ -1,4 +1,4 @@
-from unittest.mock import patch, Mock
+from unittest.mock import Mock
 
 from django.urls import reverse
 from saleor.product.models import Category
@@ -117,29 +117,11 @@ def test_category_details(admin_client, category):
     assert response.status_code == 200
 
 
-@patch('saleor.dashboard.category.views.get_menus_that_needs_update')
-@patch('saleor.dashboard.category.views.update_menus')
-def test_category_delete(
-        mock_update_menus, mock_get_menus, admin_client, category):
+def test_category_delete(admin_client, category):
     assert Category.objects.count() == 1
-    mock_get_menus.return_value = [1]
     url = reverse('dashboard:category-delete',
                   kwargs={'pk': category.pk})
     response = admin_client.post(url, follow=True)
-    assert mock_update_menus.called
 
     assert response.status_code == 200
     assert Category.objects.count() == 0
-
-
-@patch('saleor.dashboard.category.views.get_menus_that_needs_update')
-@patch('saleor.dashboard.category.views.update_menus')
-def test_category_delete_menus_not_updated(
-        mock_update_menus, mock_get_menus, admin_client, category):
-    url = reverse('dashboard:category-delete',
-                  kwargs={'pk': category.pk})
-    mock_get_menus.return_value = []
-    response = admin_client.post(url, follow=True)
-    assert response.status_code == 200
-    assert mock_get_menus.called
-    assert not mock_update_menus.called
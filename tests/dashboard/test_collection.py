@@ -1,5 +1,4 @@
 import json
-from unittest import mock
 
 from django.urls import reverse
 from unittest.mock import Mock
@@ -148,10 +147,7 @@ def test_collection_update_background_image(
     mock_create_category_thumbnails.assert_called_once_with(collection.pk)
 
 
-@mock.patch('saleor.dashboard.collection.views.get_menus_that_needs_update')
-@mock.patch('saleor.dashboard.collection.views.update_menus')
-def test_collection_delete_view(
-        mock_update_menus, mock_get_menus, admin_client, collection):
+def test_collection_delete_view(admin_client, collection):
     # Test Http404 when collection doesn't exist
     url404 = reverse('dashboard:collection-delete', kwargs={'pk': 123123})
     response404 = admin_client.post(url404)
@@ -160,26 +156,12 @@ def test_collection_delete_view(
     # Test deleting object
     collections_count = Collection.objects.count()
     url = reverse('dashboard:collection-delete', kwargs={'pk': collection.id})
-    mock_get_menus.return_value = [collection.id]
     response = admin_client.post(url)
     assert response.status_code == 302
-    mock_update_menus.assert_called_once_with([collection.pk])
 
     assert Collection.objects.count() == (collections_count - 1)
 
 
-@mock.patch('saleor.dashboard.collection.views.get_menus_that_needs_update')
-@mock.patch('saleor.dashboard.collection.views.update_menus')
-def test_collection_delete_view_menus_not_updated(
-        mock_update_menus, mock_get_menus, admin_client, collection):
-    url = reverse('dashboard:collection-delete', kwargs={'pk': collection.id})
-    mock_get_menus.return_value = []
-    response = admin_client.post(url)
-    assert response.status_code == 302
-    assert mock_get_menus.called
-    assert not mock_update_menus.called
-
-
 def test_collection_is_published_toggle_view(db, admin_client, collection):
     url = reverse('dashboard:collection-publish', kwargs={'pk': collection.pk})
     response = admin_client.post(url)
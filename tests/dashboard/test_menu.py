@@ -1,15 +1,20 @@
 import json
 from unittest import mock
 import pytest
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.formats import localize
 
 from saleor.dashboard.menu.forms import AssignMenuForm
 from saleor.dashboard.menu.utils import (
-    get_menu_as_json, get_menu_item_as_dict, get_menus_that_needs_update,
-    update_menu, update_menu_item_linked_object, update_menus)
+    get_menu_as_json, get_menu_item_as_dict, update_menu,
+    update_menu_item_linked_object, update_menus)
 from saleor.menu.models import Menu, MenuItem, MenuItemTranslation
+from saleor.menu.signals import menu_updates
+from saleor.menu.tasks import rebuild_menus
+from saleor.menu.utils import (
+    MENU_CACHE_TIMEOUT, get_menu_items, translate_menu_items)
 
 from ..utils import get_redirect_location
 
@@ -323,7 +328,7 @@ def test_get_menu_item_as_dict_with_translations(menu, collection):
         'translations': {'pl': {'name': 'Polish Name'}}}
 
 
-def test_get_menu_as_json(menu):
+def test_get_menu_as_json(menu, django_assert_num_queries):
     top_item = MenuItem.objects.create(
         menu=menu, name='top item', url='http://topitem.pl')
     child_item = MenuItem.objects.create(
@@ -336,10 +341,32 @@ def test_get_menu_as_json(menu):
     child_item_data = get_menu_item_as_dict(child_item)
     grand_child_data = get_menu_item_as_dict(grand_child_item)
 
+    grand_child_data['child_items'] = []
     child_item_data['child_items'] = [grand_child_data]
     top_item_data['child_items'] = [child_item_data]
     proper_data = [top_item_data]
-    assert proper_data == get_menu_as_json(menu)
+    with django_assert_num_queries(2):
+        assert proper_data == get_menu_as_json(menu)
+
+
+def test_get_menu_as_json_unlimited_depth(menu, category, page):
+    parent = None
+    for level in range(5):
+        parent = MenuItem.objects.create(
+            menu=menu, parent=parent, name='level %s' % level,
+            category=category)
+    MenuItem.objects.create(menu=menu, name='second top item', page=page)
+
+    result = get_menu_as_json(menu)
+
+    assert [item['name'] for item in result] == [
+        'level 0', 'second top item']
+    item = result[0]
+    for level in range(1, 5):
+        item, = item['child_items']
+        assert item['name'] == 'level %s' % level
+        assert item['url'] == category.get_absolute_url()
+    assert item['child_items'] == []
 
 
 @mock.patch('saleor.dashboard.menu.utils.update_menu')
@@ -350,29 +377,95 @@ def test_update_menus(mock_update_menu, menu):
 
 @mock.patch('saleor.dashboard.menu.utils.get_menu_as_json')
 def test_update_menu(mock_json_menu, menu):
-    mock_json_menu.return_value = 'Return value'
+    json_content = [{
+        'name': 'Name', 'url': 'http://url.com', 'child_items': [],
+        'translations': {'pl': {'name': 'Polish Name'}}}]
+    mock_json_menu.return_value = json_content
     update_menu(menu)
 
     mock_json_menu.assert_called_once_with(menu)
     menu.refresh_from_db()
-    assert menu.json_content == 'Return value'
+    assert menu.json_content == json_content
+    assert get_menu_items(menu, 'pl') == [
+        {'name': 'Polish Name', 'url': 'http://url.com', 'child_items': []}]
+
+
+def test_get_menu_items(menu_with_items, django_assert_num_queries):
+    menu_item = menu_with_items.items.first()
+    MenuItemTranslation.objects.create(
+        menu_item=menu_item, name='Polish Name', language_code='pl')
+    update_menu(menu_with_items)
+    cache.clear()
+
+    items = get_menu_items(menu_with_items, 'pl')
+
+    assert items[0]['name'] == 'Polish Name'
+    assert items[0]['url'] == menu_item.url
+    assert items == translate_menu_items(
+        get_menu_as_json(menu_with_items), 'pl')
+    with django_assert_num_queries(0):
+        assert get_menu_items(menu_with_items, 'pl') == items
+
+
+def test_get_menu_items_uses_current_content(menu_with_items):
+    stale_menu = Menu.objects.get(pk=menu_with_items.pk)
+    update_menu(menu_with_items)
+    get_menu_items(stale_menu, 'en')
+    menu_with_items.items.create(name='New link', url='http://example.com/')
+    update_menu(menu_with_items)
+
+    items = get_menu_items(stale_menu, 'en')
+
+    assert items[-1]['name'] == 'New link'
 
 
-def test_get_menus_that_needs_update(category, collection, page):
-    assert not get_menus_that_needs_update()
+def test_get_menu_items_are_cached_for_limited_time(menu_with_items):
+    with mock.patch('saleor.menu.utils.cache.set') as mock_cache_set:
+        get_menu_items(menu_with_items, 'en')
+    assert mock_cache_set.call_args[0][2] == MENU_CACHE_TIMEOUT
 
-    menus = Menu.objects.bulk_create([
-        Menu(name='category'),
-        Menu(name='collection'),
-        Menu(name='page')])
 
-    MenuItem.objects.create(name='item', menu=menus[0], category=category),
-    MenuItem.objects.create(name='item', menu=menus[1], collection=collection),
-    MenuItem.objects.create(name='item', menu=menus[2], page=page)
+@mock.patch('saleor.menu.signals.rebuild_menus.delay')
+def test_menu_item_changes_queue_menu_update(mock_rebuild_menus, menu):
+    item = MenuItem.objects.create(menu=menu, name='Name', url='http://a.b')
+    MenuItemTranslation.objects.create(
+        menu_item=item, name='Polish Name', language_code='pl')
+    item.delete()
+    assert menu_updates.get_items() == {menu.pk}
+
+    menu_updates.flush()
+
+    mock_rebuild_menus.assert_called_once_with([menu.pk])
+    assert not menu_updates.get_items()
 
-    result = get_menus_that_needs_update(
-        categories=[category], collection=collection, page=page)
-    assert sorted(list(result)) == sorted([m.pk for m in menus])
+
+@mock.patch('saleor.menu.signals.rebuild_menus.delay')
+def test_linked_object_changes_queue_menu_update(
+        mock_rebuild_menus, menu, category, collection):
+    MenuItem.objects.create(menu=menu, name='Name', category=category)
+    menu_updates.flush()
+    mock_rebuild_menus.reset_mock()
+
+    collection.save()
+    category.save(update_fields=['description'])
+    menu_updates.flush()
+    assert not mock_rebuild_menus.called
+
+    category.slug = 'new-slug'
+    category.save()
+    menu_updates.flush()
+    mock_rebuild_menus.assert_called_once_with([menu.pk])
+
+
+def test_rebuild_menus(menu, category):
+    MenuItem.objects.create(menu=menu, name='Name', category=category)
+
+    rebuild_menus([menu.pk])
+
+    menu.refresh_from_db()
+    assert menu.json_content == get_menu_as_json(menu)
+    assert get_menu_items(menu, 'en')[0]['url'] == (
+        category.get_absolute_url())
 
 
 def test_menu_item_status(menu, category, collection, page):
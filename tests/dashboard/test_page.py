@@ -1,8 +1,7 @@
-from unittest import mock
-
 from django.forms.models import model_to_dict
 from django.urls import reverse
 from saleor.dashboard.page.forms import PageForm
+from saleor.page.models import Page
 
 
 def test_page_list(admin_client):
@@ -43,31 +42,15 @@ def test_page_add(admin_client):
     assert response.status_code == 302
 
 
-@mock.patch('saleor.dashboard.page.views.get_menus_that_needs_update')
-@mock.patch('saleor.dashboard.page.views.update_menus')
-def test_page_delete(mock_update_menus, mock_get_menus, admin_client, page):
+def test_page_delete(admin_client, page):
     url = reverse('dashboard:page-delete', args=[page.pk])
 
     response = admin_client.get(url)
     assert response.status_code == 200
 
-    mock_get_menus.return_value = [page.pk]
-    response = admin_client.post(url, data={'a': 'b'})
-    assert response.status_code == 302
-    assert mock_get_menus.called
-    mock_update_menus.assert_called_once_with([page.pk])
-
-
-@mock.patch('saleor.dashboard.page.views.get_menus_that_needs_update')
-@mock.patch('saleor.dashboard.page.views.update_menus')
-def test_page_delete_menu_not_updated(
-        mock_update_menus, mock_get_menus, admin_client, page):
-    url = reverse('dashboard:page-delete', args=[page.pk])
-    mock_get_menus.return_value = []
     response = admin_client.post(url, data={'a': 'b'})
     assert response.status_code == 302
-    assert mock_get_menus.called
-    assert not mock_update_menus.called
+    assert not Page.objects.filter(pk=page.pk).exists()
 
 
 def test_sanitize_page_content(page, category):
@@ -9,6 +9,7 @@ from tests.utils import get_redirect_location
 
 from saleor.dashboard.product import ProductBulkAction
 from saleor.dashboard.product.forms import ProductForm, ProductVariantForm
+from saleor.dashboard.views import get_low_stock_products
 from saleor.product.forms import VariantChoiceField
 from saleor.product.models import (
     AttributeValue, Collection, Product, Attribute, ProductImage,
@@ -1112,3 +1113,20 @@ def test_product_form_seo_description_too_long(unavailable_product):
         'form sixth. Image moving earth without')
     assert (
         new_seo_description.endswith('...') or new_seo_description[-1] == '…')
+
+
+def test_get_low_stock_products(product, settings):
+    settings.LOW_STOCK_THRESHOLD = 5
+    variant = product.variants.first()
+    assert product not in get_low_stock_products()
+
+    variant.quantity = 5
+    variant.save()
+    assert list(get_low_stock_products()) == [product]
+
+
+def test_get_low_stock_products_skips_products_without_variants(
+        product, settings):
+    settings.LOW_STOCK_THRESHOLD = 5
+    product.variants.all().delete()
+    assert product not in get_low_stock_products()
@@ -118,6 +118,20 @@ def test_get_taxes_for_country(vatlayer):
     compare_taxes(taxes, vatlayer)
 
 
+def test_get_taxes_for_country_is_cached(vatlayer, django_assert_num_queries):
+    taxes = get_taxes_for_country(Country('PL'))
+    with django_assert_num_queries(0):
+        assert get_taxes_for_country(Country('PL')) is taxes
+
+
+def test_get_taxes_for_country_after_rates_change(vatlayer):
+    assert get_taxes_for_country(Country('PL'))['standard']['value'] == 23
+    vat = VAT.objects.get(country_code='PL')
+    vat.data['standard_rate'] = 20
+    vat.save()
+    assert get_taxes_for_country(Country('PL'))['standard']['value'] == 20
+
+
 def test_get_country_name_by_code():
     country_name = get_country_name_by_code('PL')
     assert country_name == 'Poland'
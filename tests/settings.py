@@ -18,6 +18,9 @@ RECAPTCHA_PRIVATE_KEY = None
 
 VATLAYER_ACCESS_KEY = ''
 
+# Tests run in a single process, its local memory cache is shared by all
+CACHE_IS_SHARED = True
+
 if 'sqlite' in DATABASES['default']['ENGINE']:  # noqa
     DATABASES['default']['TEST'] = {  # noqa
         'SERIALIZE': False,
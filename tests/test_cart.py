@@ -15,11 +15,14 @@ from saleor.checkout import forms, utils
 from saleor.checkout.context_processors import cart_counter
 from saleor.checkout.models import Cart
 from saleor.checkout.utils import (
-    add_variant_to_cart, change_cart_user, find_open_cart_for_user)
+    add_variant_to_cart, add_variants_to_cart, change_cart_user,
+    find_open_cart_for_user)
 from saleor.checkout.views import clear_cart, update_cart_line
 from saleor.core.exceptions import InsufficientStock
 from saleor.core.utils.taxes import ZERO_TAXED_MONEY
-from saleor.discount.models import Sale
+from saleor.discount import VoucherType
+from saleor.discount.models import Sale, Voucher
+from saleor.product.models import Collection, ProductVariant
 from saleor.shipping.utils import get_shipping_price_estimate
 
 
@@ -266,6 +269,57 @@ def test_adding_invalid_quantity(cart, product):
         add_variant_to_cart(cart, variant, -1)
 
 
+def test_adding_many_variants(cart, product, variant):
+    product_variant = product.variants.exclude(pk=variant.pk).get()
+    add_variant_to_cart(cart, variant, 2)
+
+    add_variants_to_cart(
+        cart, [(product_variant, 1), (variant, -2), (product_variant, 2)])
+
+    assert cart.lines.get().variant == product_variant
+    assert cart.quantity == 3
+
+
+def test_replacing_many_variants(cart, product, variant):
+    product_variant = product.variants.exclude(pk=variant.pk).get()
+    add_variants_to_cart(cart, [(product_variant, 3), (variant, 1)])
+
+    add_variants_to_cart(
+        cart, [(product_variant, 1), (variant, 2)], replace=True)
+
+    quantities = dict(cart.lines.values_list('variant', 'quantity'))
+    assert quantities == {product_variant.pk: 1, variant.pk: 2}
+    assert cart.quantity == 3
+
+
+def test_adding_many_variants_insufficient_stock(cart, product, variant):
+    product_variant = product.variants.exclude(pk=variant.pk).get()
+    with pytest.raises(InsufficientStock):
+        add_variants_to_cart(cart, [(product_variant, 1), (variant, 3)])
+    assert len(cart) == 0
+    assert cart.quantity == 0
+
+
+def test_adding_many_variants_deleted_variant(cart, product, variant):
+    product_variant = product.variants.exclude(pk=variant.pk).get()
+    ProductVariant.objects.filter(pk=variant.pk).delete()
+    with pytest.raises(InsufficientStock) as exc:
+        add_variants_to_cart(cart, [(product_variant, 1), (variant, 1)])
+    assert exc.value.item == variant
+    assert len(cart) == 0
+    assert cart.quantity == 0
+
+
+def test_adding_many_variants_queries(
+        cart, product, variant, django_assert_num_queries):
+    product_variant = product.variants.exclude(pk=variant.pk).get()
+    add_variant_to_cart(cart, variant, 1)
+    # Lock variants, fetch, create and update lines, sum up quantity, save
+    # cart and two queries to manage the savepoint
+    with django_assert_num_queries(8):
+        add_variants_to_cart(cart, [(product_variant, 1), (variant, 1)])
+
+
 def test_getting_line(cart, product):
     variant = product.variants.get()
     assert cart.get_line(variant) is None
@@ -291,12 +345,14 @@ def test_cart_counter(monkeypatch):
 def test_get_prices_of_discounted_products(cart_with_item):
     discounted_line = cart_with_item.lines.first()
     discounted_product = discounted_line.variant.product
-    prices = utils.get_prices_of_discounted_products(
-        cart_with_item, [discounted_product])
+    voucher = Voucher.objects.create(
+        code='unique', type=VoucherType.PRODUCT, discount_value=10)
+    voucher.products.add(discounted_product)
+    prices = utils.get_prices_of_discounted_lines(
+        cart_with_item.lines.all(), voucher)
     excepted_value = [
-        discounted_line.variant.get_price()
-        for item in range(discounted_line.quantity)]
-    assert list(prices) == excepted_value
+        (discounted_line.variant.get_price(), discounted_line.quantity)]
+    assert prices == excepted_value
 
 
 def test_contains_unavailable_variants():
@@ -596,11 +652,18 @@ def test_get_prices_of_products_in_discounted_collections(
     discounted_line = cart_with_item.lines.first()
     assert discounted_line.variant.product == product
     product.collections.add(collection)
-    result = utils.get_prices_of_products_in_discounted_collections(
-        cart_with_item, [collection])
-    assert list(result) == [
-        discounted_line.variant.get_price()
-        for item in range(discounted_line.quantity)]
+    voucher = Voucher.objects.create(
+        code='unique', type=VoucherType.COLLECTION, discount_value=10)
+    voucher.collections.add(collection)
+    result = utils.get_prices_of_discounted_lines(
+        cart_with_item.lines.all(), voucher)
+    assert result == [
+        (discounted_line.variant.get_price(), discounted_line.quantity)]
+
+    voucher.collections.set([Collection.objects.create(name='Other')])
+    result = utils.get_prices_of_discounted_lines(
+        cart_with_item.lines.all(), voucher)
+    assert result == []
 
 
 def test_update_view_must_be_ajax(customer_user, rf):
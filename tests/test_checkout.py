@@ -1,8 +1,10 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
 import pytest
 
+from django.db import connection
 from django.urls import reverse
 from django_countries.fields import Country
 from freezegun import freeze_time
@@ -10,14 +12,17 @@ from prices import Money, TaxedMoney
 from saleor.account.models import Address
 from saleor.checkout import views
 from saleor.checkout.forms import CartVoucherForm, CountryForm
+from saleor.checkout.models import Cart, StockReservation
+from saleor.checkout.tasks import release_stock_reservations
 from saleor.checkout.utils import (
     add_variant_to_cart, change_billing_address_in_cart,
     change_shipping_address_in_cart, clear_shipping_method, create_order,
-    get_cart_data_for_checkout,
-    get_prices_of_products_in_discounted_categories, get_taxes_for_cart,
+    get_cart_data_for_checkout, get_prices_of_discounted_lines,
+    get_taxes_for_cart,
     get_voucher_discount_for_cart, get_voucher_for_cart,
     is_valid_shipping_method, recalculate_cart_discount,
-    remove_voucher_from_cart)
+    release_expired_reservations, remove_voucher_from_cart,
+    reserve_cart_stock)
 from saleor.core.exceptions import InsufficientStock
 from saleor.core.utils.taxes import (
     ZERO_MONEY, ZERO_TAXED_MONEY, get_taxes_for_country)
@@ -528,6 +533,122 @@ def test_create_order_insufficient_stock(
             request_cart, 'tracking_code', discounts=None, taxes=None)
 
 
+@pytest.fixture
+def cart_ready_for_order(
+        request_cart, customer_user, product_without_shipping):
+    variant = product_without_shipping.variants.get()
+    variant.quantity = 10
+    variant.quantity_allocated = 0
+    variant.save()
+    add_variant_to_cart(request_cart, variant, 3)
+    request_cart.user = customer_user
+    request_cart.billing_address = customer_user.default_billing_address
+    request_cart.save()
+    return request_cart
+
+
+def test_reserve_cart_stock(cart_ready_for_order):
+    cart = cart_ready_for_order
+    variant = cart.lines.get().variant
+
+    reserve_cart_stock(cart)
+    reserve_cart_stock(cart)
+
+    variant.refresh_from_db()
+    assert variant.quantity_allocated == 3
+    reservation = StockReservation.objects.get(cart_token=cart.token)
+    assert reservation.variant == variant
+    assert reservation.quantity == 3
+
+
+def test_reserve_cart_stock_insufficient_stock(cart_ready_for_order):
+    cart = cart_ready_for_order
+    variant = cart.lines.get().variant
+    variant.quantity_allocated = 8
+    variant.save()
+
+    with pytest.raises(InsufficientStock):
+        reserve_cart_stock(cart)
+
+    variant.refresh_from_db()
+    assert variant.quantity_allocated == 8
+    assert not StockReservation.objects.exists()
+
+
+def test_release_expired_reservations(cart_ready_for_order):
+    cart = cart_ready_for_order
+    variant = cart.lines.get().variant
+    with freeze_time('2018-05-31 12:00:01'):
+        reserve_cart_stock(cart, timeout=60)
+
+    with freeze_time('2018-05-31 12:00:30'):
+        release_expired_reservations()
+    variant.refresh_from_db()
+    assert variant.quantity_allocated == 3
+
+    with freeze_time('2018-05-31 12:01:30'):
+        release_expired_reservations()
+    variant.refresh_from_db()
+    assert variant.quantity_allocated == 0
+    assert not StockReservation.objects.exists()
+
+
+def test_release_stock_reservations_is_scheduled(settings):
+    scheduled_tasks = [
+        entry['task'] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+    assert release_stock_reservations.name in scheduled_tasks
+
+
+def test_create_order_claims_reserved_stock(cart_ready_for_order):
+    cart = cart_ready_for_order
+    line = cart.lines.get()
+    variant = line.variant
+    reserve_cart_stock(cart)
+    line.quantity = 2
+    line.save()
+
+    order = create_order(cart, 'tracking_code', discounts=None, taxes=None)
+
+    variant.refresh_from_db()
+    assert order.lines.get().quantity == 2
+    assert variant.quantity_allocated == 2
+    assert not StockReservation.objects.exists()
+
+
+def test_create_order_concurrently_does_not_oversell(
+        transactional_db, product_without_shipping, address):
+    variant = product_without_shipping.variants.get()
+    variant.quantity = 3
+    variant.quantity_allocated = 0
+    variant.save()
+    carts = []
+    for _ in range(10):
+        cart = Cart.objects.create(
+            email='test@example.com', billing_address=address.get_copy())
+        add_variant_to_cart(cart, variant, 1)
+        carts.append(cart)
+
+    def place_order(cart):
+        try:
+            return create_order(
+                cart, 'tracking_code', discounts=None, taxes=None)
+        except InsufficientStock:
+            return None
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(carts)) as executor:
+        orders = [order for order in executor.map(place_order, carts) if order]
+
+    variant.refresh_from_db()
+    assert len(orders) == 3
+    assert variant.quantity_allocated == 3
+    summary = product_without_shipping.summary
+    summary.refresh_from_db()
+    assert summary.quantity_allocated == 3
+    assert not summary.is_in_stock
+
+
 def test_note_in_created_order(request_cart_with_item, address):
     request_cart_with_item.shipping_address = address
     request_cart_with_item.note = 'test_note'
@@ -638,8 +759,8 @@ def test_get_discount_for_cart_shipping_voucher_not_applicable(
 
 def test_get_discount_for_cart_product_voucher_not_applicable(monkeypatch):
     monkeypatch.setattr(
-        'saleor.checkout.utils.get_prices_of_discounted_products',
-        lambda cart, product: [])
+        'saleor.checkout.utils.get_prices_of_discounted_lines',
+        lambda lines, voucher: [])
     voucher = Voucher(
         code='unique', type=VoucherType.PRODUCT,
         discount_value_type=DiscountValueType.FIXED,
@@ -654,8 +775,8 @@ def test_get_discount_for_cart_product_voucher_not_applicable(monkeypatch):
 
 def test_get_discount_for_cart_collection_voucher_not_applicable(monkeypatch):
     monkeypatch.setattr(
-        'saleor.checkout.utils.get_prices_of_products_in_discounted_collections',  # noqa
-        lambda cart, product: [])
+        'saleor.checkout.utils.get_prices_of_discounted_lines',
+        lambda lines, voucher: [])
     voucher = Voucher(
         code='unique', type=VoucherType.COLLECTION,
         discount_value_type=DiscountValueType.FIXED,
@@ -910,17 +1031,17 @@ def test_change_address_in_cart_from_user_address_to_other(
 
 def test_get_prices_of_products_in_discounted_categories(cart_with_item):
     lines = cart_with_item.lines.all()
+    voucher = Voucher.objects.create(
+        code='unique', type=VoucherType.CATEGORY, discount_value=10)
     # There's no discounted categories, therefore all of them are discoutned
-    discounted_lines = get_prices_of_products_in_discounted_categories(
-        lines, [])
+    discounted_lines = get_prices_of_discounted_lines(lines, voucher)
     assert [
-        line.variant.get_price()
-        for line in lines
-        for item in range(line.quantity)] == discounted_lines
+        (line.variant.get_price(), line.quantity)
+        for line in lines] == discounted_lines
 
     discounted_category = Category.objects.create(
         name='discounted', slug='discounted')
-    discounted_lines = get_prices_of_products_in_discounted_categories(
-        lines, [discounted_category])
+    voucher.categories.add(discounted_category)
+    discounted_lines = get_prices_of_discounted_lines(lines, voucher)
     # None of the lines are belongs to the discounted category
     assert not discounted_lines
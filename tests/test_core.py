@@ -5,23 +5,38 @@ from urllib.parse import urljoin
 
 import pytest
 
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
 from django.db.models import Case, F, When
 from django.shortcuts import reverse
 from django.templatetags.static import static
 from django.urls import translate_url
+from django.utils import translation
 from measurement.measures import Weight
 from prices import Money
 from saleor.account.models import Address, User
+from saleor.core.middleware import site as site_middleware
 from saleor.core.storages import S3MediaStorage
 from saleor.core.utils import (
     Country, build_absolute_uri, create_superuser, create_thumbnails,
     format_money, get_country_by_ip, get_currency_for_country, random_data)
+from saleor.core.templatetags.markdown import markdown
+from saleor.core.utils.cache import bump_version, get_version
+from saleor.core.utils.rendered_text import (
+    get_field_context, get_rendered_text_key, render_field, render_text)
+from saleor.core.utils.taxes import include_taxes_in_prices
 from saleor.core.utils.text import get_cleaner, strip_html
+from saleor.core.utils.transactions import OnCommitQueue
+from saleor.core.utils.thumbnails import get_cached_thumbnail_url
 from saleor.core.weight import WeightUnits, convert_weight
 from saleor.discount.models import Sale, Voucher
 from saleor.order.models import Order
 from saleor.product.models import Product, ProductImage, ProductVariant
 from saleor.shipping.models import ShippingZone
+from saleor.site.patch_sites import (
+    SITE_CACHE_VERSION_KEY, refresh_site_cache)
 
 type_schema = {
     'Vegetable': {
@@ -164,6 +179,63 @@ def test_utils_strip_html():
     assert text == 'Hello World'
 
 
+def test_render_text_is_cached():
+    renderer = Mock(return_value='rendered')
+    with patch.dict(
+            'saleor.core.utils.rendered_text.RENDERERS', {'test': renderer}):
+        assert render_text('text', 'test') == 'rendered'
+        assert render_text('text', 'test') == 'rendered'
+        assert render_text('other text', 'test') == 'rendered'
+    assert renderer.call_count == 2
+
+
+def test_markdown_filter():
+    assert markdown('**bold**') == '<p><strong>bold</strong></p>'
+
+
+def test_render_field_of_translation(product, product_translation_fr):
+    product.description = '<p>Description</p>'
+    product.save()
+
+    assert render_field(
+        product.translated, 'description', 'plain') == 'Description'
+    with translation.override('fr'):
+        assert render_field(
+            product.translated, 'description', 'plain') == (
+                'French description')
+
+
+def test_saving_product_renders_description(product):
+    product.description = '<p>New description</p>'
+    product.save()
+
+    key = get_rendered_text_key(
+        product.description, 'plain',
+        *get_field_context(product, 'description'))
+    assert cache.get(key) == 'New description'
+
+
+def test_warm_rendered_text_command(product, product_translation_fr):
+    cache.clear()
+    out = io.StringIO()
+
+    call_command('warm_rendered_text', stdout=out)
+
+    assert (
+        'Rendered description of 1 objects of product.Product'
+        in out.getvalue())
+    key = get_rendered_text_key(
+        product_translation_fr.description, 'plain',
+        *get_field_context(product_translation_fr, 'description'))
+    assert cache.get(key) == 'French description'
+
+    out = io.StringIO()
+    call_command('warm_rendered_text', stdout=out)
+    assert (
+        'Rendered description of 0 objects of product.Product'
+        in out.getvalue())
+
+
 def test_create_thumbnails(product_with_image, settings):
     settings.VERSATILEIMAGEFIELD_SETTINGS['create_images_on_demand'] = False
     sizeset = settings.VERSATILEIMAGEFIELD_RENDITION_KEY_SETS['products']
@@ -192,6 +264,50 @@ def test_create_thumbnails(product_with_image, settings):
             assert product_image.image.thumbnail[size].name in log_deleted_images  # noqa
 
 
+def test_create_thumbnails_caches_urls(product_with_image, settings):
+    settings.VERSATILEIMAGEFIELD_SETTINGS['create_images_on_demand'] = False
+    product_image = product_with_image.images.first()
+    image = product_image.image
+    assert get_cached_thumbnail_url(image, 'thumbnail', '255x255') is None
+
+    create_thumbnails(product_image.pk, ProductImage, 'products')
+
+    url = get_cached_thumbnail_url(image, 'thumbnail', '255x255')
+    assert url == image.thumbnail['255x255'].url
+
+
+def test_create_thumbnails_command(product_with_image, settings, tmpdir):
+    settings.VERSATILEIMAGEFIELD_SETTINGS['create_images_on_demand'] = False
+    checkpoint = str(tmpdir.join('checkpoint'))
+    image = product_with_image.images.first().image
+    out = io.StringIO()
+
+    call_command(
+        'create_thumbnails', processes=1, checkpoint=checkpoint, stdout=out)
+
+    assert 'Generated thumbnails for 1 images' in out.getvalue()
+    assert get_cached_thumbnail_url(image, 'thumbnail', '255x255')
+    assert not tmpdir.join('checkpoint').exists()
+
+
+def test_create_thumbnails_command_resumes(
+        product_with_image, settings, tmpdir):
+    settings.VERSATILEIMAGEFIELD_SETTINGS['create_images_on_demand'] = False
+    product_image = product_with_image.images.first()
+    chunk_start = product_image.pk - product_image.pk % 1000
+    checkpoint = tmpdir.join('checkpoint')
+    checkpoint.write('["product.ProductImage:%d"]' % chunk_start)
+    out = io.StringIO()
+
+    call_command(
+        'create_thumbnails', processes=1, checkpoint=str(checkpoint),
+        stdout=out)
+
+    assert 'Resuming, 1 chunks already processed' in out.getvalue()
+    assert get_cached_thumbnail_url(
+        product_image.image, 'thumbnail', '255x255') is None
+
+
 @patch('storages.backends.s3boto3.S3Boto3Storage')
 def test_storages_set_s3_bucket_domain(storage, settings):
     settings.AWS_MEDIA_BUCKET_NAME = 'media-bucket'
@@ -267,3 +383,79 @@ def test_build_absolute_uri(site_settings, settings):
     current_url = '%s://%s' % (protocol, site_settings.site.domain)
     logo_location = urljoin(current_url, static('images/logo-document.svg'))
     assert logo_url == logo_location
+
+
+def test_refresh_site_cache_keeps_unchanged_site(
+        site_settings, django_assert_num_queries):
+    refresh_site_cache()
+    site = Site.objects.get_current()
+    with django_assert_num_queries(0):
+        refresh_site_cache()
+        assert Site.objects.get_current() is site
+        assert include_taxes_in_prices()
+
+
+def test_refresh_site_cache_drops_site_changed_elsewhere(site_settings):
+    refresh_site_cache()
+    site = Site.objects.get_current()
+    cache.set(SITE_CACHE_VERSION_KEY, 'changed-by-other-process')
+    refresh_site_cache()
+    assert Site.objects.get_current() is not site
+
+
+def test_site_middleware_gives_each_request_own_site(rf, site_settings):
+    middleware = site_middleware(lambda request: request.site)
+    request_site = middleware(rf.get('/'))
+    request_site.settings.header_text = 'Unsaved header'
+
+    cached_site = Site.objects.get_current()
+    assert request_site is not cached_site
+    assert cached_site.settings.header_text != 'Unsaved header'
+    assert middleware(rf.get('/')).settings.header_text != 'Unsaved header'
+
+
+def test_saving_site_settings_invalidates_site_cache(site_settings):
+    assert include_taxes_in_prices()
+    site_settings.include_taxes_in_prices = False
+    site_settings.save()
+    assert not include_taxes_in_prices()
+
+
+def test_get_version_is_stable_until_bumped():
+    version = get_version('test-version')
+    assert get_version('test-version') == version
+
+    bump_version('test-version')
+    assert get_version('test-version') != version
+
+
+def test_get_version_changes_on_every_lookup_without_shared_cache(
+        settings):
+    settings.CACHE_IS_SHARED = False
+    assert get_version('test-version') != get_version('test-version')
+
+
+def test_on_commit_queue_handles_items_of_transaction_once(db):
+    handle = Mock()
+    queue = OnCommitQueue(handle)
+    queue.add([1, 2])
+    queue.add([2, 3])
+    assert queue.get_items() == {1, 2, 3}
+
+    queue.flush()
+    handle.assert_called_once_with({1, 2, 3})
+    assert not queue.get_items()
+
+
+def test_on_commit_queue_drops_items_of_rolled_back_transaction(db):
+    handle = Mock()
+    queue = OnCommitQueue(handle)
+    with pytest.raises(DatabaseError):
+        with transaction.atomic():
+            queue.add([1])
+            raise DatabaseError()
+    assert not queue.get_items()
+
+    queue.add([2])
+    queue.flush()
+    handle.assert_called_once_with({2})
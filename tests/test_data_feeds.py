@@ -1,12 +1,19 @@
 import csv
+import gzip
+from datetime import date, timedelta
 from io import StringIO
 from unittest.mock import Mock, patch
 
+import pytest
+from django.core.files.storage import default_storage
 from django.utils.encoding import smart_text
 
 from saleor.data_feeds.google_merchant import (
-    get_feed_items, item_attributes, item_google_product_category, write_feed)
-from saleor.product.models import AttributeValue, Category
+    STATE_FILE_PATH, get_chunk_bounds, get_feed_items, item_attributes,
+    item_google_product_category, update_feed, write_feed)
+from saleor.discount.models import Sale
+from saleor.discount.utils import invalidate_sale_index
+from saleor.product.models import AttributeValue, Category, ProductVariant
 
 
 def test_saleor_feed_items(product, site_settings):
@@ -62,3 +69,94 @@ def test_feed_contains_site_settings_domain(
     write_feed(StringIO())
     mocked_item_link.assert_called_once_with(
         product.variants.first(), site_settings.site)
+
+
+@pytest.fixture
+def feed_products(product_list):
+    for index, product in enumerate(product_list):
+        ProductVariant.objects.create(
+            product=product, sku='SKU-%s' % index, quantity=10)
+    return product_list
+
+
+def get_state(**kwargs):
+    output = StringIO()
+    state = StringIO()
+    write_feed(output, state, **kwargs)
+    output.seek(0)
+    state.seek(0)
+    rows = list(csv.DictReader(output, dialect=csv.excel_tab))
+    state_rows = list(csv.DictReader(state, dialect=csv.excel_tab))
+    return rows, state_rows
+
+
+def test_get_chunk_bounds(feed_products):
+    pks = sorted(ProductVariant.objects.values_list('pk', flat=True))
+    assert list(get_chunk_bounds(2)) == [(pks[0], pks[1]), (pks[2], pks[2])]
+    assert list(get_chunk_bounds(3)) == [(pks[0], pks[2])]
+
+
+def test_write_feed_in_chunks(feed_products):
+    rows, state_rows = get_state()
+    chunked_rows, chunked_state_rows = get_state(chunk_size=1)
+    skus = list(ProductVariant.objects.order_by('pk').values_list(
+        'sku', flat=True))
+    assert [row['id'] for row in chunked_rows] == skus
+    assert chunked_rows == rows
+    assert [row['pk'] for row in chunked_state_rows] == [
+        row['pk'] for row in state_rows]
+
+
+def test_write_feed_incremental_reuses_unchanged_rows(feed_products):
+    _, state_rows = get_state()
+
+    with patch(
+            'saleor.data_feeds.google_merchant.item_attributes') as mocked:
+        rows, _ = get_state(previous_state=state_rows)
+
+    mocked.assert_not_called()
+    assert [row['id'] for row in rows] == [row['id'] for row in state_rows]
+
+
+def test_write_feed_incremental_updates_changed_rows(feed_products):
+    _, state_rows = get_state()
+    product = feed_products[0]
+    product.name = 'Changed name'
+    product.save()
+    variant = feed_products[1].variants.get()
+    variant.quantity_allocated = variant.quantity
+    variant.save(update_fields=['quantity_allocated'])
+    feed_products[2].variants.all().delete()
+
+    rows, _ = get_state(previous_state=state_rows)
+
+    assert len(rows) == 2
+    assert rows[0]['title'].startswith('Changed name')
+    assert rows[1]['availability'] == 'out of stock'
+
+
+def test_write_feed_incremental_updates_rows_on_sale(feed_products):
+    _, state_rows = get_state()
+    product = feed_products[0]
+    sale = Sale.objects.create(
+        name='Sale', value=5, end_date=date.today() + timedelta(days=1))
+    sale.products.add(product)
+    invalidate_sale_index()
+
+    rows, _ = get_state(previous_state=state_rows)
+
+    variant_sku = product.variants.get().sku
+    sale_prices = {row['id']: row['sale_price'] for row in rows}
+    assert sale_prices.pop(variant_sku) == '5.00 USD'
+    assert not any(sale_prices.values())
+
+
+def test_update_feed_incremental(feed_products, settings, tmpdir):
+    settings.MEDIA_ROOT = str(tmpdir)
+    update_feed()
+    update_feed(incremental=True)
+
+    with default_storage.open(STATE_FILE_PATH, 'rb') as state_file:
+        state_rows = list(csv.DictReader(
+            gzip.open(state_file, 'rt'), dialect=csv.excel_tab))
+    assert len(state_rows) == 3
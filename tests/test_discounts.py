@@ -7,10 +7,12 @@ from saleor.checkout.utils import get_voucher_discount_for_cart
 from saleor.discount import DiscountValueType, VoucherType
 from saleor.discount.models import NotApplicable, Sale, Voucher
 from saleor.discount.utils import (
+    SaleIndex, build_sale_index, calculate_discounted_price,
     decrease_voucher_usage, get_product_discount_on_sale,
-    get_products_voucher_discount, get_shipping_voucher_discount,
-    get_value_voucher_discount, increase_voucher_usage)
-from saleor.product.models import Product, ProductVariant
+    get_products_voucher_discount, get_sale_index,
+    get_shipping_voucher_discount, get_value_voucher_discount,
+    increase_voucher_usage)
+from saleor.product.models import Category, Product, ProductVariant
 
 
 def get_min_amount_spent(min_amount_spent):
@@ -92,10 +94,10 @@ def test_products_voucher_checkout_discount_not(
         settings, monkeypatch, prices, discount_value, discount_type,
         expected_value, apply_once_per_order, cart_with_item):
     monkeypatch.setattr(
-        'saleor.checkout.utils.get_prices_of_discounted_products',
-        lambda lines, discounted_products: (
-            TaxedMoney(net=Money(price, 'USD'), gross=Money(price, 'USD'))
-            for price in prices))
+        'saleor.checkout.utils.get_prices_of_discounted_lines',
+        lambda lines, voucher: [
+            (TaxedMoney(net=Money(price, 'USD'), gross=Money(price, 'USD')), 1)
+            for price in prices])
     voucher = Voucher(
         code='unique', type=VoucherType.PRODUCT,
         discount_value_type=discount_type,
@@ -128,6 +130,94 @@ def test_sale_applies_to_correct_products(product_type, category):
         get_product_discount_on_sale(sale, sec_variant.product)
 
 
+def test_sale_index_applies_to_products(product, collection):
+    today = date.today()
+    sale = Sale.objects.create(
+        name='Product sale', value=3, type=DiscountValueType.FIXED,
+        end_date=today)
+    sale.products.add(product)
+    other_product = Product.objects.create(
+        name='Other product', price=Money(15, 'USD'), description='',
+        product_type=product.product_type, category=product.category)
+
+    index = build_sale_index(today)
+
+    assert list(index) == [sale]
+    assert index.get_product_sales(product) == {sale}
+    assert index.get_product_sales(other_product) == set()
+    price = calculate_discounted_price(product, product.price, index)
+    assert price == Money(7, 'USD')
+
+
+def test_sale_index_applies_to_category_descendants(product, category):
+    today = date.today()
+    sale = Sale.objects.create(
+        name='Category sale', value=50, type=DiscountValueType.PERCENTAGE,
+        end_date=today)
+    sale.categories.add(category)
+    child = Category.objects.create(
+        name='Child', slug='child', parent=category)
+    product.category = child
+    product.save()
+
+    index = build_sale_index(today)
+
+    assert index.get_product_sales(product) == {sale}
+    price = calculate_discounted_price(product, product.price, index)
+    assert price == Money(5, 'USD')
+
+
+def test_sale_index_applies_to_collections(product, collection):
+    today = date.today()
+    sale = Sale.objects.create(
+        name='Collection sale', value=3, type=DiscountValueType.FIXED,
+        end_date=today)
+    sale.collections.add(collection)
+
+    assert build_sale_index(today).get_product_sales(product) == set()
+
+    collection.products.add(product)
+
+    assert build_sale_index(today).get_product_sales(product) == {sale}
+
+
+def test_sale_index_skips_inactive_sales(product):
+    today = date.today()
+    sale = Sale.objects.create(
+        name='Expired sale', value=3, type=DiscountValueType.FIXED,
+        end_date=today - timedelta(days=1))
+    sale.products.add(product)
+
+    index = build_sale_index(today)
+
+    assert len(index) == 0
+    price = calculate_discounted_price(product, product.price, index)
+    assert price == product.price
+
+
+def test_get_sale_index_is_cached_until_invalidated(product):
+    today = date.today()
+    index = get_sale_index(today)
+    assert isinstance(index, SaleIndex)
+    assert get_sale_index(today) is index
+
+    sale = Sale.objects.create(
+        name='Sale', value=3, type=DiscountValueType.FIXED, end_date=today)
+    new_index = get_sale_index(today)
+    assert new_index is not index
+    assert list(new_index) == [sale]
+
+    sale.products.add(product)
+    assert get_sale_index(today).get_product_sales(product) == {sale}
+
+
+def test_get_sale_index_keeps_only_last_date(product):
+    today = date.today()
+    index = get_sale_index(today)
+    get_sale_index(today + timedelta(days=1))
+    assert get_sale_index(today) is not index
+
+
 def test_increase_voucher_usage():
     voucher = Voucher.objects.create(
         code='unique', type=VoucherType.VALUE,
@@ -202,7 +292,7 @@ def test_get_voucher_discount_all_products(
         prices, discount_value_type, discount_value, voucher_type,
         expected_value):
     prices = [
-        TaxedMoney(net=Money(price, 'USD'), gross=Money(price, 'USD'))
+        (TaxedMoney(net=Money(price, 'USD'), gross=Money(price, 'USD')), 1)
         for price in prices]
     voucher = Voucher(
         code='unique', type=voucher_type,
@@ -213,6 +303,19 @@ def test_get_voucher_discount_all_products(
     assert discount == Money(expected_value, 'USD')
 
 
+@pytest.mark.parametrize(
+    'apply_once_per_order, expected_value', [(True, 5), (False, 1000)])
+def test_get_voucher_discount_for_quantities(
+        apply_once_per_order, expected_value):
+    price = TaxedMoney(net=Money(10, 'USD'), gross=Money(10, 'USD'))
+    voucher = Voucher(
+        code='unique', type=VoucherType.PRODUCT,
+        discount_value_type=DiscountValueType.FIXED, discount_value=5,
+        apply_once_per_order=apply_once_per_order)
+    discount = get_products_voucher_discount(voucher, [(price, 200)])
+    assert discount == Money(expected_value, 'USD')
+
+
 @pytest.mark.parametrize('current_date, is_active', (
     (date.today(), True),
     (date.today() + timedelta(days=1), True),
@@ -1,4 +1,5 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 import pytest
 from django.urls import reverse
@@ -7,6 +8,8 @@ from elasticsearch_dsl.connections import connections
 from saleor.account.models import User
 from saleor.order.models import Order
 from saleor.product.models import Product
+from saleor.search.signals import QueuedSignalProcessor, index_updates
+from saleor.search.tasks import update_search_index
 
 MATCH_SEARCH_REQUEST = ['method', 'host', 'port', 'path']
 STOREFRONT_PRODUCTS = {15, 56}  # same as in recorded data!
@@ -175,3 +178,49 @@ def orders(db, address):
 def test_dashboard_search_orders_by_user(db, admin_client, customers, orders):
     _, _, orders = execute_dashboard_search(admin_client, USER_WITH_ORDER)
     assert ORDERS[USER_WITH_ORDER] == orders
+
+
+@pytest.fixture
+def queued_signal_processor(settings):
+    settings.ELASTICSEARCH_DSL_AUTOSYNC = True
+    processor = QueuedSignalProcessor(connections)
+    yield processor
+    processor.teardown()
+
+
+@patch('saleor.search.signals.update_search_index')
+def test_saves_are_indexed_in_a_single_task(
+        mocked_task, queued_signal_processor, product, order):
+    product.save()
+    product.save()
+    order.save()
+    mocked_task.delay.assert_not_called()
+
+    index_updates.flush()
+
+    mocked_task.delay.assert_called_once_with(sorted([
+        ('order.Order', order.pk), ('product.Product', product.pk)]))
+
+
+@patch('saleor.search.signals.update_search_index')
+def test_unindexed_models_are_not_queued(
+        mocked_task, queued_signal_processor, category):
+    category.save()
+    index_updates.flush()
+    mocked_task.delay.assert_not_called()
+
+
+@patch('saleor.search.tasks.bulk')
+def test_update_search_index(mocked_bulk, product):
+    actions = []
+    mocked_bulk.side_effect = lambda client, items, **kwargs: actions.extend(
+        items)
+    missing_pk = product.pk + 1
+
+    update_search_index([
+        ['product.Product', product.pk], ['product.Product', product.pk],
+        ['product.Product', missing_pk]])
+
+    mocked_bulk.assert_called_once()
+    assert {(action['_op_type'], action['_id']) for action in actions} == {
+        ('index', product.pk), ('delete', missing_pk)}
@@ -1,7 +1,13 @@
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
 import pytest
 
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django_countries.fields import Country
 from prices import Money, TaxedMoney
@@ -12,9 +18,12 @@ from saleor.core.utils.taxes import (
     DEFAULT_TAX_RATE_NAME, get_tax_rate_by_name, get_taxes_for_country)
 from saleor.order import FulfillmentStatus, OrderStatus, models
 from saleor.order.models import Order
+from saleor.order.signals import sales_updates
+from saleor.order.tasks import SALES_UPDATE_DELAY, update_sales_summaries
 from saleor.order.utils import (
-    add_variant_to_order, cancel_fulfillment, cancel_order, recalculate_order,
-    restock_fulfillment_lines, restock_order_lines, update_order_prices,
+    add_variant_to_order, cancel_fulfillment, cancel_order, get_sales_total,
+    recalculate_order, restock_fulfillment_lines, restock_order_lines,
+    sum_order_totals, update_daily_sales, update_order_prices,
     update_order_status)
 from saleor.payment import ChargeStatus
 from saleor.payment.models import Payment
@@ -434,6 +443,32 @@ def test_update_order_prices(order_with_lines):
     assert order_with_lines.total == total
 
 
+def test_update_order_prices_queries_do_not_depend_on_lines(
+        order_with_lines, product):
+    def count_queries():
+        order_with_lines.lines.update(unit_price_net=Money(1, 'USD'))
+        with CaptureQueriesContext(connection) as context:
+            update_order_prices(order_with_lines, None)
+        return len(context.captured_queries)
+
+    # Warm up caches of taxes and site settings
+    update_order_prices(order_with_lines, None)
+    queries = count_queries()
+    add_variant_to_order(order_with_lines, product.variants.get(), 1)
+    assert count_queries() == queries
+
+
+def test_recalculate_order_ignores_prefetched_lines(order_with_lines):
+    order = Order.objects.prefetch_related('lines').get(
+        pk=order_with_lines.pk)
+    order.lines.all()[0].delete()
+    line = order_with_lines.lines.get()
+
+    recalculate_order(order)
+
+    assert order.total == line.get_total() + order.shipping_price
+
+
 def test_order_payment_flow(
         request_cart_with_item, client, address, shipping_zone, settings):
     request_cart_with_item.shipping_address = address
@@ -514,3 +549,86 @@ def test_add_order_note_view(order, authorized_client, customer_user):
     assert get_redirect_location(response) == redirect_url
     order.refresh_from_db()
     assert order.customer_note == customer_note
+
+
+def test_sum_order_totals(order_with_lines):
+    Order.objects.create(total=order_with_lines.total)
+    assert sum_order_totals(Order.objects.all()) == (
+        order_with_lines.total + order_with_lines.total)
+    assert sum_order_totals(Order.objects.none()) == TaxedMoney(
+        net=Money(0, 'USD'), gross=Money(0, 'USD'))
+
+
+def test_update_daily_sales(order_with_lines):
+    order = order_with_lines
+    day = order.created.date()
+    Order.objects.create(status=OrderStatus.CANCELED, total=order.total)
+    Order.objects.create(status=OrderStatus.DRAFT, total=order.total)
+
+    update_daily_sales(day)
+
+    summary = models.DailySales.objects.get(date=day)
+    assert summary.orders_count == 1
+    assert summary.total == order.total
+    assert get_sales_total(order.created) == order.total
+    for line in order:
+        sales = models.DailyVariantSales.objects.get(
+            date=day, variant=line.variant)
+        assert sales.quantity == line.quantity
+        assert sales.revenue == line.get_total()
+
+    cancel_order(order, restock=False)
+    update_daily_sales(day)
+
+    summary.refresh_from_db()
+    assert summary.orders_count == 0
+    assert not models.DailyVariantSales.objects.exists()
+
+
+@patch('saleor.order.signals.update_sales_summaries.apply_async')
+def test_order_changes_queue_sales_update(
+        mock_update_sales_summaries, order_with_lines):
+    sales_updates.flush()
+    cache.clear()
+    mock_update_sales_summaries.reset_mock()
+
+    line = order_with_lines.lines.first()
+    line.quantity += 1
+    line.save()
+    order_with_lines.save()
+    Order.objects.create(status=OrderStatus.DRAFT).save()
+    sales_updates.flush()
+
+    mock_update_sales_summaries.assert_called_once_with(
+        args=[[order_with_lines.created.date().isoformat()]],
+        countdown=SALES_UPDATE_DELAY)
+
+
+@patch('saleor.order.signals.update_sales_summaries.apply_async')
+def test_sales_update_is_scheduled_once_per_day(
+        mock_update_sales_summaries, order_with_lines):
+    sales_updates.flush()
+    cache.clear()
+    mock_update_sales_summaries.reset_mock()
+    day = order_with_lines.created.date().isoformat()
+
+    order_with_lines.save()
+    sales_updates.flush()
+    order_with_lines.save()
+    sales_updates.flush()
+    assert mock_update_sales_summaries.call_count == 1
+
+    update_sales_summaries([day])
+    order_with_lines.save()
+    sales_updates.flush()
+    assert mock_update_sales_summaries.call_count == 2
+
+
+def test_update_daily_sales_command(order_with_lines):
+    models.DailySales.objects.all().delete()
+    out = StringIO()
+    call_command('update_daily_sales', stdout=out)
+    summary = models.DailySales.objects.get(
+        date=order_with_lines.created.date())
+    assert summary.orders_count == 1
+    assert 'Recalculated sales summaries of 1 days' in out.getvalue()
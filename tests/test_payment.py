@@ -7,10 +7,11 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.template.loader import get_template
 from prices import Money
-from saleor.order import OrderEvents, OrderEventsEmails
+from saleor.order import OrderEvents, OrderEventsEmails, OrderStatus
 from saleor.order.views import PAYMENT_TEMPLATE
 from saleor.payment import (
     ChargeStatus, PaymentError, TransactionKind, get_payment_gateway)
+from saleor.payment.tasks import process_payment
 from saleor.payment.utils import (
     clean_authorize, clean_capture, create_payment, create_transaction,
     gateway_authorize, gateway_capture, gateway_get_client_token,
@@ -493,3 +494,60 @@ def test_clean_capture():
         total=amount,
         captured_amount=Decimal('0.00'))
     clean_capture(payment, amount)
+
+
+def test_process_payment(payment_dummy):
+    payment = payment_dummy
+    process_payment(payment.pk)
+    payment.refresh_from_db()
+    assert payment.charge_status == ChargeStatus.CHARGED
+    assert list(payment.transactions.values_list('kind', flat=True)) == [
+        TransactionKind.AUTH, TransactionKind.CAPTURE]
+
+
+def test_process_payment_skips_charged_payment(payment_txn_captured):
+    payment = payment_txn_captured
+    transactions_count = payment.transactions.count()
+    process_payment(payment.pk)
+    assert payment.transactions.count() == transactions_count
+
+
+def test_process_payment_does_not_authorize_twice(payment_txn_preauth):
+    payment = payment_txn_preauth
+    process_payment(payment.pk)
+    payment.refresh_from_db()
+    assert payment.charge_status == ChargeStatus.CHARGED
+    assert payment.transactions.filter(kind=TransactionKind.AUTH).count() == 1
+
+
+@patch('saleor.payment.tasks.gateway_capture', side_effect=RuntimeError)
+def test_process_payment_keeps_authorization_after_crash(
+        mock_gateway_capture, payment_dummy):
+    payment = payment_dummy
+    with pytest.raises(RuntimeError):
+        process_payment(payment.pk)
+    assert payment.transactions.filter(
+        kind=TransactionKind.AUTH, is_success=True).exists()
+
+    mock_gateway_capture.side_effect = None
+    process_payment(payment.pk)
+    assert payment.transactions.filter(kind=TransactionKind.AUTH).count() == 1
+    mock_gateway_capture.assert_called_with(payment, payment.total)
+
+
+@patch('saleor.payment.gateways.dummy.dummy_success', return_value=False)
+def test_process_payment_failed_cancels_order(
+        mock_dummy_success, payment_dummy):
+    payment = payment_dummy
+    order = payment.order
+    line = order.lines.first()
+    stock = line.variant.quantity_allocated
+    process_payment(payment.pk)
+    payment.refresh_from_db()
+    order.refresh_from_db()
+    line.variant.refresh_from_db()
+    assert not payment.is_active
+    assert payment.charge_status == ChargeStatus.NOT_CHARGED
+    assert order.status == OrderStatus.CANCELED
+    assert order.events.filter(type=OrderEvents.CANCELED.value).exists()
+    assert line.variant.quantity_allocated == stock - line.quantity
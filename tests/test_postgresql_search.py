@@ -1,11 +1,13 @@
 from decimal import Decimal
 
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
 
 from saleor.account.models import Address, User
 from saleor.order.models import Order
 from saleor.product.models import Product
+from saleor.search.autocomplete import get_suggestions
 
 
 @pytest.fixture(scope='function', autouse=True)
@@ -247,3 +249,85 @@ def test_show_users_search_result_when_access_granted(
     staff_user.user_permissions.add(permission_manage_users)
     _, _, users = search_dashboard(staff_client, USER_PHRASE_WITH_RESULT)
     assert 1 == len(users)
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+def test_search_vectors_follow_address_changes(
+        admin_client, orders_with_addresses):
+    address = orders_with_addresses[1].user.default_shipping_address
+    address.last_name = 'Kartofel'
+    address.save()
+    _, orders, _ = search_dashboard(admin_client, 'kartofel')
+    assert [orders_with_addresses[1]] == list(orders)
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+def test_search_vectors_skip_saves_of_unsearched_fields(
+        admin_client, orders_with_addresses):
+    order = orders_with_addresses[0]
+    Order.objects.filter(pk=order.pk).update(search_vector=None)
+    order.save(update_fields=['status'])
+    order.refresh_from_db()
+    assert order.search_vector is None
+
+    order.save(update_fields=['user_email'])
+    order.refresh_from_db()
+    assert order.search_vector
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+def test_update_search_vectors_command(admin_client, named_products):
+    Product.objects.update(search_vector=None)
+    products, _, _ = search_dashboard(admin_client, 'coffee')
+    assert 0 == len(products)
+
+    call_command('update_search_vectors', batch_size=1)
+
+    products, _, _ = search_dashboard(admin_client, 'coffee')
+    assert [named_products[0]] == list(products)
+
+
+def autocomplete(client, phrase):
+    response = client.get(reverse('search:autocomplete'), {'q': phrase})
+    return [item['name'] for item in response.json()['results']]
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('phrase,names', [
+    ('ro', ['Roasted chicken']), ('CHICK', ['Roasted chicken']),
+    ('shirt', ['Cool T-Shirt']), ('x', [])])
+def test_autocomplete_products(client, named_products, phrase, names):
+    assert autocomplete(client, phrase) == names
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+def test_autocomplete_prefix_matches_come_first(client, named_products):
+    named_products[1].name = 'Arabica T-Shirt'
+    named_products[1].save()
+    named_products[0].name = 'Coffee Arabica'
+    named_products[0].save()
+    assert autocomplete(client, 'arab') == ['Arabica T-Shirt', 'Coffee Arabica']
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+def test_autocomplete_suggests_categories(client, named_products, category):
+    category.name = 'Roasts'
+    category.save()
+    suggestions = get_suggestions('roast')
+    assert [(item['kind'], item['name']) for item in suggestions] == [
+        ('product', 'Roasted chicken'), ('category', 'Roasts')]
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+def test_autocomplete_results_are_cached(
+        client, named_products, django_assert_num_queries):
+    get_suggestions('roast')
+    with django_assert_num_queries(0):
+        get_suggestions('  Roast ')
@@ -2,12 +2,16 @@ import datetime
 import io
 import json
 from decimal import Decimal
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
 from django.core import serializers
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.core.serializers.base import DeserializationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from prices import Money, TaxedMoney, TaxedMoneyRange
 from saleor.checkout import utils
@@ -16,9 +20,15 @@ from saleor.checkout.utils import add_variant_to_cart
 from saleor.discount.models import Sale
 from saleor.product import ProductAvailabilityStatus, models
 from saleor.product.thumbnails import create_product_thumbnails
+from saleor.core.exceptions import InsufficientStock
 from saleor.product.utils import (
-    allocate_stock, deallocate_stock, decrease_stock, increase_stock)
+    allocate_stock, allocate_stocks, deallocate_stock, deallocate_stocks,
+    decrease_stock, get_products_page, increase_stock, products_with_details,
+    summary_updates)
 from saleor.product.utils.attributes import get_product_attributes_data
+from saleor.product.utils.cache import (
+    STOREFRONT_LOCK_KEY, get_catalog_version, get_or_build,
+    get_product_version, invalidate_product_cache)
 from saleor.product.utils.availability import get_product_availability_status
 from saleor.product.utils.variants_picker import get_variant_picker_data
 from saleor.menu.models import MenuItemTranslation
@@ -44,6 +54,109 @@ def test_stock_utils(
     variant.refresh_from_db()
     assert variant.quantity == expected_quantity
     assert variant.quantity_allocated == expected_quantity_allocated
+    summary = models.ProductSummary.objects.get(product=product)
+    assert summary.quantity_allocated == 80
+
+    summary_updates.flush()
+    summary.refresh_from_db()
+    assert summary.quantity == expected_quantity
+    assert summary.quantity_allocated == expected_quantity_allocated
+    assert summary.is_in_stock == (
+        expected_quantity > expected_quantity_allocated)
+
+
+def test_allocate_stocks(product, variant):
+    other_variant = product.variants.exclude(pk=variant.pk).get()
+    other_variant.quantity = 10
+    other_variant.quantity_allocated = 0
+    other_variant.save()
+
+    allocate_stocks({other_variant: 4, variant: 2})
+
+    other_variant.refresh_from_db()
+    variant.refresh_from_db()
+    assert other_variant.quantity_allocated == 4
+    assert variant.quantity_allocated == 5
+    summary_updates.flush()
+    summary = models.ProductSummary.objects.get(product=product)
+    assert summary.quantity_allocated == 9
+
+    deallocate_stocks({other_variant: 1, variant: 2})
+
+    other_variant.refresh_from_db()
+    variant.refresh_from_db()
+    assert other_variant.quantity_allocated == 3
+    assert variant.quantity_allocated == 3
+
+
+def test_allocate_stocks_insufficient_stock(product, variant):
+    other_variant = product.variants.exclude(pk=variant.pk).get()
+    other_variant.quantity = 10
+    other_variant.quantity_allocated = 0
+    other_variant.save()
+
+    with pytest.raises(InsufficientStock) as exc:
+        allocate_stocks({other_variant: 4, variant: 3})
+
+    assert exc.value.item == variant
+    other_variant.refresh_from_db()
+    variant.refresh_from_db()
+    assert other_variant.quantity_allocated == 0
+    assert variant.quantity_allocated == 3
+
+
+def test_product_summary_prices(product):
+    summary = models.ProductSummary.objects.get(product=product)
+    assert summary.min_price == product.price
+    assert summary.max_price == product.price
+
+    variant = product.variants.first()
+    variant.price_override = Money(3, 'USD')
+    variant.save()
+    models.ProductVariant.objects.create(
+        product=product, sku='expensive', price_override=Money(30, 'USD'))
+
+    summary.refresh_from_db()
+    assert summary.min_price == Money(3, 'USD')
+    assert summary.max_price == Money(30, 'USD')
+
+
+def test_product_summary_bulk_writes(product):
+    models.ProductVariant.objects.bulk_create([
+        models.ProductVariant(
+            product=product, sku='cheap', price_override=Money(2, 'USD'),
+            quantity=5)])
+    summary = models.ProductSummary.objects.get(product=product)
+    assert summary.min_price == Money(2, 'USD')
+
+    product.variants.update(quantity=0)
+    summary_updates.flush()
+    summary.refresh_from_db()
+    assert summary.quantity == 0
+    assert not summary.is_in_stock
+
+    new_product, = models.Product.objects.bulk_create([models.Product(
+        name='Bulk product', product_type=product.product_type,
+        category=product.category, price=Money(7, 'USD'))])
+    assert models.ProductSummary.objects.get(
+        product=new_product).min_price == Money(7, 'USD')
+
+    models.Product.objects.filter(pk=new_product.pk).update(
+        price=Money(9, 'USD'))
+    assert models.ProductSummary.objects.get(
+        product=new_product).min_price == Money(9, 'USD')
+
+
+def test_product_summary_without_variants(product):
+    product.variants.first().delete()
+
+    summary = models.ProductSummary.objects.get(product=product)
+    assert summary.min_price == product.price
+    assert summary.quantity == 0
+    assert not summary.is_in_stock
+
+    product.delete()
+    assert not models.ProductSummary.objects.exists()
 
 
 def test_product_page_redirects_to_correct_slug(client, product):
@@ -415,6 +528,30 @@ def test_get_variant_picker_data_proper_variant_count(product):
     assert len(data['variantAttributes'][0]['values']) == 1
 
 
+def test_get_variant_picker_data_queries_do_not_grow_with_variants(
+        product):
+    def count_queries():
+        products = products_with_details(user=AnonymousUser())
+        product_with_details = products.get(pk=product.pk)
+        with CaptureQueriesContext(connection) as queries:
+            data = get_variant_picker_data(product_with_details)
+        return len(queries), data
+
+    num_queries = count_queries()[0]
+    attribute = product.product_type.variant_attributes.first()
+    for i in range(5):
+        value = attribute.values.create(
+            name='Value %d' % i, slug='value-%d' % i)
+        product.variants.create(
+            sku='SKU-%d' % i, quantity=1,
+            attributes={str(attribute.pk): str(value.pk)})
+
+    num_queries_with_variants, data = count_queries()
+    assert num_queries_with_variants == num_queries
+    assert len(data['variants']) == 6
+    assert len(data['variantAttributes'][0]['values']) == 6
+
+
 def test_render_product_page_with_no_variant(
         unavailable_product, admin_client):
     product = unavailable_product
@@ -444,6 +581,151 @@ def test_include_products_from_subcategories_in_main_view(
     assert product in response.context_data['products'][0]
 
 
+def test_product_page_cached_for_anonymous_visitors(client, product):
+    url = product.get_absolute_url()
+    with patch(
+            'saleor.product.views.products_with_details',
+            wraps=products_with_details) as mock_products:
+        assert client.get(url).status_code == 200
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.context_data['product'] == product
+        assert mock_products.call_count == 1
+
+        variant = product.variants.first()
+        variant.quantity = 0
+        variant.save()
+        response = client.get(url)
+        assert mock_products.call_count == 2
+        quantities = {
+            cached_variant.pk: cached_variant.quantity
+            for cached_variant in response.context_data[
+                'product'].variants.all()}
+        assert quantities[variant.pk] == 0
+
+
+def test_product_page_not_cached_for_customers(authorized_client, product):
+    url = product.get_absolute_url()
+    with patch(
+            'saleor.product.views.products_with_details',
+            wraps=products_with_details) as mock_products:
+        authorized_client.get(url)
+        authorized_client.get(url)
+    assert mock_products.call_count == 2
+
+
+def test_category_page_cached_for_anonymous_visitors(client, product):
+    category = product.category
+    url = category.get_absolute_url()
+    with patch(
+            'saleor.product.utils.get_products_page',
+            wraps=get_products_page) as mock_get_products_page:
+        client.get(url)
+        response = client.get(url)
+        assert mock_get_products_page.call_count == 1
+        assert product in response.context_data['products'][0]
+        assert response.context_data['products_paginated'].number == 1
+
+        response = client.get(url, {'sort_by': 'name'})
+        assert mock_get_products_page.call_count == 2
+
+        product.name = 'New name'
+        product.save()
+        client.get(url)
+        assert mock_get_products_page.call_count == 3
+
+
+def test_get_or_build_serves_outdated_data_while_rebuilding():
+    key = 'test-key'
+    cache.set(key, (('old',), None, 'old data'))
+    cache.add(STOREFRONT_LOCK_KEY % key, True)
+    build = Mock(return_value='new data')
+
+    assert get_or_build(key, ('new',), build) == 'old data'
+    assert not build.called
+
+    cache.delete(STOREFRONT_LOCK_KEY % key)
+    assert get_or_build(key, ('new',), build) == 'new data'
+    assert build.call_count == 1
+    assert cache.get(key) == (('new',), None, 'new data')
+    assert cache.get(STOREFRONT_LOCK_KEY % key) is None
+    assert get_or_build(key, ('new',), build) == 'new data'
+    assert build.call_count == 1
+
+
+def test_get_or_build_waits_for_missing_entry_built_elsewhere():
+    key = 'test-key'
+    cache.add(STOREFRONT_LOCK_KEY % key, True)
+    build = Mock(return_value='new data')
+
+    def build_elsewhere(seconds):
+        cache.set(key, (('new',), None, 'data built elsewhere'))
+
+    with patch(
+            'saleor.product.utils.cache.time.sleep',
+            side_effect=build_elsewhere):
+        data = get_or_build(key, ('new',), build)
+    assert data == 'data built elsewhere'
+    assert not build.called
+
+
+def test_get_or_build_checks_product_versions(product):
+    key = 'test-key'
+
+    def build(track_products):
+        track_products([product.pk])
+        return [product]
+
+    build = Mock(side_effect=build)
+
+    get_or_build(key, ('catalog',), build, track_products=True)
+    get_or_build(key, ('catalog',), build, track_products=True)
+    assert build.call_count == 1
+
+    invalidate_product_cache(product.pk)
+    get_or_build(key, ('catalog',), build, track_products=True)
+    assert build.call_count == 2
+
+
+def test_get_or_build_product_changed_while_building(product):
+    key = 'test-key'
+
+    def build(track_products):
+        track_products([product.pk])
+        invalidate_product_cache(product.pk)
+        return [product]
+
+    build = Mock(side_effect=build)
+
+    get_or_build(key, ('catalog',), build, track_products=True)
+    get_or_build(key, ('catalog',), build, track_products=True)
+    assert build.call_count == 2
+
+
+def test_get_or_build_caches_nothing_without_shared_cache(settings):
+    settings.CACHE_IS_SHARED = False
+    key = 'test-key'
+    build = Mock(return_value='data')
+    assert get_or_build(key, ('catalog',), build) == 'data'
+    assert get_or_build(key, ('catalog',), build) == 'data'
+    assert build.call_count == 2
+    assert cache.get(key) is None
+
+
+def test_stock_change_keeps_catalog_version(product):
+    version = get_catalog_version()
+    product_version = get_product_version(product.pk)
+    variant = product.variants.first()
+    allocate_stock(variant, 1)
+    summary_updates.flush()
+    assert get_catalog_version() == version
+    assert get_product_version(product.pk) != product_version
+
+    variant.price_override = Money(1, 'USD')
+    variant.save()
+    assert get_catalog_version() != version
+
+
 @patch('saleor.product.thumbnails.create_thumbnails')
 def test_create_product_thumbnails(
         mock_create_thumbnails, product_with_image):
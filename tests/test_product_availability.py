@@ -1,11 +1,19 @@
 import datetime
 from unittest.mock import Mock
 
+import pytest
+
+from prices import Money
+from saleor.discount import DiscountValueType
+from saleor.discount.models import Sale
+from saleor.discount.utils import build_sale_index
 from saleor.product import (
     ProductAvailabilityStatus, VariantAvailabilityStatus, models)
 from saleor.product.utils.availability import (
-    get_availability, get_product_availability_status,
-    get_variant_availability_status)
+    get_availability, get_availability_from_prices,
+    get_product_availabilities, get_product_availability_status,
+    get_product_prices, get_variant_availability_status,
+    products_with_availability)
 
 
 def test_product_availability_status(unavailable_product):
@@ -104,3 +112,75 @@ def test_available_products_only_available(product_list):
     available_products = models.Product.objects.available_products()
     assert available_products.count() == 1
     assert all([product.is_available() for product in available_products])
+
+
+@pytest.mark.parametrize('products_count', [24, 96])
+def test_product_availabilities_match_get_availability(
+        products_count, product_type, category, taxes):
+    products = models.Product.objects.bulk_create([
+        models.Product(
+            name='Product %d' % i, price=Money(10 + i, 'USD'),
+            product_type=product_type, category=category)
+        for i in range(products_count)])
+    models.ProductVariant.objects.bulk_create([
+        models.ProductVariant(
+            product=product, sku='%d-%d' % (product.pk, i),
+            price_override=Money(5 + i, 'USD') if i % 2 else None)
+        for product in products for i in range(10)])
+    sale = Sale.objects.create(
+        name='Sale', type=DiscountValueType.PERCENTAGE, value=20,
+        end_date=datetime.date.today())
+    sale.products.add(*products[::3])
+    discounts = build_sale_index(datetime.date.today())
+    products = models.Product.objects.prefetch_related(
+        'variants', 'collections')
+
+    availabilities = get_product_availabilities(
+        products, discounts=discounts, taxes=taxes)
+
+    assert len(availabilities) == products_count
+    for product, availability in zip(products, availabilities):
+        assert availability == get_availability(
+            product, discounts=discounts, taxes=taxes)
+
+
+def test_product_availabilities_without_variants(product):
+    product.variants.all().delete()
+    products = models.Product.objects.prefetch_related('variants')
+
+    [(product, availability)] = products_with_availability(
+        products, discounts=None, taxes=None, local_currency=None)
+
+    assert availability == get_availability(product)
+    assert not availability.available
+
+
+def test_product_prices_match_variant_prices(product, taxes):
+    product.variants.create(
+        sku='456', price_override=Money(5, 'USD'), quantity=2)
+    sale = Sale.objects.create(
+        name='Sale', type=DiscountValueType.PERCENTAGE, value=20)
+    sale.products.add(product)
+    discounts = build_sale_index(datetime.date.today())
+    product = models.Product.objects.prefetch_related(
+        'variants', 'collections').get(pk=product.pk)
+
+    prices = get_product_prices(product, discounts=discounts, taxes=taxes)
+
+    assert len(prices.variants) == 2
+    for variant, price, price_undiscounted in prices.variants:
+        assert price == variant.get_price(discounts=discounts, taxes=taxes)
+        assert price_undiscounted == variant.get_price(taxes=taxes)
+    assert get_availability_from_prices(
+        product, prices, local_currency='PLN') == get_availability(
+            product, discounts=discounts, taxes=taxes, local_currency='PLN')
+
+
+def test_product_prices_without_variants(product):
+    product.variants.all().delete()
+
+    prices = get_product_prices(product)
+
+    assert prices.variants == []
+    assert get_availability_from_prices(product, prices) == (
+        get_availability(product))
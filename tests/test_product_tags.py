@@ -3,6 +3,8 @@ from unittest.mock import Mock, patch
 from django.templatetags.static import static
 from django.test import override_settings
 
+from saleor.core.utils.thumbnails import (
+    cache_thumbnail_url, get_cached_thumbnail_url)
 from saleor.product.templatetags.product_images import (
     choose_placeholder, get_thumbnail)
 
@@ -21,6 +23,28 @@ def test_get_thumbnail():
     assert thumb == thumbnail_value.url
 
 
+@override_settings(
+    VERSATILEIMAGEFIELD_SETTINGS={'create_images_on_demand': True})
+def test_get_thumbnail_uses_cached_url():
+    instance = Mock()
+    instance.name = 'image.jpg'
+    instance.thumbnail = {}
+    cache_thumbnail_url(instance, 'thumbnail', '10x10', 'cached.jpg')
+    thumb = get_thumbnail(instance, 10, method='thumbnail')
+    assert thumb == 'cached.jpg'
+
+
+@override_settings(
+    VERSATILEIMAGEFIELD_SETTINGS={'create_images_on_demand': True})
+def test_get_thumbnail_caches_url_created_on_demand():
+    instance = Mock()
+    instance.name = 'image.jpg'
+    instance.thumbnail = {'10x10': Mock(url='thumb.jpg')}
+    get_thumbnail(instance, 10, method='thumbnail')
+    assert get_cached_thumbnail_url(
+        instance, 'thumbnail', '10x10') == 'thumb.jpg'
+
+
 def test_get_thumbnail_no_instance(monkeypatch):
     monkeypatch.setattr(
         'saleor.product.templatetags.product_images.choose_placeholder',
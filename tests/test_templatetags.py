@@ -1,6 +1,7 @@
 from django.urls import reverse
 
 from saleor.core.templatetags.shop import get_sort_by_url, menu
+from saleor.menu.utils import translate_menu_items
 from saleor.core.templatetags.status import (
     LABEL_SUCCESS, render_page_availability)
 
@@ -30,7 +31,8 @@ def test_menu(menu_with_items):
     assert result == {'horizontal': False, 'menu_items': []}
 
     result = menu(menu_with_items)
-    assert result['menu_items'] == menu_with_items.json_content
+    assert result['menu_items'] == translate_menu_items(
+        menu_with_items.json_content, 'en')
 
 
 def test_render_page_availability(page):